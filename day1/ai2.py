@@ -1,10 +1,22 @@
 from openai import OpenAI
 import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.openai_pool import OpenAIPool
+
 log = logging.getLogger(OpenAI.__module__)
 log.setLevel(logging.DEBUG)
 log.addHandler(logging.StreamHandler())
-client = OpenAI(base_url='http://localhost:11434/v1/',api_key='ollama') # Placeholder API key for Ollama)
+
+# Comma-separated list of Ollama /v1 endpoints, e.g.
+#   OLLAMA_ENDPOINTS=http://box1:11434/v1/,http://box2:11434/v1/
+# Requests go to the least busy healthy box; failing boxes are ejected.
+endpoints = os.environ.get("OLLAMA_ENDPOINTS", "http://localhost:11434/v1/").split(",")
+client = OpenAIPool([(url, 'ollama') for url in endpoints]) # Placeholder API key for Ollama)
 
 chat_completion = client.chat.completions.create(messages=[{'role': 'user','content': 'Explain the concept of quantum entanglement.'}],model='llama3')                                              # Use the name of the model pulled with Ollama)
 
 print(chat_completion.choices[0].message.content)
+print(client.stats())
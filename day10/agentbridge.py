@@ -2,6 +2,11 @@ from langchain_classic.agents import initialize_agent, AgentType, Tool
 from langchain_community.llms import Ollama
 import requests
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.policy import RetryPolicy
 
 # -----------------------------
 # 1. Config
@@ -13,8 +18,16 @@ TOOLS_BASE = "http://localhost:9001/tools"
 # -----------------------------
 
 BRIDGE = "http://localhost:8080/mcp"
+
+# The bridge server already retries its tool and Ollama calls, so this hop
+# only keeps the circuit breaker (fail fast while the bridge is down);
+# retrying here as well would multiply the attempts.
+bridge_policy = RetryPolicy(max_tries=1)
+
+@bridge_policy.wrap(BRIDGE)
 def callmcp(payload):
     r = requests.post(BRIDGE, json=payload, timeout=(5,300))
+    r.raise_for_status()
     return r.json()
 
 def filesystem_list(path: str = "."):
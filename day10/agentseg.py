@@ -2,19 +2,30 @@ from langchain_classic.agents import initialize_agent, AgentType, Tool
 from langchain_community.llms import Ollama
 import requests
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.deadlines import LatencyTracker
 
 # -----------------------------
 # 1. Config
 # -----------------------------
 TOOLS_BASE = "http://localhost:9001/tools"
 
+# Tool calls time out at 3x their observed p99 once enough calls were seen
+# (500s until then), so a stuck tool doesn't hold the agent for minutes.
+latency = LatencyTracker(ceiling=500)
+
 # -----------------------------
 # 2. Tool: filesystem:list
 # -----------------------------
 def filesystem_list(path: str = "."):
     """List files in a directory."""
     payload = {"path": path}
-    r = requests.post(f"{TOOLS_BASE}/filesystem/list", json=payload,timeout=500)
+    url = f"{TOOLS_BASE}/filesystem/list"
+    with latency.measure(url):
+        r = requests.post(url, json=payload, timeout=latency.timeout(url))
     return r.json()
 
 filesystem_tool = Tool(
@@ -29,7 +40,9 @@ filesystem_tool = Tool(
 def db_query(sql: str):
     """Execute a toy SQL query."""
     payload = {"sql": sql}
-    r = requests.post(f"{TOOLS_BASE}/db/query", json=payload)
+    url = f"{TOOLS_BASE}/db/query"
+    with latency.measure(url):
+        r = requests.post(url, json=payload, timeout=latency.timeout(url))
     return r.json()
 
 db_query_tool = Tool(
@@ -1,9 +1,15 @@
 # bridge_server.py
 from fastapi import FastAPI, Request
 from pydantic import BaseModel
-import requests
+import httpx
 import uvicorn
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.deadlines import LatencyTracker
+from ollamakit.policy import get_policy
 
 app = FastAPI()
 
@@ -18,6 +24,41 @@ TOOL_REGISTRY = {
     "todos:list":"https://jsonplaceholder.typicode.com/todos/1"
 }
 
+# Outbound tool and Ollama calls share one policy: jittered retries plus a
+# circuit breaker per endpoint, so a dead tool server fails fast. This is the
+# only layer that retries (agentbridge.py doesn't), and the calls are async so
+# backoff waits don't block the event loop.
+policy = get_policy()
+http = httpx.AsyncClient()
+
+# Timeouts follow each endpoint's (and model's) observed latency: 3x p99
+# once 20 calls were seen, the fixed values below until then.
+TOOL_TIMEOUT = 30
+OLLAMA_TIMEOUT = 300
+latency = LatencyTracker(ceiling=OLLAMA_TIMEOUT)
+
+async def call_tool(endpoint, httpmethod, input_payload):
+    async def send():
+        timeout = latency.timeout(endpoint, default=TOOL_TIMEOUT)
+        with latency.measure(endpoint):
+            if httpmethod == "get":
+                r = await http.get(endpoint, timeout=timeout)
+            else:
+                r = await http.post(endpoint, json=input_payload, timeout=timeout)
+            r.raise_for_status()
+            return r.json()
+    return await policy.acall(endpoint, send)
+
+async def call_ollama_generate(gen_payload):
+    url = f"{OLLAMA_BASE}/generate"
+    model = gen_payload.get("model")
+    async def send():
+        with latency.measure(url, model):
+            resp = await http.post(url, json=gen_payload, timeout=latency.timeout(url, model, OLLAMA_TIMEOUT))
+            resp.raise_for_status()
+            return resp.json()
+    return await policy.acall(OLLAMA_BASE, send)
+
 class MCPInvokeParams(BaseModel):
     model: str | None = None
     prompt: str
@@ -54,12 +95,7 @@ async def mcp_entry(request: Request):
         # Get input for tool
         input_payload = tool_inputs.get(tool_name, {})
         try:
-            if params.get("httpmethod") == "get":
-                r=requests.get(endpoint)
-            else:
-                r = requests.post(endpoint, json=input_payload, timeout=30)
-            r.raise_for_status()
-            tool_results[tool_name] = r.json()
+            tool_results[tool_name] = await call_tool(endpoint, params.get("httpmethod"), input_payload)
         except Exception as exc:
             tool_results[tool_name] = {"ok": False, "error": str(exc)}
     print("tools_ results",tool_results)
@@ -81,9 +117,7 @@ async def mcp_entry(request: Request):
         "stream": False
     }
     try:
-        resp = requests.post(f"{OLLAMA_BASE}/generate", json=gen_payload, timeout=300)
-        resp.raise_for_status()
-        ollama_resp = resp.json()
+        ollama_resp = await call_ollama_generate(gen_payload)
     except Exception as exc:
         return {"jsonrpc": "2.0", "id": body.get("id"), "error": {"message": f"ollama error: {exc}"}}
 
@@ -129,12 +163,7 @@ async def mcp_entry1(request: Request):
         # Get input for tool
         input_payload = tool_inputs.get(tool_name, {})
         try:
-            if params.get("httpmethod") == "get":
-                r=requests.get(endpoint)
-            else:
-                r = requests.post(endpoint, json=input_payload, timeout=30)
-            r.raise_for_status()
-            tool_results[tool_name] = r.json()
+            tool_results[tool_name] = await call_tool(endpoint, params.get("httpmethod"), input_payload)
         except Exception as exc:
             tool_results[tool_name] = {"ok": False, "error": str(exc)}
     print("tools_ results",tool_results)
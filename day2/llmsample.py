@@ -6,29 +6,46 @@ Install dependencies:
     pip install ollama
 Start Ollama service (if not running):
     ollama serve
+
+Responses for temperature-0 calls are cached on disk (see ollamakit/cache.py).
 """
 
 import ollama
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.batching import BatchClassifier
+from ollamakit.cache import ResponseCache
+from ollamakit.constrained import LabelChoice
+from ollamakit.prefix import PrefixSession
+
 # Default local model — change if you prefer mistral, phi3, qwen2, etc.
 DEFAULT_MODEL = "llama3"
 
+# Deterministic (temperature=0) answers are served from disk on re-runs.
+# Pass ResponseCache(cache_nonzero_temperature=True) to cache sampled calls too.
+response_cache = ResponseCache()
+
 # ---------------------------------------------
 # Basic Completion
 # ---------------------------------------------
-def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300):
+def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300, format=None):
     """
     Sends a prompt to a local Ollama model and returns text output.
+    ``format`` is passed through for structured (JSON-schema) outputs.
     """
+    messages = [{"role": "user", "content": prompt}]
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    # The output format changes the answer, so it is part of the cache key.
+    cache_options = dict(options, format=format) if format else options
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            options={"temperature": temperature, "num_predict": max_tokens}
+        return response_cache.get_or_call(
+            model, messages, cache_options,
+            lambda: ollama.chat(model=model, messages=messages, options=options, format=format)["message"]["content"],
         )
-        return response["message"]["content"]
     except Exception as e:
         return f"Error: {e}"
 
@@ -36,7 +53,9 @@ def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300
 # ---------------------------------------------
 # Few-shot Classification
 # ---------------------------------------------
-few_shot_template = """
+# The fixed preamble and the per-review suffix are kept apart so the
+# preamble can be evaluated once and reused (see classify_review_prefixed).
+few_shot_prefix = """
 You are an assistant that classifies movie reviews as Positive or Negative.
 
 Examples:
@@ -45,15 +64,56 @@ Label: Positive
 
 Review: "Boring, too long, and predictable."
 Label: Negative
+"""
 
+few_shot_suffix = """
 Now classify the following review:
 Review: "{review}"
 Label:
 """
 
+few_shot_template = few_shot_prefix + few_shot_suffix
+
+# Decoding is restricted to {"label": "Positive" | "Negative"} and capped at
+# a few tokens; the label is validated before it is returned.
+review_label = LabelChoice(["Positive", "Negative"])
+
 def classify_review(review):
     prompt = few_shot_template.format(review=review)
-    return send_completion(prompt, temperature=0.0, max_tokens=20)
+    reply = send_completion(prompt, temperature=0.0, max_tokens=review_label.num_predict,
+                            format=review_label.schema)
+    return review_label.parse(reply) or reply
+
+
+# Prefix-caching mode: the few-shot preamble is evaluated once and its
+# `context` tokens are reused, so each call only pays for the new review.
+few_shot_session = PrefixSession(few_shot_prefix, DEFAULT_MODEL, options={"temperature": 0.0})
+
+def classify_review_prefixed(review):
+    try:
+        data = few_shot_session.complete(
+            few_shot_suffix.format(review=review), options={"num_predict": 20}
+        )
+        return data["response"]
+    except Exception as e:
+        return f"Error: {e}"
+
+
+# Micro-batching mode: reviews submitted within a short window (or up to a
+# batch size) share one numbered prompt; if the JSON reply can't be parsed
+# each review falls back to classify_review().
+# Tunables: max_batch_size (reviews per call) and max_wait (seconds to wait).
+review_batcher = BatchClassifier(
+    labels=["Positive", "Negative"],
+    instructions="You are an assistant that classifies movie reviews as Positive or Negative.",
+    model=DEFAULT_MODEL,
+    single_fn=lambda review: classify_review(review).strip(),
+    max_batch_size=16,
+    max_wait=0.05,
+)
+
+def classify_reviews(reviews):
+    return review_batcher.classify_many(reviews)
 
 
 # ---------------------------------------------
@@ -65,5 +125,14 @@ if __name__ == "__main__":
     review = "The plot was amazing and the visuals were stunning."
     print("\nFew-shot classification:")
     print(classify_review(review))
+    print("Cache stats:", response_cache.stats())
+
+    print("\nFew-shot classification (reused prefix):")
+    print(classify_review_prefixed(review))
+    print("Prefix stats:", few_shot_session.stats())
+
+    print("\nBatched classification:")
+    print(classify_reviews([review, "Dull and far too long.", "A delightful surprise."]))
+    print("Batch stats:", review_batcher.stats())
     
    
\ No newline at end of file
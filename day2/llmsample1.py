@@ -3,18 +3,31 @@ LLM Fundamentals & Prompt Engineering - OLLAMA Version
 This tutorial uses local models via Ollama (no API keys required).
 
 Install dependencies:
-    pip install ollama
+    pip install ollama numpy
 Start Ollama service (if not running):
     ollama serve
+
+Responses for temperature-0 calls are cached on disk (see ollamakit/cache.py).
 """
 
 import ollama
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.cache import ResponseCache
+from ollamakit.evaluation import run_ab_eval
+from ollamakit.similarity import VectorIndex, cosine
+
 # Default local model — change if you prefer mistral, phi3, qwen2, etc.
 DEFAULT_MODEL = "llama3"
 
+# Deterministic (temperature=0) answers are served from disk on re-runs.
+# Pass ResponseCache(cache_nonzero_temperature=True) to cache sampled calls too.
+response_cache = ResponseCache()
+
 # ---------------------------------------------
 # Basic Completion
 # ---------------------------------------------
@@ -22,13 +35,13 @@ def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300
     """
     Sends a prompt to a local Ollama model and returns text output.
     """
+    messages = [{"role": "user", "content": prompt}]
+    options = {"temperature": temperature, "num_predict": max_tokens}
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            options={"temperature": temperature, "num_predict": max_tokens}
+        return response_cache.get_or_call(
+            model, messages, options,
+            lambda: ollama.chat(model=model, messages=messages, options=options)["message"]["content"],
         )
-        return response["message"]["content"]
     except Exception as e:
         return f"Error: {e}"
 
@@ -67,13 +80,19 @@ def get_embedding(text, model="nomic-embed-text"):
 
 
 def cosine_similarity(a, b):
-    import math
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+    # Vectorized; for one query against many vectors use VectorIndex.search
+    # (python -m ollamakit.similarity benchmarks it against the old loop).
+    return cosine(a, b)
+
+
+def semantic_dedup(texts, threshold=0.95, model="nomic-embed-text"):
+    """
+    Drops texts whose embedding is a near-duplicate of an earlier text.
+    All texts are embedded in one call and compared with one matmul per block.
+    """
+    vectors = ollama.embed(model=model, input=texts)["embeddings"]
+    index = VectorIndex(vectors)
+    return [texts[i] for i in index.dedupe(threshold)]
 
 
 # ---------------------------------------------
@@ -88,6 +107,20 @@ def compare_prompts(prompt_a, prompt_b, test_inputs, model=DEFAULT_MODEL):
     return results
 
 
+def compare_prompts_dataset(prompt_a, prompt_b, dataset_path, output_path,
+                            model=DEFAULT_MODEL, concurrency=4, temperature=0.7, max_tokens=300):
+    """
+    Same comparison over a JSONL dataset ({"input": ...} per line), with both
+    variants running in parallel. Calls go to /api/chat with the same options
+    as send_completion. Results stream to output_path so an interrupted run
+    resumes where it stopped; returns p50/p95 latency and output-token counts
+    per variant.
+    """
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    return run_ab_eval(dataset_path, prompt_a, prompt_b, output_path,
+                       model=model, concurrency=concurrency, options=options, chat=True)
+
+
 # ---------------------------------------------
 # Demo
 # ---------------------------------------------
@@ -3,32 +3,51 @@ LLM Fundamentals & Prompt Engineering - OLLAMA Version
 This tutorial uses local models via Ollama (no API keys required).
 
 Install dependencies:
-    pip install ollama
+    pip install ollama numpy
 Start Ollama service (if not running):
     ollama serve
+
+Responses for temperature-0 calls are cached on disk (see ollamakit/cache.py).
 """
 
 import ollama
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.batching import BatchClassifier
+from ollamakit.cache import ResponseCache
+from ollamakit.constrained import LabelChoice
+from ollamakit.evaluation import run_ab_eval
+from ollamakit.similarity import VectorIndex, cosine
+from ollamakit.prefix import PrefixSession
+
 # Default local model — change if you prefer mistral, phi3, qwen2, etc.
 DEFAULT_MODEL = "llama3"
 
+# Deterministic (temperature=0) answers are served from disk on re-runs.
+# Pass ResponseCache(cache_nonzero_temperature=True) to cache sampled calls too.
+response_cache = ResponseCache()
+
 # ---------------------------------------------
 # Basic Completion
 # ---------------------------------------------
-def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300):
+def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300, format=None):
     """
     Sends a prompt to a local Ollama model and returns text output.
+    ``format`` is passed through for structured (JSON-schema) outputs.
     """
+    messages = [{"role": "user", "content": prompt}]
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    # The output format changes the answer, so it is part of the cache key.
+    cache_options = dict(options, format=format) if format else options
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            options={"temperature": temperature, "num_predict": max_tokens}
+        return response_cache.get_or_call(
+            model, messages, cache_options,
+            lambda: ollama.chat(model=model, messages=messages, options=options, format=format)["message"]["content"],
         )
-        return response["message"]["content"]
     except Exception as e:
         return f"Error: {e}"
 
@@ -36,7 +55,9 @@ def send_completion(prompt, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300
 # ---------------------------------------------
 # Few-shot Classification
 # ---------------------------------------------
-few_shot_template = """
+# The fixed preamble and the per-review suffix are kept apart so the
+# preamble can be evaluated once and reused (see classify_review_prefixed).
+few_shot_prefix = """
 You are an assistant that classifies movie reviews as Positive or Negative.
 
 Examples:
@@ -45,15 +66,56 @@ Label: Positive
 
 Review: "Boring, too long, and predictable."
 Label: Negative
+"""
 
+few_shot_suffix = """
 Now classify the following review:
 Review: "{review}"
 Label:
 """
 
+few_shot_template = few_shot_prefix + few_shot_suffix
+
+# Decoding is restricted to {"label": "Positive" | "Negative"} and capped at
+# a few tokens; the label is validated before it is returned.
+review_label = LabelChoice(["Positive", "Negative"])
+
 def classify_review(review):
     prompt = few_shot_template.format(review=review)
-    return send_completion(prompt, temperature=0.0, max_tokens=20)
+    reply = send_completion(prompt, temperature=0.0, max_tokens=review_label.num_predict,
+                            format=review_label.schema)
+    return review_label.parse(reply) or reply
+
+
+# Prefix-caching mode: the few-shot preamble is evaluated once and its
+# `context` tokens are reused, so each call only pays for the new review.
+few_shot_session = PrefixSession(few_shot_prefix, DEFAULT_MODEL, options={"temperature": 0.0})
+
+def classify_review_prefixed(review):
+    try:
+        data = few_shot_session.complete(
+            few_shot_suffix.format(review=review), options={"num_predict": 20}
+        )
+        return data["response"]
+    except Exception as e:
+        return f"Error: {e}"
+
+
+# Micro-batching mode: reviews submitted within a short window (or up to a
+# batch size) share one numbered prompt; if the JSON reply can't be parsed
+# each review falls back to classify_review().
+# Tunables: max_batch_size (reviews per call) and max_wait (seconds to wait).
+review_batcher = BatchClassifier(
+    labels=["Positive", "Negative"],
+    instructions="You are an assistant that classifies movie reviews as Positive or Negative.",
+    model=DEFAULT_MODEL,
+    single_fn=lambda review: classify_review(review).strip(),
+    max_batch_size=16,
+    max_wait=0.05,
+)
+
+def classify_reviews(reviews):
+    return review_batcher.classify_many(reviews)
 
 
 # ---------------------------------------------
@@ -90,13 +152,19 @@ def get_embedding(text, model="nomic-embed-text"):
 
 
 def cosine_similarity(a, b):
-    import math
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+    # Vectorized; for one query against many vectors use VectorIndex.search
+    # (python -m ollamakit.similarity benchmarks it against the old loop).
+    return cosine(a, b)
+
+
+def semantic_dedup(texts, threshold=0.95, model="nomic-embed-text"):
+    """
+    Drops texts whose embedding is a near-duplicate of an earlier text.
+    All texts are embedded in one call and compared with one matmul per block.
+    """
+    vectors = ollama.embed(model=model, input=texts)["embeddings"]
+    index = VectorIndex(vectors)
+    return [texts[i] for i in index.dedupe(threshold)]
 #In RAG, you store text chunks as embeddings.
 
 #Then, when a user asks a question:
@@ -139,6 +207,20 @@ def compare_prompts(prompt_a, prompt_b, test_inputs, model=DEFAULT_MODEL):
     return results
 
 
+def compare_prompts_dataset(prompt_a, prompt_b, dataset_path, output_path,
+                            model=DEFAULT_MODEL, concurrency=4, temperature=0.7, max_tokens=300):
+    """
+    Same comparison over a JSONL dataset ({"input": ...} per line), with both
+    variants running in parallel. Calls go to /api/chat with the same options
+    as send_completion. Results stream to output_path so an interrupted run
+    resumes where it stopped; returns p50/p95 latency and output-token counts
+    per variant.
+    """
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    return run_ab_eval(dataset_path, prompt_a, prompt_b, output_path,
+                       model=model, concurrency=concurrency, options=options, chat=True)
+
+
 # ---------------------------------------------
 # Demo
 # ---------------------------------------------
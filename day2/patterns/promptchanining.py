@@ -1,18 +1,17 @@
+import os
+import sys
 
-import requests
-import json
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL = "llama3"
 
+# Shared keep-alive client: every call reuses the same pooled connection.
+client = get_client()
+
+
 def ollama_chat(prompt):
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
-    r = requests.post(OLLAMA_URL, json=payload)
-    return r.json()["response"]
+    return client.generate(MODEL, prompt)["response"]
 
 
 
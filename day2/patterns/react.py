@@ -1,17 +1,18 @@
-import requests
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
+from ollamakit.react import react_step
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL = "llama3"
 
+# Shared keep-alive client: every call reuses the same pooled connection.
+client = get_client()
+
+
 def ollama_chat(prompt):
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
-    r = requests.post(OLLAMA_URL, json=payload)
-    return r.json()["response"]
+    return client.generate(MODEL, prompt)["response"]
 
 
 def calculator(expression):
@@ -34,12 +35,15 @@ Your response format:
 Thought: ...
 Action: <tool>[<input>]
 """
-    thoughts = ollama_chat(reasoning_prompt + "\nUser query: " + prompt)
+    # Streamed with "Observation:" as a stop sequence; generation is cut off
+    # as soon as a complete Action line has been parsed.
+    step = react_step(MODEL, reasoning_prompt + "\nUser query: " + prompt, client=client)
+    thoughts = step.text
     print("LLM Thoughts + Action:\n", thoughts)
+    print("Stopped early:", step.stopped_early, "| tokens:", step.stats.get("tokens"))
 
     # 2. Extract the action
-    import re
-    match = re.search(r"Action:\s*(\w+)\[(.*?)\]", thoughts)
+    match = step.match
     if not match:
         return "No tool used. Final answer: " + thoughts
 
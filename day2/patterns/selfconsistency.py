@@ -1,41 +1,41 @@
-import requests
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL = "llama3"   # or any model you installed via `ollama pull`
 
-import requests
-import json
+# Shared keep-alive client: every call reuses the same pooled connection.
+client = get_client()
 
 
 def ollama_chat(prompt):
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
-    r = requests.post(OLLAMA_URL, json=payload)
-    return r.json()["response"]
+    return client.generate(MODEL, prompt)["response"]
+
+
+import asyncio
 
+from ollamakit.consistency import vote
 
-import collections
 
-def self_consistency(prompt, samples=5):
-    answers = []
-    for _ in range(samples):
-        ans = ollama_chat(prompt)
-        answers.append(ans.strip())
+def self_consistency(prompt, samples=5, concurrency=3):
+    # Samples run in parallel; answers are reduced to their final number
+    # before voting, and sampling stops once the winner can't change.
+    async def sample():
+        data = await client.agenerate(MODEL, prompt)
+        return data["response"].strip()
 
-    counter = collections.Counter(answers)
-    consensus = counter.most_common(1)[0][0]
+    result = asyncio.run(vote(sample, samples=samples, concurrency=concurrency))
 
     print("=== All Answers ===")
-    for a in answers:
+    for a in result["answers"]:
         print("-", a)
 
     print("\n=== Consensus Answer ===")
-    print(consensus)
-    return consensus
+    print(result["answer"])
+    print(f"(votes: {result['votes']}, samples needed: {result['samples_used']}/{samples})")
+    return result["answer"]
 
 # Test
 prompt = "A farmer has 17 sheep. All but 9 die. How many are left?"
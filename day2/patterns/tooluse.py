@@ -1,23 +1,26 @@
-import requests
-import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
+from ollamakit.cascade import CHEAP_MODEL, Cascade
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL = "llama3"   # or any model you installed via `ollama pull`
 
-import requests
-import json
+# Shared keep-alive client: every call reuses the same pooled connection.
+client = get_client()
 
 
 def ollama_chat(prompt):
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
-    r = requests.post(OLLAMA_URL, json=payload)
-    return r.json()["response"]
+    return client.generate(MODEL, prompt)["response"]
 
 
+# Picking the action is a one-line decision: try a small model first and only
+# escalate to MODEL when no well-formed "Action: ..." line comes back.
+action_cascade = Cascade(models=(CHEAP_MODEL, MODEL), client=client)
+ACTION_LINE = re.compile(r"Action:\s*(?:(\w+)\[(.*?)\]|none)")
+
 
 def get_weather(city):
     fake_data = {
@@ -27,6 +30,25 @@ def get_weather(city):
     }
     return fake_data.get(city.lower(), "No data")
 
+
+TOOLS = {"weather": get_weather}
+# The prompt shows "Action: weather[city]"; a small model often copies it as is.
+PLACEHOLDERS = {"city"}
+
+
+def valid_action(text):
+    """
+    Cascade validator: the "Action: ..." match if it calls a registered tool
+    with a real argument (or says none), else None so the cascade escalates.
+    """
+    match = ACTION_LINE.search(text)
+    if match is None or match.group(1) is None:
+        return match
+    tool, arg = match.group(1), match.group(2).strip()
+    if tool not in TOOLS or not arg or arg.lower() in PLACEHOLDERS:
+        return None
+    return match
+
 def agent_weather(query):
     # Step 1: Ask LLM what tool to call
     react_prompt = f"""
@@ -43,19 +65,18 @@ Action: none
 User query: {query}
 """
 
-    plan = ollama_chat(react_prompt)
-    print("LLM Decision:\n", plan)
-
-    import re
-    match = re.search(r"Action:\s*(\w+)\[(.*?)\]", plan)
+    decision = action_cascade.generate(react_prompt, validator=valid_action)
+    plan = decision.text
+    print(f"LLM Decision ({decision.model}):\n", plan)
 
+    match = decision.value
     if not match:
         return "Could not parse action"
 
     tool, arg = match.group(1), match.group(2)
 
-    if tool == "weather":
-        obs = get_weather(arg)
+    if tool in TOOLS:
+        obs = TOOLS[tool](match.group(2).strip())
     else:
         obs = "No tool used"
 
@@ -77,3 +98,4 @@ Give final answer to user.
 
 # Test
 agent_weather("What is the weather in Bangalore today?")
+print("Action cascade:", action_cascade.stats())
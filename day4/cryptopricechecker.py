@@ -1,5 +1,10 @@
 import requests
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.policy import CircuitOpenError, get_policy
 from pydantic import BaseModel, Field
 from langchain_core.tools import tool
 from langchain_ollama import ChatOllama
@@ -27,9 +32,13 @@ def get_crypto_price(coin_id: str, currency: str) -> str:
             "vs_currencies": currency.lower()
         }
         
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        def fetch():
+            response = requests.get(url, params=params, timeout=5)
+            response.raise_for_status()
+            return response.json()
+
+        # Retried with backoff; fails fast while CoinGecko's circuit is open.
+        data = get_policy().call(url, fetch)
         
         # Check if the data is valid and extract the price
         price_data = data.get(coin_id.lower(), {}).get(currency.lower())
@@ -40,7 +49,7 @@ def get_crypto_price(coin_id: str, currency: str) -> str:
         else:
             return f"Error: Could not find price data for {coin_id} in {currency}."
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, CircuitOpenError) as e:
         return f"An error occurred while fetching the price: The API is unavailable or request failed."
 
 # Define the list of tools and the map for execution
@@ -13,6 +13,12 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import CachedEmbeddings
+
 # --- A. Two Separate Data Sources ---
 # Source 1: Company Policy Documents
 policy_docs = [
@@ -26,7 +32,8 @@ procedure_docs = [
 ]
 
 # --- B. Embeddings and Two Vector Stores ---
-ollama_embeddings = OllamaEmbeddings(model="nomic-embed-text")
+# Vectors are cached on disk by (model, digest, text hash): re-runs only embed changed chunks.
+ollama_embeddings = CachedEmbeddings(OllamaEmbeddings(model="nomic-embed-text"))
 
 # Create two independent vector stores
 policy_vectorstore = FAISS.from_documents(policy_docs, ollama_embeddings)
@@ -7,6 +7,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import CachedEmbeddings
 
 # --- A. Synthetic Medical Records ---
 # In a real application, you would load these from files (PDF, JSON, EHR export).
@@ -52,7 +56,8 @@ docs = text_splitter.split_documents(documents)
 
 # 2. Initialize Ollama Embeddings (Uses nomic-embed-text or the model you pulled)
 print("Initializing Ollama Embeddings...")
-ollama_embeddings = OllamaEmbeddings(model="nomic-embed-text")
+# Vectors are cached on disk by (model, digest, text hash): re-runs only embed changed chunks.
+ollama_embeddings = CachedEmbeddings(OllamaEmbeddings(model="nomic-embed-text"))
 
 # 3. Create FAISS Vector Store
 # FAISS is an efficient, in-memory index for fast similarity search.
@@ -13,6 +13,12 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import CachedEmbeddings
+
 # --- A. Documents with Metadata ---
 # Metadata allows us to filter the documents before they are retrieved.
 trial_docs = [
@@ -25,7 +31,8 @@ trial_docs = [
 ]
 
 # --- B. Embedding and Filtering Setup ---
-ollama_embeddings = OllamaEmbeddings(model="nomic-embed-text")
+# Vectors are cached on disk by (model, digest, text hash): re-runs only embed changed chunks.
+ollama_embeddings = CachedEmbeddings(OllamaEmbeddings(model="nomic-embed-text"))
 vectorstore = FAISS.from_documents(trial_docs, ollama_embeddings)
 
 # Define a **specific retriever** that only retrieves documents where 'phase' equals 'Phase 1'
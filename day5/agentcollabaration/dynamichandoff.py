@@ -5,10 +5,26 @@ from langgraph.graph import StateGraph, END
 from typing import TypedDict, Annotated, List, Union
 import operator
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit.constrained import LabelChoice
 
 # --- 1. Ollama Configuration (Use your validated settings) ---
 ollama_llm = ChatOllama(model="llama3:latest", base_url="http://127.0.0.1:11434")
 
+# The routing call may only emit {"topic": "MATH" | "GENERAL"}: structured
+# output with an enum schema, greedy decoding and a few tokens at most.
+TOPIC = LabelChoice(["MATH", "GENERAL"], key="topic")
+router_llm = ChatOllama(
+    model="llama3:latest",
+    base_url="http://127.0.0.1:11434",
+    format=TOPIC.schema,
+    temperature=0,
+    num_predict=TOPIC.num_predict,
+)
+
 # --- 2. Define State ---
 class HandoffState(TypedDict):
     request: str
@@ -37,12 +53,11 @@ def router_agent_node(state: HandoffState):
     ]
     
     try:
-        response = ollama_llm.invoke(messages).content.strip()
-        decision = json.loads(response)
-        return {"topic": decision.get("topic", "GENERAL")}
+        topic = TOPIC.parse(router_llm.invoke(messages).content)
     except Exception:
-        # Fallback if Ollama doesn't produce valid JSON
-        return {"topic": "GENERAL"}
+        topic = None
+    # Fallback if Ollama doesn't produce a valid topic
+    return {"topic": topic or "GENERAL"}
 
 def specialist_agent_node(state: HandoffState):
     """
@@ -1,36 +1,52 @@
-# pip install httpx
+# pip install httpx requests
 import asyncio
-import httpx
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import OllamaClient
+from ollamakit.cache import DEFAULT_CACHE_DIR
+from ollamakit.deadlines import Hedger, LatencyTracker
+from ollamakit.fanout import fan_out
 
 # --- 1. Configuration ---
-OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL_NAME = "llama3"
-TIMEOUT_SECONDS = 300.0
+TIMEOUT_SECONDS = 300.0      # used until enough calls were timed, and as the cap
+MAX_CONCURRENCY = 4        # analysts allowed to run against Ollama at once
+TASK_DEADLINE_SECONDS = 120.0
+
+# Comma-separated Ollama base URLs, e.g. two boxes serving the same model
+# (the same variable as day1/ai2.py; a trailing /v1 is ignored here).
+ENDPOINTS = os.environ.get("OLLAMA_ENDPOINTS", "http://localhost:11434").split(",")
+
+# One shared client per endpoint: every task reuses the same pooled
+# connections instead of opening a new AsyncClient per call.
+# Once enough calls have been timed, each read timeout is 3x the observed
+# p99 instead of a flat TIMEOUT_SECONDS. A run only makes three calls, so
+# the latencies are kept on disk and the tracker warms up across runs.
+tracker = LatencyTracker(ceiling=TIMEOUT_SECONDS,
+                         path=os.path.join(DEFAULT_CACHE_DIR, "paralleleg_latency.json"))
+clients = [OllamaClient(url.strip().rstrip("/").removesuffix("/v1"),
+                        timeout=TIMEOUT_SECONDS, deadlines=tracker)
+           for url in ENDPOINTS]
+# With more than one endpoint, a call that is slower than its usual p95 is
+# duplicated onto the next one and the slower copy is cancelled.
+hedger = Hedger(clients, tracker)
+
 # --- 2. Worker Function (Async) ---
 async def fetch_ollama_response(prompt: str, task_name: str) -> dict:
     """Asynchronously calls the Ollama API for a specific task."""
     print(f"🤖 Starting {task_name}...")
-    
-    # Payload for the Ollama /generate endpoint
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": f"You are a specialized {task_name}. {prompt}. Output only the result.",
-        "stream": False 
+
+    data = await hedger.agenerate(
+        MODEL_NAME,
+        f"You are a specialized {task_name}. {prompt}. Output only the result.",
+    )
+    print(f"✅ {task_name} finished.")
+    return {
+        "task_name": task_name,
+        "result": data.get("response", "No response found")
     }
-    
-    # Use httpx for asynchronous requests
-    async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS) as client:
-        response = await client.post(OLLAMA_URL, json=payload)
-        response.raise_for_status()
-        
-        # Ollama returns a JSON response; extract the final 'response' field
-        data = response.json()
-        print(f"✅ {task_name} finished.")
-        return {
-            "task_name": task_name,
-            "result": data.get("response", "No response found")
-        }
 
 # --- 3. Coordinator/Aggregator Function ---
 async def run_parallel_analysis(user_query: str):
@@ -39,27 +55,38 @@ async def run_parallel_analysis(user_query: str):
         (f"Analyze the market sentiment for 'Tesla' based on general news over the past 48 hours. Query: {user_query}", "Sentiment Analyst"),
         (f"Determine the key financial risks for 'Tesla' in Q3 2024 based on expert opinions. Query: {user_query}", "Financial Risk Analyst")
     ]
-    
-    # Create the list of concurrent tasks
-    tasks = [
-        fetch_ollama_response(prompt, task_name)
+
+    jobs = [
+        (task_name, lambda p=prompt, t=task_name: fetch_ollama_response(p, t))
         for prompt, task_name in prompts_and_tasks
     ]
-    
-    # Run all tasks concurrently
-    parallel_results = await asyncio.gather(*tasks)
-    
+
+    # Reports are added to the aggregation prompt as each analyst finishes,
+    # so a slow or timed-out analyst doesn't hold the others back.
+    reports = []
+    async for task_name, result in fan_out(jobs, concurrency=MAX_CONCURRENCY,
+                                           deadline=TASK_DEADLINE_SECONDS):
+        if isinstance(result, Exception):
+            print(f"⚠️ {task_name} failed: {result!r}")
+            continue
+        reports.append(f"{len(reports) + 1}. {task_name} Report: {result['result']}")
+
     # --- Aggregation (Final Ollama Call) ---
+    report_block = "\n    ".join(reports)
     aggregation_prompt = f"""
-    You are the Final Investment Strategist. Synthesize the following two reports into a single, cohesive investment recommendation for Tesla.
+    You are the Final Investment Strategist. Synthesize the following reports into a single, cohesive investment recommendation for Tesla.
     
-    1. Sentiment Report: {parallel_results[0]['result']}
-    2. Financial Risk Report: {parallel_results[1]['result']}
+    {report_block}
     
     Provide a final 'BUY', 'HOLD', or 'SELL' recommendation and a brief justification.
     """
 
     final_result = await fetch_ollama_response(aggregation_prompt, "Aggregator")
+    if len(clients) > 1:
+        print("Hedging:", hedger.stats())
+    tracker.save()
+    for client in clients:
+        await client.aclose()
     return final_result
 
 # --- 4. Run the Workflow ---
@@ -67,4 +94,4 @@ if __name__ == "__main__":
      user_input = "Give me an investment summary for Tesla."
      final_report = asyncio.run(run_parallel_analysis(user_input))
      print("\n--- Parallel/Aggregation Workflow Result ---")
-     print(final_report['result'])
\ No newline at end of file
+     print(final_report['result'])
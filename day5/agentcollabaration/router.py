@@ -4,19 +4,32 @@ A "Gatekeeper" agent analyzes the user request and decides which specialist agen
 
 Pattern: User -> Router -> (Agent A OR Agent B OR Agent C)
 """
+import os
+import sys
+
 import ollama
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit.cascade import CHEAP_MODEL, Cascade
+from ollamakit.constrained import LabelChoice
+
+# The routing decision is a one-word answer: a small model handles it and
+# llama3 is only consulted when the reply isn't exactly one category.
+router_cascade = Cascade(models=(CHEAP_MODEL, "llama3"))
+# Structured output restricted to the three categories, capped at a few tokens.
+ROUTES = LabelChoice(["MATH", "WRITING", "TECH_SUPPORT"], key="category")
+
 def router_pattern(user_query):
     print(f"User Query: {user_query}")
     
     # 1. Router Agent (Classifier)
-    # We force the output to be a single word for easy parsing
-    router_response = ollama.chat(model='llama3', messages=[
+    # We force the output to be one of the categories for easy parsing
+    router_result = router_cascade.chat([
         {'role': 'system', 'content': 'You are a router. Classify the query into exactly one of these categories: "MATH", "WRITING", "TECH_SUPPORT". Do not add punctuation or other text.'},
         {'role': 'user', 'content': user_query},
-    ])
-    category = router_response['message']['content'].strip().upper()
-    print(f"Router decided: {category}")
+    ], validator=ROUTES.parse, **ROUTES.request())
+    category = (router_result.value or router_result.text).upper()
+    print(f"Router decided: {category} (by {router_result.model})")
 
     # 2. Handoff to Specialist
     if "MATH" in category:
@@ -35,4 +48,5 @@ def router_pattern(user_query):
 
 # Usage Examples:
 router_pattern("Calculate the square root of 144")
-router_pattern("Write a poem about rust")
\ No newline at end of file
+router_pattern("Write a poem about rust")
+print("Router cascade:", router_cascade.stats())
\ No newline at end of file
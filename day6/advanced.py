@@ -11,6 +11,11 @@ except ImportError:
     requests = None
     print("Warning: 'requests' library not found. Please run 'pip install requests' to use the live Ollama connection.")
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
 # ==========================================
 # 1. ADVANCED TOOLS IMPLEMENTATION
 # ==========================================
@@ -166,13 +171,18 @@ def call_ollama(prompt: str) -> Dict[str, Any]:
         if requests is None:
             raise ImportError("Requests library not available.")
 
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        
+        # Retries with jittered backoff and a circuit breaker (ollamakit/policy.py)
+        from ollamakit.policy import get_policy
+
+        def post_generate():
+            response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
+            response.raise_for_status()
+            return response.json()
+
         # 4. Parse Response
         # Ollama's 'generate' endpoint returns the text in the 'response' key.
         # Since we asked for format='json', this text should be a JSON string.
-        response_json = response.json()
+        response_json = get_policy().call(OLLAMA_API_URL, post_generate)
         llm_output_text = response_json.get("response", "")
         
         # Parse the inner JSON created by the LLM
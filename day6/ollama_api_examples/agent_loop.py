@@ -1,14 +1,17 @@
 
-import requests
+import os
+import sys
 
-def call_ollama(msg):
-    r = requests.post("http://localhost:11434/api/generate",
-                      json={"model": "llama3", "prompt": msg})
-    return r.json().get("response", "")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit.session import ConversationSession
 
-context = "You are a tool-using agent."
+# Each turn continues from the context tokens Ollama returned last time, so
+# only the new user message is evaluated instead of the whole history.
+session = ConversationSession("llama3", system="You are a tool-using agent.")
 
 while True:
     user = input("User: ")
-    prompt = f"{context}\nUser: {user}\nAssistant:"
-    print(call_ollama(prompt))
+    print(session.send(user))
+    turn = session.turns[-1]
+    print(f"[{turn['mode']}: {turn['prompt_eval_count']} prompt tokens, "
+          f"{turn['carried_tokens']} carried, ~{turn['saved_ms_est']:.0f} ms saved]")
@@ -1,10 +1,13 @@
+import os
+import sys
 
-import requests
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
-url = "http://localhost:11434/api/generate"
-payload = {"model": "llama3", "prompt": "Explain what an API is."}
-
-resp = requests.post(url, json=payload, stream=True)
-for line in resp.iter_lines():
-    if line:
-        print(line.decode())
+# Tokens are printed as they stream in; stats() reports time-to-first-token,
+# tokens/sec and Ollama's final timing fields.
+stream = get_client().stream_generate("llama3", "Explain what an API is.")
+for token in stream:
+    print(token, end="", flush=True)
+print()
+print(stream.stats())
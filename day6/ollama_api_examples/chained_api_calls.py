@@ -1,9 +1,17 @@
 
+import os
+import sys
+
 import requests
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit.projection import project
+
 stock = requests.get("https://dummyjson.com/quotes/1").json()
+quote = project(stock, source="dummyjson_quote", budget=200)
+print(quote.report())
 
-prompt = f"Analyze this stock quote and return JSON: {stock}"
+prompt = f"Analyze this stock quote and return JSON: {quote}"
 
 res = requests.post("http://localhost:11434/api/generate",
                     json={"model": "llama3", "prompt": prompt})
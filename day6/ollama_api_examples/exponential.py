@@ -1,11 +1,33 @@
-import time
-retry=1
-while True:
-    try:
-        raise Exception("Some exception")
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit.policy import CircuitOpenError, RetryPolicy
+
+# Instead of retrying forever with a growing fixed delay, the policy:
+# - waits with decorrelated-jitter exponential backoff (no synchronized retry storms)
+# - gives up after max_tries or when the retry budget is spent
+# - opens a per-endpoint circuit after repeated failures and fails fast
+#   until reset_timeout has passed, then lets a single probe through
+policy = RetryPolicy(max_tries=4, base=0.5, cap=10.0, failure_threshold=3, reset_timeout=15.0)
+
+URL = "http://localhost:11434/api/tags"
 
+
+@policy.wrap(URL)
+def list_models():
+    r = requests.get(URL, timeout=5)
+    r.raise_for_status()
+    return r.json()
+
+
+for attempt in range(5):
+    try:
+        print([m["name"] for m in list_models().get("models", [])])
+    except CircuitOpenError as e:
+        print("skipped:", e)
     except Exception as e:
-        print("exception",e)
-        print("Retrying after",retry)
-        time.sleep(retry)
-        retry =retry + 5
+        print("exception", e)
+print(policy.stats())
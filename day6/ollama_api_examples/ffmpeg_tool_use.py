@@ -1,5 +1,10 @@
 
-import subprocess, json, requests
+import subprocess, json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
 cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", "-show_streams", "sample.mp4"]
 meta = subprocess.run(cmd, capture_output=True, text=True)
@@ -7,10 +12,8 @@ data = meta.stdout
 
 prompt = f"Analyze this video metadata: {data}"
 
-res = requests.post("http://localhost:11434/api/generate",
-                    json={"model": "llama3", "prompt": prompt},
-                    stream=True)
-
-for l in res.iter_lines():
-    if l:
-        print(l.decode())
+stream = get_client().stream_generate("llama3", prompt)
+for token in stream:
+    print(token, end="", flush=True)
+print()
+print(stream.stats())
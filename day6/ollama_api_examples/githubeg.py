@@ -1,15 +1,25 @@
 import requests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
+from ollamakit.projection import project
 
 # 1. Get GitHub repo metadata
 repo = "tensorflow/tensorflow"
 url = f"https://api.github.com/repos/{repo}"
 github_data = requests.get(url).json()
 
+# Keep only the fields the prompt asks about (no URLs, node ids, etc.)
+repo_info = project(github_data, source="github_repo", budget=400)
+print(repo_info.report())
+
 # 2. Summarize using Ollama
 prompt = f"""
 Summarize this GitHub repository for a beginner:
 
-{github_data}
+{repo_info}
 
 Explain:
 - What the project does
@@ -18,12 +28,8 @@ Explain:
 - Licensing
 """
 
-ollama_res = requests.post(
-    "http://localhost:11434/api/generate",
-    json={"model": "mistral", "prompt": prompt},
-    stream=True
-)
-
-for c in ollama_res.iter_lines():
-    if c:
-        print(c.decode())
+stream = get_client().stream_generate("mistral", prompt)
+for token in stream:
+    print(token, end="", flush=True)
+print()
+print(stream.stats())
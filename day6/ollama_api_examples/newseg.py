@@ -1,5 +1,10 @@
 import requests
 from bs4 import BeautifulSoup
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
 url = "https://news.ycombinator.com/"
 html = requests.get(url).text
@@ -15,12 +20,8 @@ Summarize these news headlines:
 Return output in bullets.
 """
 
-res = requests.post(
-    "http://localhost:11434/api/generate",
-    json={"model": "mistral", "prompt": prompt},
-    stream=True
-)
-import json
-for line in res.iter_lines():
-    if line:
-        print(json.loads(line.decode())["response"])
+stream = get_client().stream_generate("mistral", prompt)
+for token in stream:
+    print(token, end="", flush=True)
+print()
+print(stream.stats())
@@ -1,13 +1,25 @@
 import time
 import requests
-import ollama
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import OllamaClient
+from ollamakit.admission import get_admission
 
 # --- Configuration ---
 ISS_API_URL = "http://api.open-notify.org/iss-now.json"
 OLLAMA_MODEL = "mistral" # Use a fast model like llama3 or mistral
 POLLING_INTERVAL = 30 # Poll every 30 seconds
 
+# Background polling runs as "batch" traffic through the process-wide
+# controller. Run on its own this script has nothing to yield to; the
+# priority only takes effect when the poller runs inside a process whose
+# interactive calls go through get_admission() too. Separate processes
+# hitting the same Ollama host are not gated against each other.
+client = OllamaClient(admission=get_admission(), priority="batch")
+
 # --- Agent Action (Tool) ---
 def print_location_alert(summary: str, timestamp: str):
     """Prints a clear, formatted alert based on the agent's summary."""
@@ -46,9 +58,9 @@ def analyze_iss_location(iss_data: dict):
 
     try:
         # 2. Invoke Ollama LLM
-        response = ollama.chat(
-            model=OLLAMA_MODEL,
-            messages=[
+        response = client.chat(
+            OLLAMA_MODEL,
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ],
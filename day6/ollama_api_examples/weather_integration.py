@@ -1,5 +1,10 @@
 
 import requests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
 weather = requests.get(
     "https://api.open-meteo.com/v1/forecast?latitude=12.97&longitude=77.59&hourly=temperature_2m"
@@ -8,12 +13,8 @@ weather = requests.get(
 print("weayjer",)
 prompt = f"Summarize this weather data: {weather['hourly']['temperature_2m'][:5]}"
 
-resp = requests.post(
-    "http://localhost:11434/api/generate",
-    json={"model": "mistral", "prompt": prompt},
-    stream=True
-)
-import json
-for line in resp.iter_lines():
-    if line:
-        print(json.loads(line.decode())["response"])
+stream = get_client().stream_generate("mistral", prompt)
+for token in stream:
+    print(token, end="", flush=True)
+print()
+print(stream.stats())
@@ -1,8 +1,13 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
-import ollama
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import OllamaClient
+from ollamakit.singleflight import SingleFlight
 
 # --- 1. Agent Output Structure (for structured LLM response) ---
 # We define the desired output format using Pydantic.
@@ -28,8 +33,13 @@ app = FastAPI(
 
 OLLAMA_MODEL = "llama3" # Ensure this model is pulled locally
 
+# Webhook senders retry on slow responses; with single-flight a retried
+# delivery joins the analysis already running instead of starting another.
+singleflight = SingleFlight()
+client = OllamaClient(singleflight=singleflight)
+
 # --- Agent Core Logic (Reasoning & Structured Output) ---
-def analyze_incident(payload: WebhookPayload) -> IncidentAnalysis:
+async def analyze_incident(payload: WebhookPayload) -> IncidentAnalysis:
     """
     Sends the incoming webhook data to the Ollama LLM for reasoning.
     """
@@ -46,9 +56,9 @@ def analyze_incident(payload: WebhookPayload) -> IncidentAnalysis:
 
     try:
         # Use the ollama generate endpoint for structured JSON output
-        response = ollama.generate(
-            model=OLLAMA_MODEL,
-            prompt=user_message,
+        response = await client.agenerate(
+            OLLAMA_MODEL,
+            user_message,
             system=system_prompt,
             format='json'
         )
@@ -79,7 +89,7 @@ async def receive_webhook(payload: WebhookPayload):
     print("="*50)
 
     # 1. Agent Reasoning
-    analysis = analyze_incident(payload)
+    analysis = await analyze_incident(payload)
 
     # 2. Agent Action (Log the result)
     print("✅ AGENT ANALYSIS COMPLETE:")
@@ -87,6 +97,7 @@ async def receive_webhook(payload: WebhookPayload):
     print(f"  Severity: **{analysis.severity.upper()}**")
     print(f"  Action: {analysis.suggested_action}")
     print(f"  Summary: {analysis.summary}")
+    print(f"  Collapsed duplicate requests so far: {singleflight.collapsed}")
     print("="*50 + "\n")
 
     return {"status": "Analysis complete", "analysis": analysis.model_dump()}
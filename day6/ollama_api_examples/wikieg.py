@@ -1,20 +1,26 @@
 import requests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
+from ollamakit.projection import project
 
 topic = "Apache Spark"
 url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic}"
 
-wiki_data = requests.get(url,headers={"User-Agent":"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"}).text
-print(wiki_data)
+wiki_data = requests.get(url,headers={"User-Agent":"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"}).json()
+# Only the title, short description and extract are useful to the prompt.
+wiki_info = project(wiki_data, source="wikipedia_summary", budget=600)
+print(wiki_info.report())
 prompt = f"""
 Explain this topic in simple words:
 
-{wiki_data}
+{wiki_info}
 """
 
-res = requests.post("http://localhost:11434/api/generate",
-                    json={"model": "mistral", "prompt": prompt},
-                    stream=True)
-
-for l in res.iter_lines():
-    if l:
-        print(l.decode())
+stream = get_client().stream_generate("mistral", prompt)
+for token in stream:
+    print(token, end="", flush=True)
+print()
+print(stream.stats())
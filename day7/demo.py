@@ -17,11 +17,17 @@ By default, Ollama must be running locally at:
     http://localhost:11434
 """
 
+import os
+import sys
 import ollama
 import time
 import logging
 from typing import Dict, List, Callable, Any
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.react import LINE_ACTION, REACT_STOP, parse_react
+from ollamakit.session import ConversationSession
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s  [%(levelname)s]  %(message)s")
 
 # --------------------------------------------------------------------
@@ -159,35 +165,34 @@ def execute_step(step: str):
 def react_loop(goal: str, context: str = "", max_iters: int = 5):
     """
     A lightweight ReAct planning loop using Ollama.
+
+    Turns continue from Ollama's context tokens, so each iteration only
+    evaluates the new observation rather than the whole transcript.
     """
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You follow Thought → Action → Observation loop. "
-                "Prefer tool calls using CALL_TOOL:<tool>:<arg>. "
-                "Stop when the goal is achieved and say DONE."
-            )
-        },
-        {
-            "role": "user",
-            "content": f"Goal: {goal}\nContext: {context}\nBegin."
-        }
-    ]
+    session = ConversationSession(
+        MODEL,
+        system=(
+            "You follow Thought → Action → Observation loop. "
+            "Prefer tool calls using CALL_TOOL:<tool>:<arg>. "
+            "Stop when the goal is achieved and say DONE."
+        ),
+    )
+    message = f"Goal: {goal}\nContext: {context}\nBegin."
 
     for i in range(max_iters):
         logging.info(f"ReAct Iteration {i+1}")
-        reply = llm(messages)
+        # "Observation:" is a stop sequence, so the model can't invent the
+        # tool result. The turn is not cancelled client-side: Ollama only
+        # returns the context tokens the session continues from on a
+        # completed reply.
+        reply = session.send(message, options={"stop": REACT_STOP}).strip()
 
         # Extract Thought & Action
-        thought, action = "", ""
-        for line in reply.split("\n"):
-            if line.lower().startswith("thought:"):
-                thought = line.split(":", 1)[1].strip()
-            if line.lower().startswith("action:"):
-                action = line.split(":", 1)[1].strip()
+        step = parse_react(reply, LINE_ACTION)
+        thought, action = step.thought, step.action or ""
 
         if "DONE" in action.upper():
+            logging.info(f"Session: {session.stats()}")
             return {"ok": True, "result": "Goal achieved"}
 
         # Execute action
@@ -195,8 +200,7 @@ def react_loop(goal: str, context: str = "", max_iters: int = 5):
         observation = result["result"] if result["ok"] else result.get("error", "")
 
         # Feed back observation
-        messages.append({"role": "assistant", "content": reply})
-        messages.append({"role": "user",      "content": f"Observation: {observation}"})
+        message = f"Observation: {observation}"
 
         time.sleep(0.25)
 
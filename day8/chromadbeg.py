@@ -10,6 +10,10 @@ from langchain_classic.chains.retrieval import create_retrieval_chain
 from langchain_classic.chains.combine_documents.stuff import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import CachedEmbeddings
 
 # --- Configuration ---
 OLLAMA_LLM_MODEL = "mistral"
@@ -57,7 +61,8 @@ def setup_chroma_db(documents: list[Document]) -> Chroma:
     print(f"[Setup] Document split into {len(docs_chunks)} chunks.")
     
     # 3. Define the Ollama Embedding Model
-    ollama_embeddings = OllamaEmbeddings(model=OLLAMA_EMBEDDING_MODEL)
+    # Cached on disk by (model, digest, text hash): re-runs only embed changed chunks.
+    ollama_embeddings = CachedEmbeddings(OllamaEmbeddings(model=OLLAMA_EMBEDDING_MODEL))
     print(f"[Setup] Using Ollama model '{OLLAMA_EMBEDDING_MODEL}' for embeddings.")
 
     # 4. Create the Vector Store (ChromaDB)
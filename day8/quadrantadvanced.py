@@ -1,17 +1,30 @@
+import os
+import sys
+
 import ollama
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance, Filter, FieldCondition, MatchValue
+from qdrant_client.models import VectorParams, Distance, Filter, FieldCondition, MatchValue
 
 # Configuration
 EMBED_MODEL = "nomic-embed-text" # Make sure to: ollama pull nomic-embed-text
 CHAT_MODEL = "llama3"
 COLLECTION_NAME = "connected_data"
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.cascade import CHEAP_MODEL, Cascade, enum_validator
+from ollamakit.embedcache import get_embedding_cache
+from ollamakit.ingest import ingest
+
+# The planner only picks 'hr' or 'it': a small model answers and CHAT_MODEL
+# is consulted only when the reply isn't exactly one of them.
+planner = Cascade(models=(CHEAP_MODEL, CHAT_MODEL))
+DEPARTMENTS = enum_validator(["hr", "it"])
+
 client = QdrantClient("http://localhost:6333")
 
 def get_embedding(text):
     """Bridge: Converts text into a vector that Qdrant can understand."""
-    return ollama.embed(model=EMBED_MODEL, input=text)['embeddings'][0]
+    return get_embedding_cache().embed(EMBED_MODEL, text)
 
 def setup_database():
     """Ingestion: Putting real data into the brain."""
@@ -27,18 +40,25 @@ def setup_database():
         vectors_config=VectorParams(size=768, distance=Distance.COSINE)
     )
 
-    points = [
-        PointStruct(id=item['id'], vector=get_embedding(item['text']), payload=item)
-        for item in data
-    ]
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
+    # Embedded in list batches and upserted as batches arrive (ollamakit/ingest.py)
+    report = ingest(
+        client, COLLECTION_NAME,
+        [item['text'] for item in data],
+        payloads=data,
+        ids=[item['id'] for item in data],
+        model=EMBED_MODEL,
+        cache=get_embedding_cache(),
+    )
+    print(f"📥 {report}")
 
 def connected_agent(question):
     print(f"👤 User: {question}")
 
     # 1. PLANNER: Determine which department to search in
     planner_prompt = f"Categorize this question into 'hr' or 'it': '{question}'. Return only the word."
-    dept = ollama.generate(model=CHAT_MODEL, prompt=planner_prompt)['response'].strip().lower()
+    plan = planner.generate(planner_prompt, validator=DEPARTMENTS)
+    dept = plan.value or plan.text.lower()
+    print(f"🧭 Planner ({plan.model}): {dept}")
 
     # 2. TOOLS: Search using the vector of the ACTUAL question
     query_vector = get_embedding(question) # This creates the RELATION
@@ -66,4 +86,5 @@ def connected_agent(question):
 
 if __name__ == "__main__":
     setup_database()
-    connected_agent("What is the WiFi password?")
\ No newline at end of file
+    connected_agent("What is the WiFi password?")
+    print("Planner cascade:", planner.stats())
\ No newline at end of file
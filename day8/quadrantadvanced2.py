@@ -1,14 +1,27 @@
-import ollama
+import os
+import sys
+
 from qdrant_client import QdrantClient, models
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import get_embedding_cache
+from ollamakit.ingest import ingest
+from ollamakit.scheduler import ModelAffinityScheduler
+
 # --- 1. INITIALIZATION ---
 client = QdrantClient("http://localhost:6333")
 COLLECTION = "agent_knowledge"
 EMBED_MODEL = "nomic-embed-text"
 LLM_MODEL = "llama3"
 
+# Each agent step alternates llama3 and nomic-embed-text calls. LLM calls go
+# through the scheduler, which pins llama3 (resident for 10 minutes after
+# its last call) so the embedding calls in between don't get it unloaded,
+# and reports each call's load time.
+scheduler = ModelAffinityScheduler()
+
 def get_embedding(text):
-    return ollama.embed(model=EMBED_MODEL, input=text)['embeddings'][0]
+    return get_embedding_cache().embed(EMBED_MODEL, text)
 
 # --- 2. THE AGENT'S TOOL (Search) ---
 def search_tool(query):
@@ -37,7 +50,7 @@ class Agent:
         If Yes, what specific keyword should you search for?
         Format: Answer | Keyword
         """
-        plan = ollama.generate(model=LLM_MODEL, prompt=planner_prompt)['response']
+        plan = scheduler.generate(LLM_MODEL, planner_prompt)['response']
         print(f"🧠 THOUGHT: {plan}")
 
         # STAGE 2: EXECUTION (The Agent uses the tool)
@@ -53,7 +66,7 @@ class Agent:
         Context found: {context}
         Provide a final, helpful answer.
         """
-        response = ollama.generate(model=LLM_MODEL, prompt=final_prompt)['response']
+        response = scheduler.generate(LLM_MODEL, final_prompt)['response']
         print(f"🏁 FINAL OUTPUT: {response}\n")
 
 # --- 4. DATA SETUP & RUN ---
@@ -62,10 +75,15 @@ def setup_data():
     client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE))
     
     docs = ["The company's server room password is 'Blue-Sky-99'.", "Manager: Sarah Chen."]
-    points = [models.PointStruct(id=i, vector=get_embedding(t), payload={"document": t}) for i, t in enumerate(docs)]
-    client.upsert(COLLECTION, points=points)
+    # Embedded in list batches and upserted as batches arrive (ollamakit/ingest.py)
+    report = ingest(client, COLLECTION, docs, payloads=[{"document": t} for t in docs], model=EMBED_MODEL,
+                    cache=get_embedding_cache())
+    print(f"📥 {report}")
 
 if __name__ == "__main__":
     setup_data()
+    scheduler.pin(LLM_MODEL, keep_alive="10m", embedding=False)
     my_agent = Agent()
-    my_agent.run("I need to get into the server room. What is the password?")
\ No newline at end of file
+    my_agent.run("I need to get into the server room. What is the password?")
+    scheduler.close()
+    print(f"⏱️ Model loads: {scheduler.stats()['models']}")
@@ -1,11 +1,18 @@
+import os
+import sys
+
 import ollama
 from qdrant_client import QdrantClient, models
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import get_embedding_cache
+from ollamakit.ingest import ingest
+
 client = QdrantClient("http://localhost:6333")
 COLLECTION = "enterprise_v2"
 
 def get_embed(text):
-    return ollama.embed(model="nomic-embed-text", input=text)['embeddings'][0]
+    return get_embedding_cache().embed("nomic-embed-text", text)
 
 def setup_real_data():
     if client.collection_exists(COLLECTION): client.delete_collection(COLLECTION)
@@ -16,8 +23,9 @@ def setup_real_data():
         "Project Aegis has an officially allocated budget of $10,000.",
         "The project manager is Sarah Chen."
     ]
-    points = [models.PointStruct(id=i, vector=get_embed(f), payload={"text": f}) for i, f in enumerate(real_facts)]
-    client.upsert(COLLECTION, points=points)
+    # Embedded in list batches and upserted as batches arrive (ollamakit/ingest.py)
+    report = ingest(client, COLLECTION, real_facts, model="nomic-embed-text", cache=get_embedding_cache())
+    print(f"📥 {report}")
     print("✅ Database updated with REAL budget: $10,000")
 
 def search_tool(query):
@@ -2,6 +2,11 @@ import streamlit as st
 import pandas as pd
 import requests
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ollamakit import get_client
 
 # --- Page Setup ---
 st.set_page_config(layout="centered", page_title="Simple Widgets Demo")
@@ -28,14 +33,8 @@ if st.button("GET DATA"):
 
     prompt = f"Summarize this weather data: {weather['hourly']['temperature_2m'][:5]}"
     st.write("LLM Working")
-    resp = requests.post(
-        "http://localhost:11434/api/generate",
-        json={"model": "mistral", "prompt": prompt},
-        stream=True
-    )
-    res =""
-    for line in resp.iter_lines():
-        if line:
-           res =res +" " +(json.loads(line.decode())["response"])
-    st.write(res)
+    stream = get_client().stream_generate("mistral", prompt)
+    st.write_stream(stream)
+    stats = stream.stats()
+    st.caption(f"Time to first token: {stats['ttft_ms'] or 0:.0f} ms | {stats['tokens_per_sec'] or 0:.1f} tokens/sec")
 
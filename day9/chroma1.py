@@ -6,6 +6,10 @@ from langchain_ollama import ChatOllama
 from langchain_ollama import OllamaEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.embedcache import CachedEmbeddings
 
 # --- 1. INDEXING PHASE: Setup ChromaDB ---
 # Define the data
@@ -16,7 +20,8 @@ documents = [
 ]
 
 # 1a. Initialize local Ollama Embeddings
-ollama_embeddings = OllamaEmbeddings(model="nomic-embed-text") 
+# Vectors are cached on disk by (model, digest, text hash): re-runs only embed changed chunks.
+ollama_embeddings = CachedEmbeddings(OllamaEmbeddings(model="nomic-embed-text"))
 
 # 1b. Create or Load the ChromaDB Vectorstore
 # We create a new collection in a local directory
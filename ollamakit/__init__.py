@@ -0,0 +1,11 @@
+"""
+Shared helpers for talking to a local Ollama server from the course scripts.
+
+Scripts outside this folder add the repo root to ``sys.path`` and then
+``from ollamakit import get_client``.
+"""
+
+from .client import OllamaClient, get_client
+from .streaming import TokenStream
+
+__all__ = ["OllamaClient", "TokenStream", "get_client"]
@@ -0,0 +1,194 @@
+"""
+Priority admission control for LLM traffic.
+
+Requests are admitted through per-class queues. A free slot goes to the
+class with the lowest stride-scheduling "pass" value (weighted fair
+queuing), so interactive traffic gets most of the capacity while batch
+traffic still progresses at its weighted share instead of starving. Each
+class also has its own cap on outstanding requests, and queue time is
+measured per class.
+"""
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+
+from .stats import percentile
+
+DEFAULT_CLASSES = {
+    "interactive": {"weight": 8, "max_outstanding": 4},
+    "batch": {"weight": 1, "max_outstanding": 2},
+}
+
+_priority = contextvars.ContextVar("ollamakit_priority", default=None)
+
+
+class _Class:
+    def __init__(self, name, weight, max_outstanding):
+        self.name = name
+        self.weight = weight
+        self.max_outstanding = max_outstanding
+        self.outstanding = 0
+        self.pass_value = 0.0
+        self.waiters = collections.deque()
+        self.queue_times_ms = collections.deque(maxlen=1000)
+        self.admitted = 0
+
+
+class _Waiter:
+    def __init__(self, grant):
+        self.grant = grant  # callable invoked (under the lock) when admitted
+        self.enqueued_at = time.perf_counter()
+        self.cancelled = False
+
+
+class AdmissionController:
+    """
+    ``classes`` maps a class name to ``{"weight": w, "max_outstanding": n}``;
+    ``max_outstanding`` caps requests in flight across all classes.
+    """
+
+    def __init__(self, classes=None, max_outstanding=4, default_class="interactive"):
+        classes = classes or DEFAULT_CLASSES
+        self.classes = {name: _Class(name, **cfg) for name, cfg in classes.items()}
+        self.max_outstanding = max_outstanding
+        self.default_class = default_class
+        self.outstanding = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def priority(name):
+        """Runs every call made inside the block under priority class ``name``."""
+        token = _priority.set(name)
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    def _class(self, name):
+        # A priority() block wins over the fallback passed in by the client.
+        name = _priority.get() or name or self.default_class
+        return self.classes[name]
+
+    # ---------------------------------------------
+    # Scheduling (caller holds the lock)
+    # ---------------------------------------------
+    def _dispatch(self):
+        while self.outstanding < self.max_outstanding:
+            eligible = [
+                c for c in self.classes.values()
+                if c.waiters and c.outstanding < c.max_outstanding
+            ]
+            if not eligible:
+                return
+            cls = min(eligible, key=lambda c: c.pass_value)
+            waiter = cls.waiters.popleft()
+            if waiter.cancelled:
+                continue
+            # Stride scheduling: a class's pass advances by 1/weight per
+            # admission; an idle class rejoins at the current minimum so it
+            # can't bank credit while it had nothing queued.
+            cls.pass_value += 1.0 / cls.weight
+            cls.outstanding += 1
+            cls.admitted += 1
+            self.outstanding += 1
+            cls.queue_times_ms.append((time.perf_counter() - waiter.enqueued_at) * 1000)
+            waiter.grant()
+
+    def _enqueue(self, cls, waiter):
+        if not cls.waiters and cls.outstanding == 0:
+            active = [c.pass_value for c in self.classes.values() if c.waiters or c.outstanding]
+            if active:
+                cls.pass_value = max(cls.pass_value, min(active))
+        cls.waiters.append(waiter)
+        self._dispatch()
+
+    def release(self, cls):
+        with self._lock:
+            cls.outstanding -= 1
+            self.outstanding -= 1
+            self._dispatch()
+
+    # ---------------------------------------------
+    # Entry points
+    # ---------------------------------------------
+    @contextlib.contextmanager
+    def admit(self, priority=None):
+        """Blocks until a slot for ``priority`` is free; releases it on exit."""
+        cls = self._class(priority)
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        with self._lock:
+            self._enqueue(cls, waiter)
+        event.wait()
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    @contextlib.asynccontextmanager
+    async def aadmit(self, priority=None):
+        cls = self._class(priority)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = _Waiter(grant)
+        with self._lock:
+            self._enqueue(cls, waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter not in cls.waiters
+                waiter.cancelled = True
+            if granted:
+                self.release(cls)
+            raise
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    def acquire(self, priority=None):
+        """Blocking acquire for callers that release later (e.g. streams)."""
+        cls = self._class(priority)
+        event = threading.Event()
+        with self._lock:
+            self._enqueue(cls, _Waiter(event.set))
+        event.wait()
+        return lambda: self.release(cls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                c.name: {
+                    "outstanding": c.outstanding,
+                    "queued": sum(1 for w in c.waiters if not w.cancelled),
+                    "admitted": c.admitted,
+                    "queue_p50_ms": percentile(list(c.queue_times_ms), 50),
+                    "queue_p95_ms": percentile(list(c.queue_times_ms), 95),
+                }
+                for c in self.classes.values()
+            }
+
+
+_default_admission = None
+
+
+def get_admission():
+    """
+    Returns the process-wide shared AdmissionController. Priorities only
+    matter between callers that go through the same controller, so
+    everything in one process that should be ordered shares this one.
+    """
+    global _default_admission
+    if _default_admission is None:
+        _default_admission = AdmissionController()
+    return _default_admission
@@ -0,0 +1,274 @@
+"""
+Client-side concurrency autotuning for Ollama calls.
+
+How many requests one Ollama server can usefully run at once depends on
+``OLLAMA_NUM_PARALLEL``, the model and the hardware. ``ConcurrencyTuner``
+finds it per model instead of hand-tuning:
+
+1. Probe: start at ``initial_limit`` requests in flight and double the
+   limit while the aggregate tokens/sec keeps improving by at least
+   ``knee_gain``. Where it stops improving (the knee), the limit settles on
+   the previous level.
+2. Steady: AIMD on latency per generated token. A window of completions
+   that is much slower than the baseline (or that saw timeouts/5xx)
+   multiplies the limit by ``decrease``; a healthy window adds one.
+
+Levels are only judged while callers actually offer more work than the
+limit allows, so a script that never saturates the limit doesn't push it up.
+A window is normally ``max(min_window, 2 * limit)`` completions; when a
+burst of work drains before it fills, the partial window is judged as long
+as it covers at least one full round of ``limit`` calls.
+"""
+
+import asyncio
+import collections
+import threading
+import time
+
+from .stats import percentile
+from .policy import is_retryable
+
+
+class _Waiter:
+    def __init__(self, grant):
+        self.grant = grant
+        self.cancelled = False
+
+
+class _ModelLimit:
+    def __init__(self, start):
+        self.limit = start
+        self.phase = "probe"
+        self.inflight = 0
+        self.waiters = collections.deque()
+
+        self.curve = {}            # probed limit -> aggregate tokens/sec
+        self.baseline = None       # ms per generated token at the knee
+        self.increases = 0
+        self.decreases = 0
+        self._reset_window()
+
+    def _reset_window(self):
+        self.window_started = time.perf_counter()
+        self.window_tokens = 0
+        self.window_latencies = []
+        self.window_errors = 0
+        self.saturated = False
+
+
+class ConcurrencyTuner:
+    """
+    Per-model concurrency limit between ``min_limit`` and ``max_limit``.
+
+    Pass it as ``OllamaClient(autotune=...)`` for async calls, or use
+    ``call()`` from a thread pool (``ollamakit.ingest`` does). ``limit(model)``
+    and ``stats()`` show what it settled on. Async callers should share one
+    event loop.
+    """
+
+    def __init__(self, min_limit=1, max_limit=16, initial_limit=None, knee_gain=0.15,
+                 tolerance=1.5, decrease=0.7, min_window=4):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        if initial_limit is None:
+            initial_limit = min(4, max_limit)
+        self.initial_limit = max(min_limit, min(max_limit, initial_limit))
+        self.knee_gain = knee_gain
+        self.tolerance = tolerance
+        self.decrease = decrease
+        self.min_window = min_window
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _state(self, model):
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelLimit(self.initial_limit)
+        return state
+
+    def limit(self, model):
+        with self._lock:
+            return self._state(model).limit
+
+    # ---------------------------------------------
+    # Slots (caller holds the lock)
+    # ---------------------------------------------
+    def _dispatch(self, state):
+        while state.waiters and state.inflight < state.limit:
+            waiter = state.waiters.popleft()
+            if waiter.cancelled:
+                continue
+            if not state.inflight and not state.window_latencies and not state.window_errors:
+                state.window_started = time.perf_counter()  # idle time isn't throughput
+            state.inflight += 1
+            waiter.grant()
+        if state.waiters:
+            state.saturated = True  # demand beyond the limit: this level can be judged
+
+    def _set_limit(self, state, limit):
+        limit = max(self.min_limit, min(self.max_limit, int(limit)))
+        if limit > state.limit:
+            state.increases += 1
+        elif limit < state.limit:
+            state.decreases += 1
+        state.limit = limit
+        state._reset_window()
+        self._dispatch(state)
+
+    # ---------------------------------------------
+    # Feedback (caller holds the lock)
+    # ---------------------------------------------
+    def _window_size(self, state):
+        return max(self.min_window, 2 * state.limit)
+
+    def _observe(self, state, latency_s, tokens, failed):
+        if failed:
+            state.window_errors += 1
+        else:
+            state.window_tokens += tokens
+            state.window_latencies.append(latency_s * 1000 / max(tokens, 1))
+
+        done = len(state.window_latencies) + state.window_errors
+        if done >= self._window_size(state):
+            self._judge(state)
+
+    def _end_burst(self, state):
+        # Nothing in flight or queued: a short burst may never fill a whole
+        # window, so judge what it did produce instead of waiting for more.
+        done = len(state.window_latencies) + state.window_errors
+        if done >= state.limit or state.window_errors:
+            self._judge(state)
+        else:
+            state._reset_window()
+
+    def _judge(self, state):
+        if not state.saturated and not state.window_errors:
+            state._reset_window()  # not enough demand to judge this level
+            return
+        if state.phase == "probe":
+            self._probe_step(state)
+        else:
+            self._aimd_step(state)
+
+    def _probe_step(self, state):
+        elapsed = time.perf_counter() - state.window_started
+        throughput = state.window_tokens / elapsed if elapsed > 0 else 0.0
+        state.curve[state.limit] = throughput
+        previous = state.curve.get(state.limit // 2)
+        level_latency = percentile(state.window_latencies, 50)
+
+        if state.window_errors or (previous is not None and throughput < previous * (1 + self.knee_gain)):
+            # Past the knee: the previous level gave (almost) the same throughput.
+            state.phase = "steady"
+            state.baseline = state.baseline or level_latency
+            self._set_limit(state, max(self.min_limit, state.limit // 2))
+        elif state.limit >= self.max_limit:
+            state.phase = "steady"
+            state.baseline = level_latency
+            self._set_limit(state, state.limit)
+        else:
+            state.baseline = level_latency
+            self._set_limit(state, state.limit * 2)
+
+    def _aimd_step(self, state):
+        latency = percentile(state.window_latencies, 50)
+        congested = state.window_errors > 0 or (
+            latency is not None and state.baseline and latency > state.baseline * self.tolerance
+        )
+        if latency is not None:
+            # Follow genuinely faster workloads at once, slower ones slowly.
+            state.baseline = min(state.baseline * 1.05, latency) if state.baseline else latency
+        if congested:
+            self._set_limit(state, state.limit * self.decrease)
+        else:
+            self._set_limit(state, state.limit + 1)
+
+    # ---------------------------------------------
+    # Entry points
+    # ---------------------------------------------
+    def _enqueue(self, model, waiter):
+        with self._lock:
+            state = self._state(model)
+            state.waiters.append(waiter)
+            self._dispatch(state)
+        return state
+
+    def _finish(self, state, latency, data, failed, size):
+        with self._lock:
+            state.inflight -= 1
+            if data is not None or failed:
+                tokens = size or (data or {}).get("eval_count") or (data or {}).get("prompt_eval_count") or 1
+                self._observe(state, latency, tokens, failed)
+            self._dispatch(state)
+            if not state.inflight and not any(not w.cancelled for w in state.waiters):
+                self._end_burst(state)
+
+    async def run(self, model, call, size=None):
+        """
+        Awaits a slot for ``model``, runs ``call()`` and feeds back its timing.
+
+        Throughput is counted in ``size`` units when given (e.g. documents
+        per embed batch), otherwise in the reply's generated tokens.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = _Waiter(grant)
+        state = self._enqueue(model, waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter not in state.waiters
+                waiter.cancelled = True
+                if granted:
+                    state.inflight -= 1
+                    self._dispatch(state)
+            raise
+
+        started = time.perf_counter()
+        data, failed = None, False
+        try:
+            data = await call()
+            return data
+        except Exception as exc:
+            failed = is_retryable(exc, timeouts=True)
+            raise
+        finally:
+            self._finish(state, time.perf_counter() - started, data, failed, size)
+
+    def call(self, model, fn, size=None):
+        """Blocking ``run()`` for thread pools: waits for a slot, then calls ``fn()``."""
+        event = threading.Event()
+        state = self._enqueue(model, _Waiter(event.set))
+        event.wait()
+
+        started = time.perf_counter()
+        data, failed = None, False
+        try:
+            data = fn()
+            return data
+        except Exception as exc:
+            failed = is_retryable(exc, timeouts=True)
+            raise
+        finally:
+            self._finish(state, time.perf_counter() - started, data, failed, size)
+
+    def stats(self):
+        with self._lock:
+            return {
+                model: {
+                    "limit": s.limit,
+                    "phase": s.phase,
+                    "inflight": s.inflight,
+                    "queued": sum(1 for w in s.waiters if not w.cancelled),
+                    "tokens_per_sec_by_limit": {k: round(v, 1) for k, v in sorted(s.curve.items())},
+                    "baseline_ms_per_token": s.baseline,
+                    "increases": s.increases,
+                    "decreases": s.decreases,
+                }
+                for model, s in self._models.items()
+            }
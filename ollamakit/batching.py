@@ -0,0 +1,198 @@
+"""
+Micro-batching for short classification calls.
+
+Callers submit one item at a time (from any thread). Items are collected for
+up to ``max_wait`` seconds or ``max_batch_size`` items, packed into a single
+numbered prompt, and the labels are split back to each caller. One request
+then replaces N round-trips and N evaluations of the shared instructions.
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from .client import get_client
+
+
+class MicroBatcher:
+    """
+    Groups submitted items and hands them to ``batch_fn(items) -> results``.
+
+    ``batch_fn`` must return one result per item, in order. Any exception it
+    raises is propagated to every caller in that batch.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait=0.05):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Queues ``item`` and returns a Future for its result."""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # let the loop exit after this batch
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class BatchClassifier:
+    """
+    Classifies texts into one of ``labels`` by packing many texts per prompt.
+
+    If the model's reply is not a JSON array of valid labels with the right
+    length, every item in that batch falls back to ``single_fn(text)``.
+    """
+
+    def __init__(self, labels, instructions, model="llama3", single_fn=None, client=None,
+                 max_batch_size=16, max_wait=0.05, options=None):
+        self.labels = list(labels)
+        self.instructions = instructions.strip()
+        self.model = model
+        self.single_fn = single_fn
+        self.client = client or get_client()
+        self.options = {"temperature": 0.0, **(options or {})}
+
+        self.batches = 0
+        self.items = 0
+        self.fallback_batches = 0
+        self.fallback_items = 0
+        self._lock = threading.Lock()
+
+        self._batcher = MicroBatcher(self._classify_batch, max_batch_size, max_wait)
+
+    # ---------------------------------------------
+    # Public API
+    # ---------------------------------------------
+    def classify(self, text):
+        """Blocks until the batch containing ``text`` has been classified."""
+        return self._batcher.submit(text).result()
+
+    def classify_many(self, texts):
+        futures = [self._batcher.submit(t) for t in texts]
+        return [f.result() for f in futures]
+
+    def close(self):
+        self._batcher.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "fallback_batches": self.fallback_batches,
+                "fallback_items": self.fallback_items,
+            }
+
+    # ---------------------------------------------
+    # Batch prompt / parsing
+    # ---------------------------------------------
+    def build_prompt(self, texts):
+        choices = ", ".join(f'"{label}"' for label in self.labels)
+        lines = [
+            self.instructions,
+            "",
+            f"Classify each of the following {len(texts)} items.",
+            f"Reply with only a JSON array of {len(texts)} labels, in order, each one of: {choices}.",
+            "",
+        ]
+        for i, text in enumerate(texts, 1):
+            lines.append(f"{i}. {' '.join(str(text).split())}")
+        return "\n".join(lines)
+
+    def parse_labels(self, reply, expected):
+        """Returns the validated label list, or None if the reply is unusable."""
+        match = re.search(r"\[.*\]", reply, re.DOTALL)
+        if not match:
+            return None
+        try:
+            raw = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(raw, list) or len(raw) != expected:
+            return None
+
+        canonical = {label.lower(): label for label in self.labels}
+        labels = []
+        for value in raw:
+            label = canonical.get(str(value).strip().lower())
+            if label is None:
+                return None
+            labels.append(label)
+        return labels
+
+    def _classify_batch(self, texts):
+        with self._lock:
+            self.batches += 1
+            self.items += len(texts)
+
+        labels = None
+        try:
+            # ~8 tokens per label plus the brackets.
+            options = dict(self.options, num_predict=8 * len(texts) + 16)
+            data = self.client.generate(self.model, self.build_prompt(texts), options=options)
+            labels = self.parse_labels(data.get("response", ""), len(texts))
+        except Exception:
+            if self.single_fn is None:
+                raise
+
+        if labels is not None:
+            return labels
+        if self.single_fn is None:
+            raise ValueError("Could not parse batch labels and no single_fn fallback is set")
+
+        with self._lock:
+            self.fallback_batches += 1
+            self.fallback_items += len(texts)
+        return [self.single_fn(text) for text in texts]
@@ -0,0 +1,156 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Entries are keyed by a sha256 of (model, messages, options) and stored in a
+SQLite file, so deterministic calls (temperature 0) are answered from disk on
+the next run instead of being regenerated.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "OLLAMAKIT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ollamakit")
+)
+# Ollama's built-in sampling temperature, used when a request doesn't set one.
+OLLAMA_DEFAULT_TEMPERATURE = 0.8
+
+
+def request_key(model, messages, options=None):
+    """Stable sha256 over the parts of a request that determine its output."""
+    blob = json.dumps(
+        {"model": model, "messages": messages, "options": options or {}},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk LRU/TTL cache.
+
+    - ``max_entries``: least recently used rows are evicted past this size.
+    - ``ttl``: seconds after which an entry is treated as missing (None = never).
+    - ``cache_nonzero_temperature``: by default sampled (temperature > 0)
+      calls bypass the cache, since their output is not meant to repeat.
+    - ``default_temperature``: the temperature assumed for requests whose
+      options don't set one. Ollama's default is 0.8, but a Modelfile
+      ``PARAMETER temperature`` changes it for that model; set this to
+      match, e.g. 0 for a model tuned to be deterministic.
+    """
+
+    def __init__(self, path=None, max_entries=10000, ttl=None, cache_nonzero_temperature=False,
+                 default_temperature=OLLAMA_DEFAULT_TEMPERATURE):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "responses.sqlite3")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+        self.default_temperature = default_temperature
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    # ---------------------------------------------
+    # Low-level get/put
+    # ---------------------------------------------
+    def get(self, key):
+        """Returns the cached value or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    # ---------------------------------------------
+    # High-level helpers
+    # ---------------------------------------------
+    def should_cache(self, options=None):
+        temperature = (options or {}).get("temperature", self.default_temperature)
+        return temperature == 0 or self.cache_nonzero_temperature
+
+    def get_or_call(self, model, messages, options, call):
+        """
+        Returns the cached result for this request, or runs ``call()`` and
+        stores its (JSON-serializable) result.
+        """
+        if not self.should_cache(options):
+            self.bypassed += 1
+            return call()
+
+        key = request_key(model, messages, options)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = call()
+        self.put(key, value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
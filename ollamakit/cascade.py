@@ -0,0 +1,185 @@
+"""
+Small-model-first cascade.
+
+Tiny decisions (route this query, pick 'hr' or 'it', choose a tool) are
+first sent to a cheap model. The answer is scored by a validator (enum,
+regex or JSON match, plus an optional average-token-probability floor when
+the server returns logprobs); only answers that fail go to the larger
+model. The escalation rate shows how often the cheap model was enough.
+
+The cheap model defaults to llama3.2:1b; set ``OLLAMAKIT_CHEAP_MODEL`` to
+use another one everywhere.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+
+import requests
+
+from .client import get_client
+from .policy import CircuitOpenError
+
+CHEAP_MODEL = os.environ.get("OLLAMAKIT_CHEAP_MODEL", "llama3.2:1b")
+DEFAULT_MODELS = (CHEAP_MODEL, "llama3")
+
+
+# ---------------------------------------------
+# Validators: text -> parsed value, or None to escalate
+# ---------------------------------------------
+def enum_validator(labels):
+    """
+    Accepts a reply that is just one of ``labels`` (case-insensitive),
+    optionally wrapped in quotes or followed by punctuation. A label inside
+    a longer sentence doesn't count: "it" would match too much prose.
+    """
+    canonical = {label.lower(): label for label in labels}
+    pattern = re.compile(r"\W*(" + "|".join(re.escape(l) for l in canonical) + r")\W*", re.IGNORECASE)
+
+    def validate(text):
+        match = pattern.fullmatch(text.strip())
+        return canonical[match.group(1).lower()] if match else None
+    return validate
+
+
+def regex_validator(pattern, flags=0):
+    """Accepts a reply matching ``pattern``; returns the match object."""
+    compiled = re.compile(pattern, flags)
+
+    def validate(text):
+        return compiled.search(text)
+    return validate
+
+
+def json_validator(required_keys=(), enums=None):
+    """
+    Accepts a reply containing a JSON object with ``required_keys``;
+    ``enums`` maps keys to their allowed values.
+    """
+    enums = enums or {}
+
+    def validate(text):
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        if not match:
+            return None
+        try:
+            obj = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(obj, dict) or any(k not in obj for k in required_keys):
+            return None
+        for key, allowed in enums.items():
+            if obj.get(key) not in allowed:
+                return None
+        return obj
+    return validate
+
+
+def mean_token_probability(data):
+    """Average token probability from Ollama's ``logprobs``, or None if absent."""
+    logprobs = data.get("logprobs") or []
+    values = [t["logprob"] for t in logprobs if isinstance(t, dict) and "logprob" in t]
+    if not values:
+        return None
+    return math.exp(sum(values) / len(values))
+
+
+class CascadeResult:
+    def __init__(self, value, text, model, escalated, data):
+        self.value = value
+        self.text = text
+        self.model = model
+        self.escalated = escalated
+        self.data = data
+
+    def __repr__(self):
+        return f"CascadeResult(value={self.value!r}, model={self.model!r}, escalated={self.escalated})"
+
+
+class Cascade:
+    """
+    Tries ``models`` in order (cheapest first) until one answer validates.
+
+    ``min_confidence``: if set, logprobs are requested and a cheap answer is
+    also escalated when its mean token probability is below this value
+    (servers without logprobs support are judged by the validator alone).
+    If even the last model's answer fails validation, its raw result is
+    returned with ``value=None``. A request error (model not pulled,
+    timeout, open circuit) on any model but the last counts as an
+    escalation; on the last model it is raised.
+    """
+
+    def __init__(self, models=DEFAULT_MODELS, client=None, min_confidence=None, options=None):
+        self.models = list(models)
+        self.client = client or get_client()
+        self.min_confidence = min_confidence
+        self.options = {"temperature": 0.0, **(options or {})}
+
+        self.calls = 0
+        self.escalations = 0
+        self.errors = 0
+        self.answered_by = {m: 0 for m in self.models}
+        self._lock = threading.Lock()
+
+    def _accept(self, data, text, validator):
+        value = validator(text) if validator else text
+        if value is None:
+            return None
+        if self.min_confidence is not None:
+            confidence = mean_token_probability(data)
+            if confidence is not None and confidence < self.min_confidence:
+                return None
+        return value
+
+    def _run(self, call, extract, validator):
+        extra = {"logprobs": True} if self.min_confidence is not None else {}
+        result = None
+        for i, model in enumerate(self.models):
+            try:
+                data = call(model, extra)
+            except (requests.RequestException, CircuitOpenError):
+                if i == len(self.models) - 1:
+                    raise
+                with self._lock:
+                    self.errors += 1
+                continue
+            text = extract(data).strip()
+            value = self._accept(data, text, validator)
+            result = CascadeResult(value, text, model, i > 0, data)
+            if value is not None:
+                break
+
+        with self._lock:
+            self.calls += 1
+            self.answered_by[result.model] += 1
+            if result.escalated:
+                self.escalations += 1
+        return result
+
+    def generate(self, prompt, validator=None, options=None, **extra):
+        opts = dict(self.options, **(options or {}))
+        return self._run(
+            lambda model, more: self.client.generate(model, prompt, options=opts, **extra, **more),
+            lambda data: data.get("response", ""),
+            validator,
+        )
+
+    def chat(self, messages, validator=None, options=None, **extra):
+        opts = dict(self.options, **(options or {}))
+        return self._run(
+            lambda model, more: self.client.chat(model, messages, options=opts, **extra, **more),
+            lambda data: (data.get("message") or {}).get("content", ""),
+            validator,
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "escalations": self.escalations,
+                "escalation_rate": self.escalations / self.calls if self.calls else 0.0,
+                "errors": self.errors,
+                "answered_by": dict(self.answered_by),
+            }
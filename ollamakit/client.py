@@ -0,0 +1,337 @@
+"""
+Shared Ollama HTTP client.
+
+Holds one pooled keep-alive ``requests.Session`` for sync calls and one
+lazily created ``httpx.AsyncClient`` for async calls, so scripts that call
+the model in a loop reuse sockets instead of opening a new TCP connection
+per request.
+
+Install dependencies:
+    pip install requests httpx
+"""
+
+import asyncio
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .policy import is_timeout
+from .singleflight import flight_key
+from .streaming import TokenStream
+
+DEFAULT_BASE_URL = "http://localhost:11434"
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_POOL_SIZE = 10
+
+
+class OllamaClient:
+    """
+    Thin wrapper over the Ollama REST API (/api/generate, /api/chat, /api/embed).
+
+    ``timeout`` is the per-call read timeout and ``connect_timeout`` bounds
+    connection setup; both can be overridden per call with ``timeout=``.
+    ``policy`` is an optional ``ollamakit.policy.RetryPolicy`` applied to
+    every request (streams are retried only until the response starts).
+    ``telemetry`` is an optional ``ollamakit.telemetry.Telemetry`` that
+    records Ollama's timing fields for every call.
+    ``singleflight`` is an optional ``ollamakit.singleflight.SingleFlight``;
+    identical concurrent requests then share one generation.
+    ``admission`` is an optional ``ollamakit.admission.AdmissionController``
+    and ``priority`` the class this client's calls are admitted under
+    (an ``AdmissionController.priority()`` block overrides it).
+    ``autotune`` is an optional ``ollamakit.autotune.ConcurrencyTuner`` that
+    limits concurrent async calls per model to the measured throughput knee.
+    ``deadlines`` is an optional ``ollamakit.deadlines.LatencyTracker``; calls
+    without an explicit ``timeout=`` then get a read timeout derived from the
+    latencies seen for that endpoint, model and ``num_predict`` (``timeout``
+    while cold), and calls that time out widen it again. Streams neither use
+    nor feed it.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE,
+                 policy=None, telemetry=None, singleflight=None, admission=None,
+                 priority=None, autotune=None, deadlines=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.pool_size = pool_size
+        self.policy = policy
+        self.telemetry = telemetry
+        self.singleflight = singleflight
+        self.admission = admission
+        self.priority = priority
+        self.autotune = autotune
+        self.deadlines = deadlines
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._async_client = None
+        self._async_loop = None
+
+    # ---------------------------------------------
+    # Helpers
+    # ---------------------------------------------
+    def _url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _timeouts(self, timeout=None):
+        read = self.timeout if timeout is None else timeout
+        return self.connect_timeout, read
+
+    @staticmethod
+    def _output_size(payload):
+        return (payload.get("options") or {}).get("num_predict")
+
+    def _deadline(self, path, payload, timeout):
+        if timeout is not None or self.deadlines is None:
+            return timeout
+        return self.deadlines.timeout(self._url(path), payload.get("model"), self.timeout,
+                                      size=self._output_size(payload))
+
+    def _timed_out(self, path, payload, timeout, exc):
+        if self.deadlines is not None and is_timeout(exc):
+            self.deadlines.record_timeout(self._url(path), payload.get("model"),
+                                          self._timeouts(timeout)[1], size=self._output_size(payload))
+
+    @staticmethod
+    def _payload(model, stream, options, extra):
+        payload = {"model": model, "stream": stream}
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        return payload
+
+    # ---------------------------------------------
+    # Sync API
+    # ---------------------------------------------
+    def _with_policy(self, fn, *args):
+        if self.policy is None:
+            return fn(*args)
+        return self.policy.call(self.base_url, fn, *args)
+
+    def _post(self, path, payload, timeout):
+        r = self._session.post(self._url(path), json=payload, timeout=self._timeouts(timeout))
+        r.raise_for_status()
+        return r.json()
+
+    def _record(self, path, payload, data, started, stream=False):
+        latency = time.perf_counter() - started
+        if self.telemetry is not None:
+            self.telemetry.record(data, path, payload.get("model"), latency_s=latency)
+        # A stream's duration depends on how long the caller kept reading,
+        # and streams aren't given derived deadlines, so only plain calls count.
+        if self.deadlines is not None and not stream:
+            self.deadlines.record(self._url(path), payload.get("model"), latency,
+                                  size=self._output_size(payload))
+
+    def post(self, path, payload, timeout=None):
+        """POSTs a JSON payload and returns the decoded JSON response."""
+        if self.singleflight is not None:
+            key = flight_key(path, payload)
+            return self.singleflight.do(key, lambda: self._post_once(path, payload, timeout))
+        return self._post_once(path, payload, timeout)
+
+    def _post_once(self, path, payload, timeout):
+        if self.admission is None:
+            return self._post_admitted(path, payload, timeout)
+        with self.admission.admit(self.priority):
+            return self._post_admitted(path, payload, timeout)
+
+    def _post_admitted(self, path, payload, timeout):
+        timeout = self._deadline(path, payload, timeout)
+        started = time.perf_counter()
+        try:
+            data = self._with_policy(self._post, path, payload, timeout)
+        except Exception as e:
+            self._timed_out(path, payload, timeout, e)
+            raise
+        self._record(path, payload, data, started)
+        return data
+
+    def generate(self, model, prompt, options=None, timeout=None, **extra):
+        payload = self._payload(model, False, options, extra)
+        payload["prompt"] = prompt
+        return self.post("/api/generate", payload, timeout=timeout)
+
+    def chat(self, model, messages, options=None, timeout=None, **extra):
+        payload = self._payload(model, False, options, extra)
+        payload["messages"] = messages
+        return self.post("/api/chat", payload, timeout=timeout)
+
+    def embed(self, model, input, timeout=None, **extra):
+        payload = {"model": model, "input": input, **extra}
+        return self.post("/api/embed", payload, timeout=timeout)
+
+    def list_models(self):
+        """Locally installed models (/api/tags), each with its ``digest``."""
+        r = self._session.get(self._url("/api/tags"), timeout=self._timeouts(self.connect_timeout))
+        r.raise_for_status()
+        return r.json().get("models", [])
+
+    # ---------------------------------------------
+    # Streaming API
+    # ---------------------------------------------
+    def stream(self, path, payload, timeout=None, cancel_event=None):
+        """POSTs with ``stream: true`` and returns a TokenStream over the reply."""
+        payload = dict(payload, stream=True)
+        if self.singleflight is not None:
+            key = flight_key(path, payload)
+            return self.singleflight.stream(
+                key, lambda: self._open_stream(path, payload, timeout, cancel_event))
+        return self._open_stream(path, payload, timeout, cancel_event)
+
+    def _open_stream(self, path, payload, timeout, cancel_event):
+        started_at = time.perf_counter()
+        release = None
+        if self.admission is not None:
+            # The slot is held until the stream has been fully read or cancelled.
+            release = self.admission.acquire(self.priority)
+
+        def open_stream():
+            r = self._session.post(self._url(path), json=payload, stream=True,
+                                   timeout=self._timeouts(timeout))
+            r.raise_for_status()
+            return r
+
+        try:
+            r = self._with_policy(open_stream)
+        except Exception:
+            if release is not None:
+                release()
+            raise
+        on_done = None
+        if self.telemetry is not None:
+            on_done = lambda final: self._record(path, payload, final, started_at, stream=True)
+        return TokenStream(r, started_at=started_at, cancel_event=cancel_event,
+                           on_done=on_done, on_close=release)
+
+    def stream_generate(self, model, prompt, options=None, timeout=None, cancel_event=None, **extra):
+        payload = self._payload(model, True, options, extra)
+        payload["prompt"] = prompt
+        return self.stream("/api/generate", payload, timeout=timeout, cancel_event=cancel_event)
+
+    def stream_chat(self, model, messages, options=None, timeout=None, cancel_event=None, **extra):
+        payload = self._payload(model, True, options, extra)
+        payload["messages"] = messages
+        return self.stream("/api/chat", payload, timeout=timeout, cancel_event=cancel_event)
+
+    # ---------------------------------------------
+    # Async API
+    # ---------------------------------------------
+    def _get_async_client(self):
+        # httpx clients are bound to the event loop they were first used on,
+        # so a fresh one is created if asyncio.run() started a new loop.
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            import httpx
+
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size,
+                                    max_keepalive_connections=self.pool_size),
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    def _async_timeouts(self, timeout=None):
+        import httpx
+
+        connect, read = self._timeouts(timeout)
+        return httpx.Timeout(read, connect=connect)
+
+    async def _apost(self, path, payload, timeout):
+        client = self._get_async_client()
+        r = await client.post(self._url(path), json=payload, timeout=self._async_timeouts(timeout))
+        r.raise_for_status()
+        return r.json()
+
+    async def _apost_tuned(self, path, payload, timeout):
+        if self.autotune is None:
+            return await self._apost(path, payload, timeout)
+        return await self.autotune.run(payload.get("model"),
+                                       lambda: self._apost(path, payload, timeout))
+
+    async def apost(self, path, payload, timeout=None):
+        if self.singleflight is not None:
+            key = flight_key(path, payload)
+            return await self.singleflight.ado(key, lambda: self._apost_once(path, payload, timeout))
+        return await self._apost_once(path, payload, timeout)
+
+    async def _apost_once(self, path, payload, timeout):
+        if self.admission is None:
+            return await self._apost_admitted(path, payload, timeout)
+        async with self.admission.aadmit(self.priority):
+            return await self._apost_admitted(path, payload, timeout)
+
+    async def _apost_admitted(self, path, payload, timeout):
+        timeout = self._deadline(path, payload, timeout)
+        started = time.perf_counter()
+        try:
+            if self.policy is None:
+                data = await self._apost_tuned(path, payload, timeout)
+            else:
+                data = await self.policy.acall(self.base_url, self._apost_tuned, path, payload, timeout)
+        except Exception as e:
+            self._timed_out(path, payload, timeout, e)
+            raise
+        self._record(path, payload, data, started)
+        return data
+
+    async def agenerate(self, model, prompt, options=None, timeout=None, **extra):
+        payload = self._payload(model, False, options, extra)
+        payload["prompt"] = prompt
+        return await self.apost("/api/generate", payload, timeout=timeout)
+
+    async def achat(self, model, messages, options=None, timeout=None, **extra):
+        payload = self._payload(model, False, options, extra)
+        payload["messages"] = messages
+        return await self.apost("/api/chat", payload, timeout=timeout)
+
+    async def aembed(self, model, input, timeout=None, **extra):
+        payload = {"model": model, "input": input, **extra}
+        return await self.apost("/api/embed", payload, timeout=timeout)
+
+    # ---------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------
+    def close(self):
+        self._session.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide shared OllamaClient (with telemetry enabled)."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            from .telemetry import get_telemetry
+
+            _default_client = OllamaClient(telemetry=get_telemetry())
+        return _default_client
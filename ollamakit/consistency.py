@@ -0,0 +1,81 @@
+"""
+Concurrent self-consistency voting with early stopping.
+
+Samples are drawn in parallel (up to a concurrency cap), normalized before
+voting, and the remaining samples are cancelled as soon as the leading
+answer can no longer be overtaken.
+"""
+
+import asyncio
+import collections
+import re
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def final_number(text):
+    """Normalizes an answer to its last number, or to its lowercased text."""
+    numbers = _NUMBER.findall(text.replace(",", ""))
+    if numbers:
+        value = float(numbers[-1])
+        return str(int(value)) if value.is_integer() else str(value)
+    return " ".join(text.lower().split())
+
+
+def decided(counter, remaining):
+    """True when no outcome of the ``remaining`` samples can change the winner."""
+    ranked = counter.most_common(2)
+    if not ranked:
+        return False
+    lead = ranked[0][1]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    return lead > runner_up + remaining
+
+
+async def vote(sample, samples=5, concurrency=3, normalize=final_number):
+    """
+    Runs ``await sample()`` up to ``samples`` times and returns the consensus.
+
+    The result dict holds the winning normalized answer, one raw answer that
+    produced it, the vote counts, and how many samples were actually needed.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await sample()
+
+    tasks = [asyncio.create_task(one()) for _ in range(samples)]
+    counter = collections.Counter()
+    raw_by_answer = {}
+    answers = []
+    remaining = samples
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            remaining -= 1
+            try:
+                raw = await next_done
+            except Exception:
+                continue  # a failed sample simply doesn't vote
+            answer = normalize(raw)
+            counter[answer] += 1
+            raw_by_answer.setdefault(answer, raw)
+            answers.append(raw)
+            if decided(counter, remaining):
+                break
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if not counter:
+        raise RuntimeError("every self-consistency sample failed")
+    consensus = counter.most_common(1)[0][0]
+    return {
+        "consensus": consensus,
+        "answer": raw_by_answer[consensus],
+        "votes": dict(counter),
+        "answers": answers,
+        "samples_used": len(answers),
+        "samples_planned": samples,
+    }
@@ -0,0 +1,120 @@
+"""
+Constrained label decoding for classification and routing calls.
+
+``LabelChoice`` turns a fixed set of labels into everything a decision
+call needs: a JSON-schema ``format`` with an enum (Ollama structured
+outputs), a ``num_predict`` just large enough for the longest answer, and
+a parser that only accepts one of the labels. Servers or wrappers without
+structured outputs can use ``structured=False``: the label is then
+expected as bare text and generation stops at the first newline.
+"""
+
+import json
+import threading
+
+from .cascade import enum_validator
+from .client import get_client
+
+
+class InvalidLabelError(ValueError):
+    """The model's reply did not contain one of the allowed labels."""
+
+
+class LabelChoice:
+    """
+    One decision among ``labels``, returned under ``key`` in a JSON object.
+
+    ``retries``: extra attempts after an unparseable reply (only useful
+    when sampling, since greedy decoding repeats the same answer).
+    """
+
+    def __init__(self, labels, key="label", structured=True, retries=0, client=None):
+        self.labels = list(labels)
+        self.key = key
+        self.structured = structured
+        self.retries = retries
+        self._client = client
+        self._plain = enum_validator(self.labels)
+
+        self.calls = 0
+        self.parse_failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    @property
+    def schema(self):
+        return {
+            "type": "object",
+            "properties": {self.key: {"type": "string", "enum": self.labels}},
+            "required": [self.key],
+        }
+
+    @property
+    def num_predict(self):
+        # A token covers at least one character, so the longest rendered
+        # answer (plus slack for whitespace) bounds the decode length.
+        longest = max(self.labels, key=len)
+        if self.structured:
+            return len(json.dumps({self.key: longest})) + 4
+        return len(longest) + 2
+
+    def options(self, options=None):
+        """Decode options for the call: greedy, short, and stopped early in plain mode."""
+        opts = {"temperature": 0.0, "num_predict": self.num_predict}
+        if not self.structured:
+            opts["stop"] = ["\n"]
+        opts.update(options or {})
+        return opts
+
+    def request(self, options=None):
+        """Keyword arguments for ``OllamaClient.generate``/``chat`` (or ``Cascade``)."""
+        kwargs = {"options": self.options(options)}
+        if self.structured:
+            kwargs["format"] = self.schema
+        return kwargs
+
+    def parse(self, text):
+        """Returns the label in ``text``, or None if it isn't exactly one allowed label."""
+        text = (text or "").strip()
+        if self.structured:
+            try:
+                value = json.loads(text).get(self.key)
+            except (json.JSONDecodeError, AttributeError):
+                value = None
+            if value in self.labels:
+                return value
+        # Bare label (plain mode, or a server that ignored ``format``).
+        return self._plain(text)
+
+    def _decide(self, call):
+        for _ in range(self.retries + 1):
+            text = call()
+            label = self.parse(text)
+            with self._lock:
+                self.calls += 1
+                if label is None:
+                    self.parse_failures += 1
+            if label is not None:
+                return label
+        raise InvalidLabelError(f"expected one of {self.labels}, got {text!r}")
+
+    def generate(self, model, prompt, options=None, **extra):
+        kwargs = self.request(options)
+        return self._decide(
+            lambda: self.client.generate(model, prompt, **kwargs, **extra).get("response", "")
+        )
+
+    def chat(self, model, messages, options=None, **extra):
+        kwargs = self.request(options)
+        return self._decide(
+            lambda: (self.client.chat(model, messages, **kwargs, **extra).get("message") or {}).get("content", "")
+        )
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "parse_failures": self.parse_failures}
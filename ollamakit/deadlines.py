@@ -0,0 +1,221 @@
+"""
+Latency-derived timeouts and hedged requests.
+
+``LatencyTracker`` keeps a sliding window of call latencies per (endpoint,
+model, output size) and turns it into a deadline: ``multiplier`` x p99,
+clamped to [floor, ceiling]. Until ``min_samples`` calls have been seen,
+the caller's fallback is used, so a cold process behaves as before.
+
+A call that times out is recorded at its deadline (the true latency is at
+least that), and each further timeout multiplies the next deadline by
+``widen`` until a call succeeds again, so a deadline that came out too
+tight recovers instead of failing every longer call. The output size is
+``num_predict`` rounded up to a power of two, so short classifications
+don't set the deadline for long completions. With ``path``, the windows
+are loaded from and ``save()``d to a JSON file, so a script that only makes
+a few calls per run still warms up across runs.
+
+``Hedger`` runs each async call against several endpoints: the first one
+starts immediately, the next only once the first has taken longer than its
+usual p95, and whichever answers first wins. The others are cancelled,
+which closes their connections so Ollama stops generating.
+"""
+
+import asyncio
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+from .stats import percentile
+from .policy import is_timeout
+
+
+def size_bucket(num_predict):
+    """``num_predict`` rounded up to a power of two (None when unbounded)."""
+    if not num_predict or num_predict < 0:
+        return None
+    return 1 << (int(num_predict) - 1).bit_length()
+
+
+class LatencyTracker:
+    """Per-(endpoint, model, size) latency windows and the timeouts derived from them."""
+
+    def __init__(self, window=200, min_samples=20, multiplier=3.0, floor=5.0, ceiling=300.0,
+                 widen=2.0, path=None):
+        self.window = window
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.widen = widen
+        self.path = path
+        self._samples = {}
+        self._widened = {}         # key -> factor applied after consecutive timeouts
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    @staticmethod
+    def _key(endpoint, model, size):
+        return endpoint, model, size_bucket(size)
+
+    def _append(self, key, latency_s):
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = collections.deque(maxlen=self.window)
+        samples.append(latency_s)
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for entry in json.load(f):
+                key = (entry["endpoint"], entry["model"], entry["size"])
+                self._samples[key] = collections.deque(entry["samples"], maxlen=self.window)
+
+    def save(self):
+        """Writes the latency windows to ``path``."""
+        with self._lock:
+            entries = [
+                {"endpoint": endpoint, "model": model, "size": size, "samples": list(samples)}
+                for (endpoint, model, size), samples in self._samples.items()
+            ]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
+    def record(self, endpoint, model, latency_s, size=None):
+        key = self._key(endpoint, model, size)
+        with self._lock:
+            self._append(key, latency_s)
+            self._widened.pop(key, None)
+
+    def record_timeout(self, endpoint, model, deadline_s, size=None):
+        """Records a call cut off after ``deadline_s`` and widens the next deadline."""
+        key = self._key(endpoint, model, size)
+        with self._lock:
+            self._append(key, deadline_s)
+            self._widened[key] = self._widened.get(key, 1.0) * self.widen
+
+    @contextlib.contextmanager
+    def measure(self, endpoint, model=None, size=None):
+        """Records the block's duration; a timeout is recorded as one (see record_timeout)."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            if is_timeout(exc):
+                self.record_timeout(endpoint, model, time.perf_counter() - started, size)
+            raise
+        self.record(endpoint, model, time.perf_counter() - started, size)
+
+    def quantile(self, endpoint, model, pct, size=None):
+        """Latency percentile in seconds, or None below ``min_samples``."""
+        with self._lock:
+            samples = list(self._samples.get(self._key(endpoint, model, size), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, pct)
+
+    def timeout(self, endpoint, model=None, default=None, size=None):
+        """Read timeout for the next call; ``default`` (or the ceiling) while cold."""
+        p99 = self.quantile(endpoint, model, 99, size)
+        if p99 is None:
+            return self.ceiling if default is None else default
+        with self._lock:
+            widened = self._widened.get(self._key(endpoint, model, size), 1.0)
+        return min(self.ceiling, max(self.floor, p99 * self.multiplier) * widened)
+
+    def stats(self):
+        with self._lock:
+            windows = {key: list(samples) for key, samples in self._samples.items()}
+        return {
+            f"{endpoint} {model or '-'}" + (f" <={size} tokens" if size else ""): {
+                "samples": len(samples),
+                "p50_s": percentile(samples, 50),
+                "p95_s": percentile(samples, 95),
+                "p99_s": percentile(samples, 99),
+                "timeout_s": self.timeout(endpoint, model, size=size),
+            }
+            for (endpoint, model, size), samples in windows.items()
+        }
+
+
+class Hedger:
+    """
+    Sends each async call to ``clients[0]`` and hedges onto the next client
+    once the call has taken longer than ``delay`` seconds (default: the
+    tracker's ``pct`` latency for that endpoint and model, i.e. only when it
+    is slower than usual). The first answer wins; the other attempts are
+    cancelled. If every attempt fails, the last exception is raised.
+    """
+
+    def __init__(self, clients, tracker=None, delay=None, pct=95):
+        self.clients = list(clients)
+        self.tracker = tracker
+        self.delay = delay
+        self.pct = pct
+
+        self.calls = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def _delay(self, path, model, size):
+        if self.delay is not None or self.tracker is None:
+            return self.delay
+        return self.tracker.quantile(self.clients[0]._url(path), model, self.pct, size)
+
+    async def run(self, call, path="/api/generate", model=None, size=None):
+        """Runs ``call(client)`` with hedging; returns the first successful result."""
+        delay = self._delay(path, model, size)
+        self.calls += 1
+
+        pending = {asyncio.ensure_future(call(self.clients[0])): 0}
+        remaining = list(enumerate(self.clients))[1:]
+        error = None
+        try:
+            while pending:
+                timeout = delay if (remaining and delay is not None) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than usual: send the duplicate to the next endpoint.
+                    index, client = remaining.pop(0)
+                    pending[asyncio.ensure_future(call(client))] = index
+                    self.hedges_sent += 1
+                    continue
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        if index > 0:
+                            self.hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending and remaining:
+                    # Every attempt so far failed: fail over without waiting.
+                    index, client = remaining.pop(0)
+                    pending[asyncio.ensure_future(call(client))] = index
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def agenerate(self, model, prompt, options=None, **extra):
+        return await self.run(lambda c: c.agenerate(model, prompt, options=options, **extra),
+                              "/api/generate", model, (options or {}).get("num_predict"))
+
+    async def achat(self, model, messages, options=None, **extra):
+        return await self.run(lambda c: c.achat(model, messages, options=options, **extra),
+                              "/api/chat", model, (options or {}).get("num_predict"))
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+        }
@@ -0,0 +1,229 @@
+"""
+Persistent embedding cache shared by every vector-store script.
+
+Vectors are keyed by (model name, model digest, sha256 of the text) and
+stored as float32 blobs in a SQLite file (WAL mode, so several processes
+can read and write it at once). Re-building an index then only embeds the
+chunks that actually changed; pulling a new version of the model changes
+its digest and therefore misses the old entries.
+
+Two entry points:
+    - ``EmbeddingCache.embed(model, texts)`` for the raw ``ollama.embed`` path;
+    - ``CachedEmbeddings(OllamaEmbeddings(...))`` for LangChain vector stores.
+"""
+
+import array
+import hashlib
+import os
+import sqlite3
+import threading
+
+from .cache import DEFAULT_CACHE_DIR
+from .client import OllamaClient, get_client
+
+try:
+    from langchain_core.embeddings import Embeddings as _EmbeddingsBase
+except ImportError:  # LangChain is optional
+    _EmbeddingsBase = object
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector):
+    return array.array("f", vector).tobytes()
+
+
+def _unpack(blob):
+    values = array.array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    On-disk float32 embedding store.
+
+    ``client`` is used to look up model digests (once per server and model
+    per process) and to embed misses when no ``embed_fn`` is given; every
+    method also takes ``client=`` for vectors computed by another server,
+    so the digest comes from the server that made them. ``variant`` separates
+    vectors of the same model produced differently (e.g. a wrapper that
+    prepends an instruction to every text).
+    """
+
+    def __init__(self, path=None, client=None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "embeddings.sqlite3")
+        self._client = client
+        self._digests = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, digest, text_hash)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def digest(self, model, client=None):
+        """The model's digest on ``client``'s server ("" if it can't be asked)."""
+        client = client or self.client
+        key = (client.base_url, model)
+        if key not in self._digests:
+            name = model if ":" in model else model + ":latest"
+            digest = ""
+            try:
+                for entry in client.list_models():
+                    if name in (entry.get("name"), entry.get("model")):
+                        digest = entry.get("digest", "")
+                        break
+            except Exception:
+                pass
+            self._digests[key] = digest
+        return self._digests[key]
+
+    # ---------------------------------------------
+    # Low-level get/put
+    # ---------------------------------------------
+    @staticmethod
+    def _model_key(model, variant):
+        return f"{model}|{variant}" if variant else model
+
+    def get_many(self, model, texts, variant="", client=None):
+        """
+        Cached vectors for ``texts`` (None where missing), in order. With no
+        digest (server unreachable) nothing is trusted: everything misses.
+        """
+        digest = self.digest(model, client)
+        if not digest:
+            return [None] * len(texts)
+        model_key = self._model_key(model, variant)
+        keys = [text_key(t) for t in texts]
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model = ? AND digest = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    (model_key, digest, *chunk),
+                ).fetchall()
+                found.update(rows)
+        return [_unpack(found[k]) if k in found else None for k in keys]
+
+    def put_many(self, model, texts, vectors, variant="", client=None):
+        digest = self.digest(model, client)
+        if not digest:
+            # An unknown model version must not poison the cache for later runs.
+            return
+        model_key = self._model_key(model, variant)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, digest, text_hash, vector) VALUES (?, ?, ?, ?)",
+                [(model_key, digest, text_key(t), _pack(v)) for t, v in zip(texts, vectors)],
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    # ---------------------------------------------
+    # High-level helpers
+    # ---------------------------------------------
+    def embed(self, model, texts, embed_fn=None, variant="", client=None):
+        """
+        Vectors for ``texts`` (a string or a list), embedding only the misses
+        in one call: ``embed_fn(missing_texts)``, or /api/embed on ``client``
+        by default.
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = self.get_many(model, texts, variant, client)
+
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        misses = sum(1 for v in vectors if v is None)
+        with self._lock:
+            self.hits += len(texts) - misses
+            self.misses += misses
+        if missing:
+            if embed_fn is None:
+                fresh = (client or self.client).embed(model, missing)["embeddings"]
+            else:
+                fresh = embed_fn(missing)
+            self.put_many(model, missing, fresh, variant, client)
+            by_text = dict(zip(missing, fresh))
+            vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+        return vectors[0] if single else vectors
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+class CachedEmbeddings(_EmbeddingsBase):
+    """
+    LangChain ``Embeddings`` wrapper: ``FAISS.from_documents(docs,
+    CachedEmbeddings(OllamaEmbeddings(model=...)))`` only embeds new chunks.
+    The model digest is looked up on the wrapped embeddings' ``base_url``
+    (or ``client``), i.e. the server that actually computes the vectors.
+    """
+
+    def __init__(self, embeddings, cache=None, model=None, client=None):
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        self.model = model or getattr(embeddings, "model", None) or "unknown"
+        base_url = getattr(embeddings, "base_url", None)
+        self.client = client or (OllamaClient(base_url) if base_url else None)
+        # langchain_community's OllamaEmbeddings prepends "passage: " to documents.
+        self.variant = getattr(embeddings, "embed_instruction", "") or ""
+
+    def embed_documents(self, texts):
+        return self.cache.embed(self.model, list(texts), self.embeddings.embed_documents, self.variant,
+                                client=self.client)
+
+    def embed_query(self, text):
+        # Queries are one-off, and some wrappers embed them with a different
+        # instruction prefix than documents, so they go straight through.
+        return self.embeddings.embed_query(text)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Process-wide EmbeddingCache in the default cache directory."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
@@ -0,0 +1,115 @@
+"""
+Parallel prompt A/B evaluation over a JSONL dataset.
+
+Each dataset line is a JSON object with an input field (and optionally an
+``id``). Both prompt variants run concurrently with bounded parallelism and
+every finished call is appended to the output JSONL immediately, so a
+crashed run can be resumed: rows already in the output file are skipped,
+failed ones are run again, and ``summarize`` only counts the latest result
+for each (id, variant).
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from .client import get_client
+from .stats import percentile
+
+
+def load_jsonl(path):
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def _latest(output_path):
+    """The last row written for each (id, variant); earlier attempts were superseded."""
+    if not os.path.exists(output_path):
+        return {}
+    return {(row["id"], row["variant"]): row for row in load_jsonl(output_path)}
+
+
+def _completed(output_path):
+    return {key for key, row in _latest(output_path).items() if "error" not in row}
+
+
+async def _run(rows, variants, output_path, model, concurrency, client, options, input_field, chat):
+    done = _completed(output_path)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def call(row_id, text, variant, template):
+            async with semaphore:
+                started = time.perf_counter()
+                record = {"id": row_id, "variant": variant, "input": text}
+                try:
+                    prompt = template.format(text)
+                    if chat:
+                        data = await client.achat(model, [{"role": "user", "content": prompt}], options=options)
+                        output = (data.get("message") or {}).get("content", "")
+                    else:
+                        data = await client.agenerate(model, prompt, options=options)
+                        output = data.get("response", "")
+                    record["output"] = output.strip()
+                    record["eval_count"] = data.get("eval_count")
+                    record["prompt_eval_count"] = data.get("prompt_eval_count")
+                except Exception as e:
+                    record["error"] = str(e)
+                record["latency_ms"] = (time.perf_counter() - started) * 1000
+                # Single event loop thread: writes never interleave.
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        tasks = []
+        for i, row in enumerate(rows):
+            row_id = row.get("id", i)
+            for variant, template in variants.items():
+                if (row_id, variant) not in done:
+                    tasks.append(call(row_id, row[input_field], variant, template))
+        await asyncio.gather(*tasks)
+
+
+def summarize(output_path):
+    """Per-variant call counts, errors, p50/p95 latency and output tokens."""
+    by_variant = {}
+    for row in _latest(output_path).values():
+        v = by_variant.setdefault(row["variant"], {"latencies": [], "tokens": [], "errors": 0})
+        if "error" in row:
+            v["errors"] += 1
+            continue
+        v["latencies"].append(row["latency_ms"])
+        if row.get("eval_count") is not None:
+            v["tokens"].append(row["eval_count"])
+
+    summary = {}
+    for variant, v in sorted(by_variant.items()):
+        summary[variant] = {
+            "calls": len(v["latencies"]),
+            "errors": v["errors"],
+            "p50_ms": percentile(v["latencies"], 50),
+            "p95_ms": percentile(v["latencies"], 95),
+            "mean_output_tokens": sum(v["tokens"]) / len(v["tokens"]) if v["tokens"] else None,
+            "total_output_tokens": sum(v["tokens"]),
+        }
+    return summary
+
+
+def run_ab_eval(dataset_path, prompt_a, prompt_b, output_path, model="llama3", concurrency=4,
+                client=None, options=None, input_field="input", chat=False):
+    """
+    Runs prompt_a and prompt_b (``str.format`` templates with one ``{}``) over
+    every dataset row and returns ``summarize(output_path)``. With ``chat``
+    each prompt is sent as a single user message to /api/chat instead of
+    /api/generate.
+    """
+    rows = load_jsonl(dataset_path)
+    variants = {"A": prompt_a, "B": prompt_b}
+    asyncio.run(_run(rows, variants, output_path, model, concurrency,
+                     client or get_client(), options, input_field, chat))
+    return summarize(output_path)
@@ -0,0 +1,306 @@
+"""
+Record/replay stand-in for an Ollama server.
+
+record: proxies every request to a real Ollama and appends the exchange
+        (request + raw response lines) to a JSONL file.
+replay: serves the recorded exchanges without a model, pacing streamed
+        output to emulate real hardware (time-to-first-token, tokens/sec
+        and a model-load delay whenever the requested model changes).
+
+Covers /api/generate, /api/chat, /api/embed, /api/embeddings and
+/v1/chat/completions (plus any other path, replayed verbatim).
+
+Usage (from the repo root):
+    python -m ollamakit.fakeserver record --upstream http://localhost:11434 --port 11435
+    python -m ollamakit.fakeserver replay --port 11435 --tokens-per-sec 15 --ttft 0.4 --load-delay 3
+"""
+
+import argparse
+import collections
+import hashlib
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STREAMING_DEFAULT = {"/api/generate": True, "/api/chat": True}
+# Fields that don't change what the model produces.
+IGNORED_FIELDS = ("stream", "keep_alive")
+
+
+def exchange_key(method, path, body):
+    request = {k: v for k, v in (body or {}).items() if k not in IGNORED_FIELDS}
+    blob = json.dumps([method, path, request], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_streaming(path, body):
+    return bool((body or {}).get("stream", STREAMING_DEFAULT.get(path, False)))
+
+
+class Recorder:
+    def __init__(self, store, upstream):
+        self.store = store
+        self.upstream = upstream.rstrip("/")
+        self._lock = threading.Lock()
+
+    def save(self, exchange):
+        with self._lock, open(self.store, "a", encoding="utf-8") as f:
+            f.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+
+
+class Player:
+    def __init__(self, store, tokens_per_sec=None, ttft=0.0, load_delay=0.0, strict=True):
+        self.tokens_per_sec = tokens_per_sec
+        self.ttft = ttft
+        self.load_delay = load_delay
+        self.strict = strict
+
+        by_key = collections.defaultdict(list)
+        self._by_model = {}
+        with open(store, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    ex = json.loads(line)
+                    by_key[ex["key"]].append(ex)
+                    self._by_model[(ex["path"], (ex.get("request") or {}).get("model"))] = ex
+        # Repeated recordings of one request (e.g. sampled answers) are
+        # served round-robin.
+        self._exchanges = {k: itertools.cycle(v) for k, v in by_key.items()}
+        self._lock = threading.Lock()
+        self._loaded_model = None
+
+    def find(self, key, path, body):
+        with self._lock:
+            cycle = self._exchanges.get(key)
+            if cycle is not None:
+                return next(cycle)
+        if not self.strict:
+            return self._by_model.get((path, (body or {}).get("model")))
+        return None
+
+    def load_penalty(self, model):
+        """Emulates a weight reload whenever consecutive requests switch model."""
+        if model is None or not self.load_delay:
+            return 0.0
+        with self._lock:
+            if self._loaded_model == model:
+                return 0.0
+            self._loaded_model = model
+        return self.load_delay
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    recorder = None
+    player = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    # ---------------------------------------------
+    # Plumbing
+    # ---------------------------------------------
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return raw, (json.loads(raw) if raw else None)
+
+    def _send_json(self, status, obj):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_chunked(self, status, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        raw, body = self._read_body()
+        key = exchange_key(method, self.path, body)
+        if self.recorder is not None:
+            self._record(method, raw, body, key)
+        else:
+            self._replay(body, key)
+
+    # ---------------------------------------------
+    # Record
+    # ---------------------------------------------
+    def _record(self, method, raw, body, key):
+        request = urllib.request.Request(
+            self.recorder.upstream + self.path, data=raw if method == "POST" else None,
+            method=method, headers={"Content-Type": "application/json"},
+        )
+        try:
+            upstream = urllib.request.urlopen(request, timeout=600)
+        except urllib.error.HTTPError as e:
+            upstream = e
+        except OSError as e:  # URLError, refused, timed out: nothing to record
+            self._send_json(502, {"error": f"upstream {self.recorder.upstream} unreachable: {e}"})
+            return
+        status = upstream.status if hasattr(upstream, "status") else upstream.code
+        content_type = upstream.headers.get("Content-Type", "application/json")
+        streaming = is_streaming(self.path, body)
+
+        lines = []
+        started = time.perf_counter()
+        first_line_at = None
+        if streaming:
+            self._start_chunked(status, content_type)
+            # read1() returns whatever has arrived, so tokens are relayed as
+            # they come instead of after the whole response is buffered.
+            buffer = b""
+            for data in iter(lambda: upstream.read1(65536), b""):
+                buffer += data
+                *complete, buffer = buffer.split(b"\n")
+                for line in complete:
+                    line += b"\n"
+                    if first_line_at is None:
+                        first_line_at = time.perf_counter()
+                    lines.append(line.decode("utf-8"))
+                    self._chunk(line)
+            if buffer:
+                lines.append(buffer.decode("utf-8"))
+                self._chunk(buffer)
+            self._end_chunked()
+        else:
+            data = upstream.read()
+            lines.append(data.decode("utf-8"))
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        upstream.close()
+
+        self.recorder.save({
+            "key": key, "method": method, "path": self.path, "request": body,
+            "status": status, "content_type": content_type, "streaming": streaming,
+            "lines": lines,
+            "recorded_ttft_s": (first_line_at - started) if first_line_at else None,
+            "recorded_total_s": time.perf_counter() - started,
+        })
+
+    # ---------------------------------------------
+    # Replay
+    # ---------------------------------------------
+    def _emulate_timing(self, obj, load_s, tokens):
+        """Rewrites Ollama's duration fields to match the emulated hardware."""
+        if not isinstance(obj, dict) or not obj.get("done"):
+            return obj
+        tps = self.player.tokens_per_sec
+        obj = dict(obj)
+        obj["load_duration"] = int(load_s * 1e9)
+        obj["prompt_eval_duration"] = int(self.player.ttft * 1e9)
+        if tps:
+            obj["eval_duration"] = int(tokens / tps * 1e9)
+        obj["total_duration"] = obj["load_duration"] + obj["prompt_eval_duration"] + obj.get("eval_duration", 0)
+        return obj
+
+    def _replay(self, body, key):
+        exchange = self.player.find(key, self.path, body)
+        if exchange is None:
+            self._send_json(404, {"error": f"no recording for {self.path} request"})
+            return
+
+        load_s = self.player.load_penalty((body or {}).get("model"))
+        tps = self.player.tokens_per_sec
+        time.sleep(load_s + self.player.ttft)
+
+        lines = exchange["lines"]
+        if exchange["streaming"] and is_streaming(self.path, body):
+            self._start_chunked(exchange["status"], exchange["content_type"])
+            tokens = 0
+            for line in lines:
+                obj = None
+                if exchange["content_type"].startswith("application/x-ndjson") and line.strip():
+                    obj = json.loads(line)
+                    if obj.get("done"):
+                        line = json.dumps(self._emulate_timing(obj, load_s, tokens)) + "\n"
+                if tps and line.strip() and tokens:
+                    time.sleep(1.0 / tps)
+                if line.strip():
+                    tokens += 1
+                self._chunk(line.encode("utf-8"))
+            self._end_chunked()
+            return
+
+        if exchange["streaming"]:
+            # Recorded as a stream but requested without one: fold the chunks.
+            objs = [json.loads(l) for l in lines if l.strip()]
+            final = dict(objs[-1])
+            text = "".join(o.get("response", "") or (o.get("message") or {}).get("content", "") for o in objs)
+            if "message" in final:
+                final["message"] = dict(final["message"], content=text)
+            else:
+                final["response"] = text
+            tokens = len(objs) - 1
+        else:
+            final = json.loads("".join(lines))
+            tokens = 0
+            if isinstance(final, dict):
+                # Ollama's eval_count, or the OpenAI-style usage on /v1 replies.
+                tokens = final.get("eval_count") or (final.get("usage") or {}).get("completion_tokens", 0)
+
+        if tps and tokens:
+            time.sleep(tokens / tps)
+        self._send_json(exchange["status"], self._emulate_timing(final, load_s, tokens))
+
+
+def serve(port=11435, host="127.0.0.1", recorder=None, player=None):
+    handler = type("BoundHandler", (Handler,), {"recorder": recorder, "player": player})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--store", default="ollama_recordings.jsonl")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--upstream", default="http://localhost:11434")
+    parser.add_argument("--tokens-per-sec", type=float, default=None)
+    parser.add_argument("--ttft", type=float, default=0.0, help="seconds before the first token")
+    parser.add_argument("--load-delay", type=float, default=0.0, help="seconds added when the model changes")
+    parser.add_argument("--loose", action="store_true",
+                        help="on a miss, serve the latest recording for the same path and model")
+    args = parser.parse_args(argv)
+
+    if args.mode == "record":
+        server = serve(args.port, args.host, recorder=Recorder(args.store, args.upstream))
+    else:
+        player = Player(args.store, args.tokens_per_sec, args.ttft, args.load_delay, strict=not args.loose)
+        server = serve(args.port, args.host, player=player)
+    print(f"{args.mode}ing on http://{args.host}:{args.port} ({args.store})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Bounded async fan-out.
+
+Runs many coroutines with at most ``concurrency`` in flight, gives each one
+its own deadline, and yields results in completion order so callers can
+start using early results while slower tasks are still running. Leaving the
+``async for`` early cancels whatever is still pending.
+"""
+
+import asyncio
+
+
+async def fan_out(jobs, concurrency=4, deadline=None):
+    """
+    ``jobs`` is an iterable of ``(name, make_coroutine)`` pairs, where
+    ``make_coroutine()`` returns a fresh awaitable.
+
+    Yields ``(name, result)``; a task that fails or misses its ``deadline``
+    (seconds) yields the exception instead of a result.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(name, make_coroutine):
+        async with semaphore:
+            try:
+                if deadline is None:
+                    return name, await make_coroutine()
+                return name, await asyncio.wait_for(make_coroutine(), deadline)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # includes asyncio.TimeoutError
+                return name, e
+
+    tasks = [asyncio.create_task(run(name, make)) for name, make in jobs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
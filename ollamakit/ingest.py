@@ -0,0 +1,119 @@
+"""
+Batched embedding ingestion into Qdrant.
+
+Documents are embedded ``batch_size`` at a time through /api/embed (which
+takes a list ``input``), with up to ``concurrency`` batches in flight; a
+``ConcurrencyTuner`` lowers that to whatever this server actually keeps up
+with (documents/sec stops improving, or batch latency climbs). As
+each batch comes back its points are upserted with ``wait=False``, so
+Qdrant indexes while the next batches are still being embedded; only the
+final upsert waits, and since Qdrant applies a collection's updates in
+order, everything is searchable once ``ingest`` returns.
+
+Install dependencies:
+    pip install qdrant-client requests
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .autotune import ConcurrencyTuner
+from .client import get_client
+
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+
+class IngestReport:
+    def __init__(self, docs, batches, embed_s, total_s):
+        self.docs = docs
+        self.batches = batches
+        self.embed_s = embed_s
+        self.total_s = total_s
+
+    @property
+    def docs_per_sec(self):
+        return self.docs / self.total_s if self.total_s else 0.0
+
+    def __str__(self):
+        return (f"ingested {self.docs} docs in {self.total_s:.2f}s "
+                f"({self.docs_per_sec:.1f} docs/sec, {self.batches} embed batches)")
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def ingest(qdrant, collection, texts, payloads=None, ids=None, model=DEFAULT_EMBED_MODEL,
+           batch_size=32, concurrency=4, upsert_size=256, client=None, cache=None,
+           autotune=True):
+    """
+    Embeds ``texts`` and upserts them into ``collection``; returns an IngestReport.
+
+    ``payloads`` defaults to ``{"text": text}`` per document and ``ids`` to
+    0..n-1. With an ``ollamakit.embedcache.EmbeddingCache`` as ``cache``,
+    only texts it hasn't seen are sent to Ollama.
+
+    ``autotune`` is a ``ConcurrencyTuner`` (pass the same one to repeated
+    ingests so they keep what it learned), ``True`` for a fresh one capped
+    at ``concurrency``, or ``False`` to always run ``concurrency`` batches.
+    """
+    from qdrant_client import models
+
+    client = client or get_client()
+    texts = list(texts)
+    payloads = list(payloads) if payloads is not None else [{"text": t} for t in texts]
+    ids = list(ids) if ids is not None else list(range(len(texts)))
+
+    started = time.perf_counter()
+    embed_s = 0.0
+    pending = []
+    batches = 0
+
+    def upsert(points, wait):
+        qdrant.upsert(collection_name=collection, points=points, wait=wait)
+
+    if autotune is True:
+        autotune = ConcurrencyTuner(max_limit=concurrency)
+    workers = concurrency
+    if autotune:
+        # One worker more than the tuner allows, so it can see demand
+        # beyond its current limit even at the top.
+        workers = autotune.max_limit + 1
+
+    def embed_batch(batch):
+        if cache is not None:
+            return cache.embed(model, batch, client=client)
+        return client.embed(model, batch)["embeddings"]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def embed(batch):
+            t0 = time.perf_counter()
+            if autotune:
+                vectors = autotune.call(model, lambda: embed_batch(batch), size=len(batch))
+            else:
+                vectors = embed_batch(batch)
+            return vectors, time.perf_counter() - t0
+
+        futures = {
+            pool.submit(embed, batch): start
+            for start, batch in _batches(texts, batch_size)
+        }
+        for future in as_completed(futures):
+            start = futures[future]
+            vectors, seconds = future.result()
+            embed_s += seconds
+            batches += 1
+            for offset, vector in enumerate(vectors):
+                i = start + offset
+                pending.append(models.PointStruct(id=ids[i], vector=vector, payload=payloads[i]))
+            # Fire-and-forget while more batches are still embedding.
+            while len(pending) >= upsert_size and batches < len(futures):
+                upsert(pending[:upsert_size], wait=False)
+                del pending[:upsert_size]
+
+    # The last upsert waits: Qdrant applies updates in order, so every point
+    # is searchable once it returns.
+    if pending:
+        upsert(pending, wait=True)
+    return IngestReport(len(texts), batches, embed_s, time.perf_counter() - started)
@@ -0,0 +1,244 @@
+"""
+Load balancer over several OpenAI-compatible endpoints (e.g. many Ollama
+boxes serving /v1).
+
+Requests go to the healthy endpoint with the fewest outstanding requests,
+optionally pinned per conversation. Endpoints that fail repeatedly are
+ejected for a while; a health check (or the ejection timeout) brings them
+back. ``pool.chat.completions.create(...)`` mirrors the OpenAI client.
+
+Install dependencies:
+    pip install openai
+"""
+
+import collections
+import threading
+import time
+from types import SimpleNamespace
+
+import openai
+from openai import OpenAI
+
+from .stats import percentile
+
+FAILOVER_ERRORS = (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError)
+
+
+class Endpoint:
+    def __init__(self, base_url, api_key="ollama", timeout=120.0):
+        self.base_url = base_url
+        self.client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0)
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.latencies_ms = collections.deque(maxlen=500)
+
+    def healthy(self, now=None):
+        return (now or time.monotonic()) >= self.ejected_until
+
+
+class _PooledStream:
+    """
+    Wraps a streamed completion so its endpoint stays busy until the stream
+    has been read to the end or closed.
+    """
+
+    def __init__(self, stream, finish):
+        self._stream = stream
+        self._finish = finish
+        self._finished = False
+
+    def _done(self, error=None):
+        if not self._finished:
+            self._finished = True
+            self._finish(error)
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        except FAILOVER_ERRORS as e:
+            self._done(e)
+            raise
+        finally:
+            self._done()
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._done()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class OpenAIPool:
+    """
+    ``endpoints`` is a list of base URLs, ``(base_url, api_key)`` tuples or
+    ``{"base_url": ..., "api_key": ...}`` dicts.
+
+    - ``eject_after``: consecutive failures before an endpoint is ejected.
+    - ``eject_seconds``: how long an ejected endpoint is skipped.
+    - ``failover_timeouts``: also fail over when a request times out. Off by
+      default: the timed-out generation may still be running on that node,
+      so resending it elsewhere doubles the load.
+    """
+
+    def __init__(self, endpoints, eject_after=3, eject_seconds=30.0, timeout=120.0,
+                 max_sticky=10000, failover_timeouts=False):
+        self.endpoints = []
+        for ep in endpoints:
+            if isinstance(ep, str):
+                ep = {"base_url": ep}
+            elif isinstance(ep, tuple):
+                ep = {"base_url": ep[0], "api_key": ep[1]}
+            self.endpoints.append(Endpoint(timeout=timeout, **ep))
+        if not self.endpoints:
+            raise ValueError("OpenAIPool needs at least one endpoint")
+
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.max_sticky = max_sticky
+        self.failover_timeouts = failover_timeouts
+
+        self._sticky = collections.OrderedDict()  # conversation_id -> Endpoint
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stop = threading.Event()
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    # ---------------------------------------------
+    # Routing
+    # ---------------------------------------------
+    def _pick(self, conversation_id=None, exclude=()):
+        now = time.monotonic()
+        with self._lock:
+            if conversation_id is not None:
+                ep = self._sticky.get(conversation_id)
+                if ep is not None and ep.healthy(now) and ep not in exclude:
+                    self._sticky.move_to_end(conversation_id)
+                    ep.outstanding += 1
+                    return ep
+
+            candidates = [e for e in self.endpoints if e.healthy(now) and e not in exclude]
+            if not candidates:
+                # Everything is ejected: try the one that comes back soonest.
+                candidates = [min((e for e in self.endpoints if e not in exclude),
+                                  key=lambda e: e.ejected_until, default=None)]
+                if candidates[0] is None:
+                    return None
+            ep = min(candidates, key=lambda e: e.outstanding)
+            ep.outstanding += 1
+
+            if conversation_id is not None:
+                self._sticky[conversation_id] = ep
+                self._sticky.move_to_end(conversation_id)
+                while len(self._sticky) > self.max_sticky:
+                    self._sticky.popitem(last=False)
+            return ep
+
+    def _finish(self, ep, started, error=None):
+        with self._lock:
+            ep.outstanding -= 1
+            ep.requests += 1
+            if error is None:
+                ep.consecutive_failures = 0
+                ep.latencies_ms.append((time.perf_counter() - started) * 1000)
+                return
+            ep.errors += 1
+            ep.consecutive_failures += 1
+            if ep.consecutive_failures >= self.eject_after:
+                ep.ejected_until = time.monotonic() + self.eject_seconds
+
+    def create(self, conversation_id=None, **kwargs):
+        """
+        Same arguments as ``client.chat.completions.create``. On connection
+        errors, 5xx or 429 the request fails over to the next endpoint
+        (timeouts only with ``failover_timeouts``). With ``stream=True`` the
+        endpoint counts as busy until the returned stream is exhausted or
+        closed.
+        """
+        tried = []
+        last_error = None
+        while True:
+            ep = self._pick(conversation_id, exclude=tried)
+            if ep is None:
+                raise last_error
+            started = time.perf_counter()
+            try:
+                response = ep.client.chat.completions.create(**kwargs)
+            except openai.APITimeoutError as e:
+                self._finish(ep, started, error=e)
+                if not self.failover_timeouts:
+                    raise
+                tried.append(ep)
+                last_error = e
+                continue
+            except FAILOVER_ERRORS as e:
+                self._finish(ep, started, error=e)
+                tried.append(ep)
+                last_error = e
+                continue
+            except Exception:
+                self._finish(ep, started)  # a client-side error says nothing about the node
+                raise
+            if kwargs.get("stream"):
+                return _PooledStream(response, lambda error, ep=ep, started=started:
+                                     self._finish(ep, started, error=error))
+            self._finish(ep, started)
+            return response
+
+    # ---------------------------------------------
+    # Health checks
+    # ---------------------------------------------
+    def health_check(self, timeout=3.0):
+        """Lists models on every endpoint; ejects the ones that don't answer."""
+        for ep in self.endpoints:
+            try:
+                ep.client.with_options(timeout=timeout).models.list()
+            except Exception:
+                with self._lock:
+                    ep.consecutive_failures = max(ep.consecutive_failures, self.eject_after)
+                    ep.ejected_until = time.monotonic() + self.eject_seconds
+            else:
+                with self._lock:
+                    ep.consecutive_failures = 0
+                    ep.ejected_until = 0.0
+
+    def start_health_checks(self, interval=10.0):
+        """Runs health_check() every ``interval`` seconds in a daemon thread."""
+        def loop():
+            while not self._stop.wait(interval):
+                self.health_check()
+
+        self._health_thread = threading.Thread(target=loop, daemon=True)
+        self._health_thread.start()
+
+    def close(self):
+        self._stop.set()
+        for ep in self.endpoints:
+            ep.client.close()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                ep.base_url: {
+                    "healthy": ep.healthy(now),
+                    "outstanding": ep.outstanding,
+                    "requests": ep.requests,
+                    "errors": ep.errors,
+                    "p50_ms": percentile(list(ep.latencies_ms), 50),
+                    "p95_ms": percentile(list(ep.latencies_ms), 95),
+                }
+                for ep in self.endpoints
+            }
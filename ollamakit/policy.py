@@ -0,0 +1,328 @@
+"""
+Retry / backoff / circuit-breaker policy for outbound calls.
+
+Built on the ``backoff`` package. Retries use decorrelated-jitter
+exponential backoff so concurrent clients don't retry in lockstep, a retry
+budget caps how much extra load retries may add, and each endpoint gets its
+own circuit breaker that fails fast while the endpoint is down and lets a
+single probe through once ``reset_timeout`` has passed (half-open).
+
+By default only failures where the server did no work are retried:
+connection errors and requests it turned away (429/503). A timed-out or
+5xx generate/chat call may still be running on the GPU, so retrying it
+doubles the load; pass ``retry_timeouts=True`` to retry those as well.
+
+Install dependencies:
+    pip install backoff requests
+"""
+
+import asyncio
+import functools
+import random
+import threading
+import time
+
+import backoff
+import requests
+from urllib3.exceptions import NewConnectionError
+
+try:
+    import httpx
+except ImportError:  # the async client is optional
+    httpx = None
+
+REJECTED_STATUS = {429, 503}
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+def decorrelated_jitter(base=0.5, cap=30.0):
+    """
+    backoff wait generator: ``sleep = min(cap, uniform(base, previous * 3))``.
+    Pass ``jitter=None`` to backoff, since the jitter is already applied here.
+    """
+    yield  # backoff primes the generator with send(None)
+    sleep = base
+    while True:
+        sleep = min(cap, random.uniform(base, sleep * 3))
+        yield sleep
+
+
+def _chain(exc):
+    """``exc`` and everything it wraps (causes, contexts, urllib3 ``reason``s)."""
+    seen = set()
+    stack = [exc]
+    while stack:
+        e = stack.pop()
+        if not isinstance(e, BaseException) or id(e) in seen:
+            continue
+        seen.add(id(e))
+        yield e
+        stack += [e.__cause__, e.__context__, getattr(e, "reason", None), *e.args]
+
+
+def is_connect_error(exc):
+    """The request never reached the server (refused, unreachable, connect timeout)."""
+    if isinstance(exc, (requests.ConnectTimeout, ConnectionRefusedError)):
+        return True
+    if isinstance(exc, requests.ConnectionError):
+        # requests also raises ConnectionError when an established connection
+        # drops mid-response ("Connection aborted"); only a failed connect counts.
+        return any(isinstance(e, (NewConnectionError, ConnectionRefusedError)) for e in _chain(exc))
+    return httpx is not None and isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def is_retryable(exc, timeouts=False):
+    """
+    Connection errors, 429 and 503 are worth retrying; with ``timeouts``
+    also read timeouts, dropped connections and other 5xx. 4xx never are.
+    """
+    if is_connect_error(exc):
+        return True
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if not timeouts:
+        return status in REJECTED_STATUS
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    return status in RETRYABLE_STATUS
+
+
+def is_timeout(exc):
+    """The call ran past its read deadline (connect timeouts don't count)."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return False
+    if isinstance(exc, (requests.Timeout, asyncio.TimeoutError, TimeoutError)):
+        return True
+    if httpx is not None and isinstance(exc, httpx.TimeoutException):
+        return not isinstance(exc, httpx.ConnectTimeout)
+    return False
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to ``ratio`` of first attempts.
+
+    Every first attempt deposits ``ratio`` tokens (up to ``max_tokens``);
+    every retry spends one. When the bucket is empty, failures are returned
+    to the caller instead of being retried.
+    """
+
+    def __init__(self, ratio=0.2, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """closed -> open after ``failure_threshold`` consecutive failures;
+    open -> half-open after ``reset_timeout`` seconds, admitting one probe;
+    the probe's outcome closes or re-opens the circuit."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(f"circuit open ({self.failures} consecutive failures)")
+
+    def release_probe(self):
+        """Frees the half-open probe slot without judging the endpoint."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Shared policy for one family of outbound calls.
+
+    ``policy.call(endpoint, fn, *args)`` / ``await policy.acall(...)`` run a
+    call under the policy; ``@policy.wrap(endpoint)`` does the same as a
+    decorator for sync or async functions. ``retry_timeouts`` opts in to
+    retrying timeouts and 5xx (see the module docstring).
+    """
+
+    def __init__(self, max_tries=4, max_time=None, base=0.5, cap=30.0,
+                 budget=None, failure_threshold=5, reset_timeout=30.0, retry_timeouts=False):
+        self.max_tries = max_tries
+        self.max_time = max_time
+        self.base = base
+        self.cap = cap
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retry_timeouts = retry_timeouts
+
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.giveups = 0
+
+    def breaker(self, endpoint):
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[endpoint]
+
+    # ---------------------------------------------
+    # backoff hooks
+    # ---------------------------------------------
+    def _on_backoff(self, details):
+        self.retries += 1
+
+    def _on_giveup(self, details):
+        self.giveups += 1
+
+    def _decorate(self, attempt):
+        """Retries one call's ``attempt``; a fresh wrapper per call tracks its tries."""
+        started = time.monotonic()
+        tries = 0
+
+        def last_try():
+            return tries >= self.max_tries or (
+                self.max_time is not None and time.monotonic() - started >= self.max_time)
+
+        def giveup(exc):
+            if isinstance(exc, CircuitOpenError) or not is_retryable(exc, self.retry_timeouts):
+                return True
+            # backoff asks before checking its own limits; only spend budget
+            # on a retry that will actually happen.
+            return last_try() or not self.budget.try_spend()
+
+        if asyncio.iscoroutinefunction(attempt):
+            async def counted():
+                nonlocal tries
+                tries += 1
+                return await attempt()
+        else:
+            def counted():
+                nonlocal tries
+                tries += 1
+                return attempt()
+
+        return backoff.on_exception(
+            decorrelated_jitter, Exception,
+            max_tries=self.max_tries, max_time=self.max_time, jitter=None,
+            giveup=giveup, on_backoff=self._on_backoff, on_giveup=self._on_giveup,
+            logger=None, base=self.base, cap=self.cap,
+        )(counted)
+
+    def _record(self, breaker, exc):
+        # Only server-side trouble counts against the endpoint; a 404 or a
+        # bad request says nothing about its health.
+        if is_retryable(exc, timeouts=True):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    # ---------------------------------------------
+    # Entry points
+    # ---------------------------------------------
+    def call(self, endpoint, fn, *args, **kwargs):
+        breaker = self.breaker(endpoint)
+        self.budget.deposit()
+
+        def attempt():
+            breaker.before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._record(breaker, e)
+                raise
+            breaker.record_success()
+            return result
+
+        return self._decorate(attempt)()
+
+    async def acall(self, endpoint, fn, *args, **kwargs):
+        breaker = self.breaker(endpoint)
+        self.budget.deposit()
+
+        async def attempt():
+            breaker.before_call()
+            try:
+                result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                self._record(breaker, e)
+                raise
+            breaker.record_success()
+            return result
+
+        return await self._decorate(attempt)()
+
+    def wrap(self, endpoint):
+        """Decorator form of call()/acall()."""
+        def decorator(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    return await self.acall(endpoint, fn, *args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return self.call(endpoint, fn, *args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            breakers = {ep: b.state for ep, b in self._breakers.items()}
+        return {"retries": self.retries, "giveups": self.giveups, "breakers": breakers}
+
+
+_default_policy = None
+
+
+def get_policy():
+    """Returns the process-wide shared RetryPolicy."""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = RetryPolicy()
+    return _default_policy
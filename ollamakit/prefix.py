@@ -0,0 +1,100 @@
+"""
+Prefix KV reuse through Ollama's ``context`` tokens.
+
+A fixed preamble (e.g. few-shot examples) is evaluated once through
+/api/generate. The ``context`` array it returns is then passed with every
+follow-up prompt, so Ollama only evaluates the new suffix instead of
+re-reading the whole preamble each call.
+
+Every call continues from that same warm-up context (replies are never
+appended to it), so the context stays the size of the prefix.
+"""
+
+import threading
+
+from .client import get_client
+
+
+class PrefixSession:
+    """
+    Evaluates ``prefix`` once for ``model`` and continues from it.
+
+    Ollama treats ``num_predict: 0`` as "no limit", so the warm-up call
+    generates a single token. The returned context ends with that token; it
+    is cut off so the cached context holds the prefix's tokens only.
+
+    With ``raw`` (the default) both calls skip the model's prompt template,
+    so the suffix continues the prefix text directly; write them as one
+    completion-style prompt. With ``raw=False`` the template is applied to
+    each call and the suffix arrives as a new user turn after the prefix's.
+    A prefix longer than ``max_context`` tokens isn't cached (its token
+    array would be sent with every call and could overflow ``num_ctx``);
+    calls then send prefix + suffix in full.
+    """
+
+    def __init__(self, prefix, model, client=None, options=None, raw=True, max_context=2048):
+        self.prefix = prefix
+        self.model = model
+        self.client = client or get_client()
+        self.options = dict(options or {})
+        self.raw = raw
+        self.max_context = max_context
+
+        self._context = None
+        self._lock = threading.Lock()
+
+        self.prefix_tokens = 0
+        self.prefix_eval_ns = 0
+        self.calls = 0
+        self.suffix_eval_ns = 0
+        self.prompt_eval_saved_ns = 0
+
+    def warm(self):
+        """Evaluates the prefix (once) and stores the returned context ([] if unusable)."""
+        with self._lock:
+            if self._context is not None:
+                return self._context
+            options = dict(self.options, num_predict=1)
+            data = self.client.generate(self.model, self.prefix, options=options, raw=self.raw)
+            context = data.get("context") or []
+            # Drop the generated token(s) from the end. prompt_eval_count
+            # can't be used as the length: it leaves out prompt tokens that
+            # were already in Ollama's cache.
+            generated = data.get("eval_count") or 0
+            if generated:
+                context = context[:-generated]
+            self._context = context if len(context) <= self.max_context else []
+            self.prefix_tokens = data.get("prompt_eval_count", 0)
+            self.prefix_eval_ns = data.get("prompt_eval_duration", 0)
+            return self._context
+
+    def reset(self):
+        """Drops the cached context, e.g. after the model was reloaded."""
+        with self._lock:
+            self._context = None
+
+    def complete(self, suffix, options=None, **extra):
+        """Generates a continuation of prefix + ``suffix``; returns the raw response."""
+        context = self.warm()
+        opts = dict(self.options, **(options or {}))
+        if not context:
+            data = self.client.generate(self.model, self.prefix + suffix, options=opts, raw=self.raw, **extra)
+            self.calls += 1
+            return data
+        data = self.client.generate(self.model, suffix, options=opts, context=context, raw=self.raw, **extra)
+
+        self.calls += 1
+        self.suffix_eval_ns += data.get("prompt_eval_duration", 0)
+        # Without the context the prefix would have been re-evaluated on this call.
+        self.prompt_eval_saved_ns += self.prefix_eval_ns
+        return data
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "cached": bool(self._context),
+            "prefix_tokens": self.prefix_tokens,
+            "prefix_eval_ms": self.prefix_eval_ns / 1e6,
+            "suffix_eval_ms": self.suffix_eval_ns / 1e6,
+            "prompt_eval_saved_ms": self.prompt_eval_saved_ns / 1e6,
+        }
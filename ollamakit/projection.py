@@ -0,0 +1,136 @@
+"""
+Payload projection for API-to-LLM prompts.
+
+API responses are mostly URLs and fields the prompt never asks about.
+``project()`` keeps only the declared fields, serializes them compactly and
+shrinks long strings until the result fits a token budget, reporting the
+estimated token counts before and after.
+
+Selectors are dotted paths; ``*`` walks every element of a list:
+    "license.spdx_id", "topics", "items.*.title"
+"""
+
+import json
+import math
+
+CHARS_PER_TOKEN = 4  # rough average for English text with llama-style tokenizers
+
+# Declarative field selections for the sources used by the examples.
+SOURCES = {
+    "github_repo": [
+        "full_name", "description", "language", "topics", "homepage",
+        "stargazers_count", "forks_count", "subscribers_count", "open_issues_count",
+        "license.name", "created_at", "pushed_at", "archived",
+    ],
+    "wikipedia_summary": ["title", "description", "extract"],
+    "dummyjson_quote": ["id", "quote", "author"],
+}
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _select(data, parts):
+    if not parts:
+        return data
+    head, rest = parts[0], parts[1:]
+    if head == "*":
+        if not isinstance(data, list):
+            return None
+        return [_select(item, rest) for item in data]
+    if isinstance(data, dict) and head in data:
+        return _select(data[head], rest)
+    return None
+
+
+def _merge(target, parts, value):
+    """Writes ``value`` into ``target`` under the nested path ``parts``."""
+    head, rest = parts[0], parts[1:]
+    if not rest:
+        target[head] = value
+        return
+    if head == "*":
+        raise ValueError("'*' cannot be the leading selector of a merged path")
+    child = target.setdefault(head, {})
+    if rest[0] == "*":
+        # Lists of projected objects: merge element-wise.
+        existing = child if isinstance(child, list) else []
+        for i, item in enumerate(value or []):
+            if i >= len(existing):
+                existing.append({} if len(rest) > 1 else None)
+            if len(rest) > 1:
+                _merge(existing[i], rest[1:], item)
+            else:
+                existing[i] = item
+        target[head] = existing
+    else:
+        _merge(child, rest, value)
+
+
+def select_fields(data, fields):
+    """Returns a new dict holding only the selected (present) fields."""
+    out = {}
+    for field in fields:
+        parts = field.split(".")
+        value = _select(data, parts)
+        if value is not None:
+            _merge(out, parts, value)
+    return out
+
+
+def _truncate_strings(data, limit):
+    if isinstance(data, str):
+        return data if len(data) <= limit else data[:limit] + "…"
+    if isinstance(data, list):
+        return [_truncate_strings(v, limit) for v in data]
+    if isinstance(data, dict):
+        return {k: _truncate_strings(v, limit) for k, v in data.items()}
+    return data
+
+
+class Projection:
+    def __init__(self, text, tokens_before, tokens_after, truncated):
+        self.text = text
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+        self.truncated = truncated
+
+    def __str__(self):
+        return self.text
+
+    def report(self):
+        return f"payload tokens: {self.tokens_before} -> {self.tokens_after}" + (
+            " (truncated to fit budget)" if self.truncated else "")
+
+
+def project(data, fields=None, source=None, budget=None):
+    """
+    Projects ``data`` to ``fields`` (or the registered ``SOURCES[source]``)
+    and serializes it compactly. With a token ``budget``, long strings are
+    cut down (halving their allowed length each round) and, as a last
+    resort, the serialized text itself is truncated.
+    """
+    if fields is None:
+        fields = SOURCES[source] if source else None
+    before = estimate_tokens(data if isinstance(data, str) else compact(data))
+
+    projected = select_fields(data, fields) if fields else data
+    text = projected if isinstance(projected, str) else compact(projected)
+    truncated = False
+
+    if budget is not None and estimate_tokens(text) > budget:
+        truncated = True
+        if not isinstance(projected, str):
+            limit = max(len(text), 64)
+            while estimate_tokens(text) > budget and limit > 32:
+                limit //= 2
+                text = compact(_truncate_strings(projected, limit))
+        if estimate_tokens(text) > budget:
+            text = text[:budget * CHARS_PER_TOKEN]
+
+    return Projection(text, before, estimate_tokens(text), truncated)
@@ -0,0 +1,99 @@
+"""
+ReAct generation that stops at the first complete action.
+
+Left alone, a model asked for "Thought: ... Action: ..." tends to keep
+going: it invents an Observation, more thoughts and a final answer, all of
+which are decoded and then thrown away. ``react_step`` streams the reply
+with ``Observation:`` as a stop sequence, parses the text as tokens arrive
+and cancels the stream as soon as the action pattern matches.
+"""
+
+import re
+
+from .client import get_client
+
+REACT_STOP = ["Observation:"]
+
+# "Action: tool[input]" - complete once the closing bracket arrives.
+BRACKET_ACTION = re.compile(r"Action:\s*(\w+)\[(.*?)\]")
+# "Action: <anything>" on its own line - complete at the end of that line.
+LINE_ACTION = re.compile(r"^[ \t]*Action:[ \t]*(.+?)[ \t]*\r?\n", re.MULTILINE | re.IGNORECASE)
+
+THOUGHT = re.compile(r"Thought:[ \t]*(.*)", re.IGNORECASE)
+
+
+class ReActStep:
+    """One Thought/Action turn: the text generated and the parsed action."""
+
+    def __init__(self, text, match, stopped_early=False, stats=None):
+        self.text = text
+        self.match = match
+        self.stopped_early = stopped_early
+        self.stats = stats or {}
+
+        thought = THOUGHT.search(text[:match.start()] if match else text)
+        self.thought = thought.group(1).strip() if thought else ""
+
+    @property
+    def action(self):
+        """The first group of the action pattern (tool name / action line), or None."""
+        return self.match.group(1).strip() if self.match else None
+
+    def __repr__(self):
+        return f"ReActStep(action={self.action!r}, stopped_early={self.stopped_early})"
+
+
+def parse_react(text, pattern=BRACKET_ACTION):
+    """Parses a finished reply (a trailing newline completes a last-line action)."""
+    return ReActStep(text, pattern.search(text + "\n"))
+
+
+def read_action(stream, pattern=BRACKET_ACTION, marker="Action:"):
+    """
+    Reads a TokenStream until ``pattern`` matches, then cancels it.
+
+    Every match of ``pattern`` must contain ``marker`` (case-insensitive), so
+    only the text from the line holding the latest marker is searched as
+    tokens arrive; pass ``marker=None`` to search everything each time.
+    If the stream ends first, the whole text is parsed as by ``parse_react``.
+    """
+    marker = marker.lower() if marker else None
+    parts = []
+    tail, tail_at = "", 0   # recent text and its offset in the full reply
+    tokens = iter(stream)
+    try:
+        for token in tokens:
+            parts.append(token)
+            if marker is not None:
+                tail += token
+                found = tail.lower().rfind(marker)
+                if found < 0:
+                    # Keep just enough to spot a marker split across tokens.
+                    cut = max(tail.rfind("\n") + 1, len(tail) - len(marker))
+                else:
+                    cut = tail.rfind("\n", 0, found) + 1
+                tail, tail_at = tail[cut:], tail_at + cut
+                if found < 0 or not pattern.search(tail):
+                    continue
+            # Confirm against the full reply so anchors like ^ see the real
+            # line starts (``tail`` may begin mid-line).
+            text = "".join(parts)
+            match = pattern.search(text, tail_at)
+            if match:
+                stream.cancel()
+                tokens.close()  # drops the connection, so Ollama stops decoding
+                return ReActStep(text, match, stopped_early=stream.final is None, stats=stream.stats())
+    finally:
+        tokens.close()
+    step = parse_react("".join(parts), pattern)
+    step.stats = stream.stats()
+    return step
+
+
+def react_step(model, prompt, client=None, pattern=BRACKET_ACTION, stop=REACT_STOP, options=None, **extra):
+    """Streams one ReAct turn for ``prompt`` and stops at the first action."""
+    client = client or get_client()
+    opts = dict(options or {})
+    opts["stop"] = list(opts.get("stop", [])) + list(stop)
+    stream = client.stream_generate(model, prompt, options=opts, **extra)
+    return read_action(stream, pattern)
@@ -0,0 +1,223 @@
+"""
+Model-affinity request scheduler.
+
+A CPU-only Ollama host reloads weights whenever consecutive requests target
+different models. This scheduler queues requests per model and keeps
+serving the currently loaded ("hot") model while it has work, switching
+only once another model has been held back for ``max_reorder_delay``
+seconds, so reordering never starves a model for long.
+
+The delay is a soft limit: it is checked whenever a worker becomes free,
+and requests already running are never interrupted, so a held-back
+request can wait up to one hot request longer. ``stats()`` reports the
+longest queueing time actually seen per model.
+
+Only a model that stays hot gets the long ``keep_alive``: the last queued
+request before the scheduler switches to another model is sent with
+``cold_keep_alive`` instead, so a model served once in passing doesn't sit
+in memory next to the one being served.
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+
+from .client import get_client
+
+_Request = collections.namedtuple("_Request", "enqueued_at path payload future")
+
+
+class ModelAffinityScheduler:
+    """
+    Dispatches queued requests to ``client`` grouped by model.
+
+    - ``max_reorder_delay``: seconds a request may be held back while another
+      model is being served, counted from its enqueue time or the last model
+      swap, whichever is later (a soft limit, see the module docstring).
+    - ``hot_keep_alive``: ``keep_alive`` sent while a model stays hot (more
+      of its requests are queued, or nothing else is waiting) so it stays
+      resident. Callers may override it per request.
+    - ``cold_keep_alive``: ``keep_alive`` for a model's last request before
+      the switch to another model (None: Ollama's default).
+    - ``concurrency``: worker threads; all of them serve the hot model.
+
+    Requests for a model pinned with ``pin()`` carry the pin's
+    ``keep_alive``, so dispatching them doesn't shorten the pin.
+    """
+
+    def __init__(self, client=None, max_reorder_delay=2.0, hot_keep_alive="10m", concurrency=1,
+                 cold_keep_alive=None):
+        self.client = client or get_client()
+        self.max_reorder_delay = max_reorder_delay
+        self.hot_keep_alive = hot_keep_alive
+        self.cold_keep_alive = cold_keep_alive
+        self._pinned = {}  # model -> keep_alive
+
+        self.hot_model = None
+        self._hot_since = 0.0
+        self.swaps = 0
+        self.records = []  # one dict per finished request
+
+        self._queues = collections.OrderedDict()  # model -> deque[_Request]
+        self._cond = threading.Condition()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(concurrency)
+        ]
+        for w in self._workers:
+            w.start()
+
+    # ---------------------------------------------
+    # Submission
+    # ---------------------------------------------
+    def submit(self, path, payload):
+        """Queues a raw API call; returns a Future for the decoded response."""
+        model = payload["model"]
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            self._queues.setdefault(model, collections.deque()).append(
+                _Request(time.monotonic(), path, payload, future)
+            )
+            self._cond.notify()
+        return future
+
+    def generate(self, model, prompt, options=None, **extra):
+        payload = {"model": model, "prompt": prompt, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+        return self.submit("/api/generate", payload).result()
+
+    def chat(self, model, messages, options=None, **extra):
+        payload = {"model": model, "messages": messages, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+        return self.submit("/api/chat", payload).result()
+
+    def embed(self, model, input, **extra):
+        return self.submit("/api/embed", {"model": model, "input": input, **extra}).result()
+
+    # ---------------------------------------------
+    # Pinning
+    # ---------------------------------------------
+    def _is_embedding_model(self, model):
+        try:
+            info = self.client.post("/api/show", {"model": model})
+        except requests.RequestException:
+            return False
+        return "embedding" in (info.get("capabilities") or [])
+
+    def _load(self, model, keep_alive, embedding):
+        # An empty request loads (or unloads) a model without running it;
+        # embedding models reject /api/generate, so they get an empty /api/embed.
+        if embedding is None:
+            embedding = self._is_embedding_model(model)
+        if embedding:
+            return self.client.embed(model, [], keep_alive=keep_alive)
+        return self.client.generate(model, "", keep_alive=keep_alive)
+
+    def pin(self, model, keep_alive=-1, embedding=None):
+        """
+        Loads ``model`` and keeps it resident (``-1`` = until unpinned).
+        ``embedding`` says whether it is an embedding model; by default
+        Ollama's /api/show is asked.
+        """
+        with self._cond:
+            self._pinned[model] = keep_alive
+        return self._load(model, keep_alive, embedding)
+
+    def unpin(self, model, embedding=None):
+        """Asks Ollama to unload ``model`` right away."""
+        with self._cond:
+            self._pinned.pop(model, None)
+        return self._load(model, 0, embedding)
+
+    # ---------------------------------------------
+    # Dispatch
+    # ---------------------------------------------
+    def _pick(self):
+        """Returns the next request to run, or None. Caller holds the lock."""
+        pending = {m: q for m, q in self._queues.items() if q}
+        if not pending:
+            return None
+
+        oldest_model = min(pending, key=lambda m: pending[m][0].enqueued_at)
+        hot_queue = pending.get(self.hot_model)
+        if hot_queue is not None and oldest_model != self.hot_model:
+            # Waiting is counted from the later of enqueue time and the last
+            # swap, so each hot model gets at least one full reorder window
+            # instead of alternating once every queue is overdue.
+            since = max(pending[oldest_model][0].enqueued_at, self._hot_since)
+            if time.monotonic() - since < self.max_reorder_delay:
+                return hot_queue.popleft()
+
+        if oldest_model != self.hot_model:
+            if self.hot_model is not None:
+                self.swaps += 1
+            self.hot_model = oldest_model
+            self._hot_since = time.monotonic()
+        return pending[oldest_model].popleft()
+
+    def _keep_alive(self, model):
+        """keep_alive for a request of ``model`` just picked. Caller holds the lock."""
+        if model in self._pinned:
+            return self._pinned[model]
+        others_waiting = any(q for m, q in self._queues.items() if m != model)
+        if self._queues.get(model) or not others_waiting:
+            return self.hot_keep_alive
+        return self.cold_keep_alive
+
+    def _run(self):
+        while True:
+            with self._cond:
+                request = self._pick()
+                while request is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    request = self._pick()
+                keep_alive = self._keep_alive(request.payload["model"])
+
+            payload = dict(request.payload)
+            if keep_alive is not None:
+                payload.setdefault("keep_alive", keep_alive)
+            started = time.monotonic()
+            try:
+                data = self.client.post(request.path, payload)
+            except Exception as e:
+                request.future.set_exception(e)
+                continue
+
+            with self._cond:
+                self.records.append({
+                    "model": payload["model"],
+                    "queued_ms": (started - request.enqueued_at) * 1000,
+                    "load_ms": data.get("load_duration", 0) / 1e6,
+                    "total_ms": (time.monotonic() - started) * 1000,
+                })
+            request.future.set_result(data)
+
+    def close(self):
+        """Finishes queued work and stops the workers."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for w in self._workers:
+            w.join()
+
+    def stats(self):
+        with self._cond:
+            records = list(self.records)
+        by_model = {}
+        for r in records:
+            s = by_model.setdefault(r["model"], {"requests": 0, "load_ms": 0.0, "max_load_ms": 0.0,
+                                                 "max_queued_ms": 0.0})
+            s["requests"] += 1
+            s["load_ms"] += r["load_ms"]
+            s["max_load_ms"] = max(s["max_load_ms"], r["load_ms"])
+            s["max_queued_ms"] = max(s["max_queued_ms"], r["queued_ms"])
+        return {"swaps": self.swaps, "hot_model": self.hot_model, "models": by_model}
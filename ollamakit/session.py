@@ -0,0 +1,130 @@
+"""
+Multi-turn conversations that continue from Ollama's ``context`` tokens.
+
+Each /api/generate response carries a ``context`` array: the tokenized
+conversation so far. Passing it back with the next prompt lets Ollama
+continue the conversation from the new turn alone instead of
+re-templating and re-reading the whole transcript. When the context can't
+be used (first turn, model switched, server rejected it or returned none)
+the session replays the plain-text transcript once and picks up the fresh
+context from that reply.
+"""
+
+import threading
+
+import requests
+
+from .client import get_client
+
+
+class ConversationSession:
+    """
+    A conversation with one model through /api/generate.
+
+    ``send(text)`` returns the assistant reply; ``turns`` keeps per-turn
+    stats (mode, prompt tokens evaluated, tokens carried in the context and
+    the estimated prompt-eval time that carrying them saved).
+    """
+
+    def __init__(self, model, system=None, client=None, options=None,
+                 user_label="User", assistant_label="Assistant"):
+        self.model = model
+        self.system = system
+        self.client = client or get_client()
+        self.options = dict(options or {})
+        self.user_label = user_label
+        self.assistant_label = assistant_label
+
+        self.transcript = []   # [(role, text)]
+        self.turns = []
+        self._context = None
+        self._context_model = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forgets the whole conversation."""
+        with self._lock:
+            self.transcript = []
+            self._context = None
+
+    def invalidate(self):
+        """Drops the cached context; the next turn replays the transcript."""
+        with self._lock:
+            self._context = None
+
+    def switch_model(self, model):
+        """Continues the same conversation with another model (via replay)."""
+        with self._lock:
+            self.model = model
+
+    def _replay_prompt(self, text):
+        lines = [
+            f"{self.user_label if role == 'user' else self.assistant_label}: {content}"
+            for role, content in self.transcript
+        ]
+        lines.append(f"{self.user_label}: {text}")
+        lines.append(f"{self.assistant_label}:")
+        return "\n".join(lines)
+
+    def _generate(self, prompt, context, options, extra):
+        if context is None and self.system:
+            extra = dict(extra, system=self.system)
+        if context is not None:
+            extra = dict(extra, context=context)
+        return self.client.generate(self.model, prompt, options=options, **extra)
+
+    def send(self, text, options=None, **extra):
+        """Sends one user turn and returns the assistant's reply text."""
+        with self._lock:
+            opts = dict(self.options, **(options or {}))
+            usable = self._context if self._context_model == self.model else None
+
+            data = None
+            mode = "context"
+            if usable is not None:
+                try:
+                    data = self._generate(text, usable, opts, extra)
+                except requests.HTTPError as exc:
+                    # 4xx: the server won't take this context (e.g. after a
+                    # model swap or upgrade); fall back to the transcript.
+                    status = exc.response.status_code if exc.response is not None else None
+                    if status is None or status >= 500:
+                        raise
+            if data is None:
+                mode = "replay"
+                usable = None
+                data = self._generate(self._replay_prompt(text) if self.transcript else text,
+                                      None, opts, extra)
+
+            reply = data.get("response", "")
+            self.transcript.append(("user", text))
+            self.transcript.append(("assistant", reply))
+            self._context = data.get("context")
+            self._context_model = self.model
+
+            evaluated = data.get("prompt_eval_count", 0)
+            eval_ns = data.get("prompt_eval_duration", 0)
+            carried = len(usable) if usable else 0
+            # Without the context, the carried tokens would have been read
+            # again at this turn's prompt-eval rate.
+            saved_ms = carried * eval_ns / evaluated / 1e6 if evaluated else 0.0
+            self.turns.append({
+                "turn": len(self.turns) + 1,
+                "mode": mode,
+                "model": self.model,
+                "prompt_eval_count": evaluated,
+                "prompt_eval_ms": eval_ns / 1e6,
+                "carried_tokens": carried,
+                "saved_ms_est": saved_ms,
+            })
+            return reply
+
+    def stats(self):
+        with self._lock:
+            return {
+                "turns": len(self.turns),
+                "replays": sum(1 for t in self.turns if t["mode"] == "replay"),
+                "prompt_eval_tokens": sum(t["prompt_eval_count"] for t in self.turns),
+                "carried_tokens": sum(t["carried_tokens"] for t in self.turns),
+                "saved_ms_est": sum(t["saved_ms_est"] for t in self.turns),
+            }
@@ -0,0 +1,218 @@
+"""
+Vectorized cosine similarity over embedding vectors.
+
+Vectors are normalized once and kept as rows of a float32 matrix, so
+scoring a query against the whole corpus is one matrix product and cosine
+similarity is a plain dot product. Top-k uses ``argpartition`` (linear
+time) instead of a full sort, and large corpora are scored in row chunks
+so the score matrix never has to fit in memory at once.
+
+Benchmark against the pure-Python loop:
+    python -m ollamakit.similarity [corpus_size] [dim]
+
+Install dependencies:
+    pip install numpy
+"""
+
+import math
+import sys
+import time
+
+import numpy as np
+
+
+# ---------------------------------------------
+# Single vectors
+# ---------------------------------------------
+def normalize(vectors):
+    """Returns ``vectors`` as float32 rows of unit length (zero rows stay zero)."""
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine(a, b):
+    """Cosine similarity of two vectors (0.0 if either is all zeros)."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if denom == 0:
+        return 0.0
+    return float(a @ b) / denom
+
+
+def cosine_loop(a, b):
+    """The original pure-Python implementation, kept as the benchmark baseline."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def top_k(scores, k):
+    """Indices of the ``k`` highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+# ---------------------------------------------
+# Corpus index
+# ---------------------------------------------
+class VectorIndex:
+    """
+    Normalized float32 embeddings with optional ids.
+
+    ``chunk_size`` bounds how many corpus rows are scored per matmul.
+    """
+
+    def __init__(self, vectors=None, ids=None, chunk_size=65536):
+        self.chunk_size = chunk_size
+        self._matrix = None
+        self._size = 0
+        self.ids = []
+        if vectors is not None and len(vectors):
+            self.add(vectors, ids)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+    def add(self, vectors, ids=None):
+        rows = normalize(vectors)
+        if ids is None:
+            ids = range(self._size, self._size + len(rows))
+        ids = list(ids)
+        if len(ids) != len(rows):
+            raise ValueError("ids and vectors differ in length")
+        if self._matrix is None:
+            self._matrix = np.empty((max(len(rows), 16), rows.shape[1]), dtype=np.float32)
+        elif rows.shape[1] != self._matrix.shape[1]:
+            raise ValueError(f"expected dimension {self._matrix.shape[1]}, got {rows.shape[1]}")
+        needed = self._size + len(rows)
+        if needed > len(self._matrix):
+            # Grow geometrically so repeated adds stay amortized O(n).
+            grown = np.empty((max(needed, 2 * len(self._matrix)), rows.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = rows
+        self._size = needed
+        self.ids.extend(ids)
+
+    def scores(self, queries):
+        """Full (queries x corpus) similarity matrix; prefer ``search`` for big corpora."""
+        return normalize(queries) @ self.matrix.T
+
+    def search(self, queries, k=5):
+        """
+        Top-``k`` matches for each query as a list of ``[(id, score), ...]``.
+
+        A single 1-D query returns just its list.
+        """
+        single = np.asarray(queries).ndim == 1
+        q = normalize(queries)
+        k = min(k, self._size)
+        if k <= 0:
+            return [] if single else [[] for _ in q]
+        best_scores = np.full((len(q), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(q), 0), dtype=np.int64)
+
+        for start in range(0, self._size, self.chunk_size):
+            chunk = q @ self.matrix[start:start + self.chunk_size].T
+            # Keep only each chunk's top-k, then merge with the running best.
+            kk = min(k, chunk.shape[1])
+            part = np.argpartition(-chunk, kk - 1, axis=1)[:, :kk]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(chunk, part, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, part + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        results = [
+            [(self.ids[row], float(score)) for row, score in zip(rows, scores)]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+        return results[0] if single else results
+
+    def near_duplicates(self, threshold=0.95):
+        """All pairs ``(id_a, id_b, score)`` with similarity >= ``threshold``."""
+        pairs = []
+        matrix = self.matrix
+        # Row blocks keep the score matrix at chunk x corpus.
+        block = max(1, min(self.chunk_size, (1 << 24) // max(self._size, 1)))
+        for start in range(0, self._size, block):
+            sims = matrix[start:start + block] @ matrix.T
+            rows, cols = np.nonzero(sims >= threshold)
+            rows += start
+            upper = cols > rows
+            for i, j in zip(rows[upper], cols[upper]):
+                pairs.append((self.ids[i], self.ids[j], float(sims[i - start, j])))
+        return pairs
+
+    def dedupe(self, threshold=0.95):
+        """Ids to keep: each item is dropped if an earlier kept one is a near-duplicate."""
+        dropped = set()
+        position = {id_: i for i, id_ in enumerate(self.ids)}
+        for a, b, _ in sorted(self.near_duplicates(threshold), key=lambda p: (position[p[0]], position[p[1]])):
+            if a not in dropped:
+                dropped.add(b)
+        return [id_ for id_ in self.ids if id_ not in dropped]
+
+
+# ---------------------------------------------
+# Benchmark
+# ---------------------------------------------
+def benchmark(corpus_size=2000, dim=768, queries=5, k=5, seed=0, reference=cosine_loop):
+    """Times one query-vs-corpus top-k with ``reference`` (pair at a time) and VectorIndex."""
+    rng = np.random.default_rng(seed)
+    corpus = rng.standard_normal((corpus_size, dim)).astype(np.float32)
+    qs = rng.standard_normal((queries, dim)).astype(np.float32)
+    corpus_lists = corpus.tolist()
+    qs_lists = qs.tolist()
+
+    started = time.perf_counter()
+    loop_top = []
+    for q in qs_lists:
+        scores = [reference(q, row) for row in corpus_lists]
+        loop_top.append(sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:k])
+    loop_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = VectorIndex(corpus)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    results = index.search(qs, k=k)
+    search_s = time.perf_counter() - started
+
+    agree = all([i for i, _ in res] == top for res, top in zip(results, loop_top))
+    return {
+        "corpus_size": corpus_size,
+        "dim": dim,
+        "queries": queries,
+        "loop_s": loop_s,
+        "index_build_s": build_s,
+        "search_s": search_s,
+        "speedup": loop_s / search_s if search_s else float("inf"),
+        "same_top_k": agree,
+    }
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 768
+    for key, value in benchmark(size, dim).items():
+        print(f"{key:>14}: {value}")
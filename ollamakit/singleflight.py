@@ -0,0 +1,244 @@
+"""
+Single-flight deduplication of identical in-flight requests.
+
+When several callers issue the same request at the same moment (Streamlit
+reruns, webhook retries, concurrent users), only the first one reaches
+Ollama; the others wait for and share its result. Streams are shared too:
+followers replay the tokens produced so far and then receive new ones as
+they arrive. Nothing is kept once the leader finishes, so this is not a
+cache.
+
+Identical requests are collapsed even when sampled (temperature > 0), so
+don't use a single-flight client for workloads that rely on independent
+samples, such as self-consistency voting.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+
+
+def flight_key(path, payload):
+    blob = json.dumps([path, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _AsyncCall:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Broadcast:
+    """Opens and pumps one TokenStream; any number of subscribers read it."""
+
+    def __init__(self, open_stream, on_finish):
+        self.stream = None
+        self.cancelled = False
+        self.tokens = []
+        self.finished = False
+        self.error = None
+        self.subscribers = 0
+        self._cond = threading.Condition()
+        self._on_finish = on_finish
+        threading.Thread(target=self._pump, args=(open_stream,), daemon=True).start()
+
+    def _pump(self, open_stream):
+        try:
+            # Opened here rather than by the first caller so the lock in
+            # SingleFlight.stream() is never held while waiting on Ollama.
+            stream = open_stream()
+            with self._cond:
+                self.stream = stream
+                if self.cancelled:
+                    stream.cancel()
+            for token in stream:
+                with self._cond:
+                    self.tokens.append(token)
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+            self._on_finish()
+
+    def subscribe(self):
+        with self._cond:
+            self.subscribers += 1
+        return SharedTokenStream(self)
+
+    def unsubscribe(self):
+        with self._cond:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.finished:
+                self.cancelled = True
+                if self.stream is not None:
+                    self.stream.cancel()
+
+
+class SharedTokenStream:
+    """A subscriber's view of a shared stream; mirrors TokenStream's API."""
+
+    def __init__(self, broadcast):
+        self._broadcast = broadcast
+        self._index = 0
+        self._detached = False
+
+    def __iter__(self):
+        b = self._broadcast
+        try:
+            while not self._detached:
+                with b._cond:
+                    while self._index >= len(b.tokens) and not b.finished:
+                        b._cond.wait()
+                    new = b.tokens[self._index:]
+                    finished = b.finished
+                for token in new:
+                    self._index += 1
+                    yield token
+                if finished and self._index >= len(b.tokens):
+                    if b.error is not None:
+                        raise b.error
+                    return
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """Detaches this subscriber; the upstream stops once nobody listens."""
+        if not self._detached:
+            self._detached = True
+            self._broadcast.unsubscribe()
+
+    def read(self):
+        for _ in self:
+            pass
+        return self.text
+
+    @property
+    def text(self):
+        return "".join(self._broadcast.tokens[:self._index])
+
+    @property
+    def final(self):
+        stream = self._broadcast.stream
+        return stream.final if stream is not None else None
+
+    def stats(self):
+        stream = self._broadcast.stream
+        stats = stream.stats() if stream is not None else {}
+        return dict(stats, shared_subscribers=self._broadcast.subscribers)
+
+
+class SingleFlight:
+    def __init__(self):
+        self.collapsed = 0
+        self._calls = {}
+        self._async_calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Runs ``fn()`` unless a call with ``key`` is already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            finished = False
+            try:
+                call.result = fn()
+                finished = True
+            except Exception as e:
+                call.error = e
+                finished = True
+            finally:
+                if not finished:
+                    # KeyboardInterrupt/SystemExit: the leader re-raises it,
+                    # but followers must not take the missing result for None.
+                    call.error = RuntimeError("single-flight leader was interrupted")
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key, make_coroutine):
+        """
+        Async variant of do(). The call runs in its own task that every
+        caller awaits, so a caller that is cancelled only stops waiting; the
+        call itself is cancelled once nobody is waiting for it.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._async_calls.get((key, loop))
+            if call is None:
+                call = self._async_calls[(key, loop)] = _AsyncCall(loop.create_task(make_coroutine()))
+                call.task.add_done_callback(lambda task: self._async_done((key, loop), call))
+            else:
+                self.collapsed += 1
+            call.waiters += 1
+
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # If the call's task itself was cancelled, every caller gets the
+            # CancelledError (never a None result).
+            with self._lock:
+                if call.waiters == 1:
+                    # Forget the call right away so a caller arriving before
+                    # the task has finished starts a new one instead of
+                    # inheriting this cancellation.
+                    if self._async_calls.get((key, loop)) is call:
+                        del self._async_calls[(key, loop)]
+                    call.task.cancel()
+            raise
+        finally:
+            with self._lock:
+                call.waiters -= 1
+
+    def _async_done(self, key, call):
+        with self._lock:
+            if self._async_calls.get(key) is call:
+                del self._async_calls[key]
+        if not call.task.cancelled():
+            call.task.exception()  # marks it retrieved when every caller has left
+
+    def stream(self, key, open_stream):
+        """Returns a SharedTokenStream, opening the upstream only for the first caller."""
+        with self._lock:
+            broadcast = self._streams.get(key)
+            if broadcast is not None:
+                self.collapsed += 1
+                return broadcast.subscribe()
+
+            def finish():
+                with self._lock:
+                    if self._streams.get(key) is broadcast:
+                        del self._streams[key]
+
+            broadcast = _Broadcast(open_stream, finish)
+            self._streams[key] = broadcast
+            return broadcast.subscribe()
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls) + len(self._async_calls) + len(self._streams)
+        return {"collapsed": self.collapsed, "in_flight": in_flight}
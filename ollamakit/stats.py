@@ -0,0 +1,14 @@
+"""
+Small statistics helpers shared by the latency and throughput trackers.
+"""
+
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
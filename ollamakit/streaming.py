@@ -0,0 +1,128 @@
+"""
+Streaming reader for Ollama's NDJSON responses.
+
+Yields tokens as they arrive, keeps them in a list so the full text is
+joined once at the end (instead of ``res = res + token`` per line), and
+records time-to-first-token, tokens/sec and the final ``done`` stats.
+"""
+
+import json
+import threading
+import time
+
+
+class TokenStream:
+    """
+    Iterator over the tokens of a streamed /api/generate or /api/chat call.
+
+    ``response`` is a ``requests`` response opened with ``stream=True``.
+    ``started_at`` should be the ``time.perf_counter()`` taken just before the
+    request was sent, so time-to-first-token includes queueing and prompt
+    evaluation. Call ``cancel()`` (from any thread) to stop mid-stream.
+    ``on_done(final)`` is called with the last chunk once the stream completes;
+    ``on_close()`` is called once when iteration ends for any reason.
+    """
+
+    def __init__(self, response, started_at=None, cancel_event=None, on_done=None, on_close=None):
+        self.response = response
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.cancel_event = cancel_event or threading.Event()
+        self.on_done = on_done
+        self.on_close = on_close
+
+        self.parts = []
+        self.final = None  # the last chunk, carrying Ollama's done stats
+        self.first_token_at = None
+        self.finished_at = None
+        self.cancelled = False
+
+    # ---------------------------------------------
+    # Parsing
+    # ---------------------------------------------
+    def _lines(self):
+        buffer = bytearray()
+        for chunk in self.response.iter_content(chunk_size=None):
+            if self.cancel_event.is_set():
+                return
+            buffer.extend(chunk)
+            start = 0
+            while True:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                if end > start:
+                    yield bytes(buffer[start:end])
+                start = end + 1
+            del buffer[:start]
+        if buffer.strip():
+            yield bytes(buffer)
+
+    @staticmethod
+    def _token(obj):
+        if "response" in obj:
+            return obj["response"]
+        return (obj.get("message") or {}).get("content", "")
+
+    def __iter__(self):
+        try:
+            for line in self._lines():
+                obj = json.loads(line)
+                if "error" in obj:
+                    raise RuntimeError(f"Ollama error: {obj['error']}")
+                token = self._token(obj)
+                if token:
+                    if self.first_token_at is None:
+                        self.first_token_at = time.perf_counter()
+                    self.parts.append(token)
+                    yield token
+                if obj.get("done"):
+                    self.final = obj
+                    if self.on_done is not None:
+                        self.on_done(obj)
+                    break
+                if self.cancel_event.is_set():
+                    break
+        finally:
+            self.finished_at = time.perf_counter()
+            self.cancelled = self.cancel_event.is_set() and self.final is None
+            self.response.close()
+            if self.on_close is not None:
+                on_close, self.on_close = self.on_close, None
+                on_close()
+
+    # ---------------------------------------------
+    # Results
+    # ---------------------------------------------
+    def cancel(self):
+        self.cancel_event.set()
+
+    def read(self):
+        """Consumes the rest of the stream and returns the full text."""
+        for _ in self:
+            pass
+        return self.text
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def stats(self):
+        stats = {
+            "tokens": len(self.parts),
+            "cancelled": self.cancelled,
+            "ttft_ms": None,
+            "tokens_per_sec": None,
+        }
+        if self.first_token_at is not None:
+            stats["ttft_ms"] = (self.first_token_at - self.started_at) * 1000
+            decode_s = (self.finished_at or time.perf_counter()) - self.first_token_at
+            if decode_s > 0 and len(self.parts) > 1:
+                stats["tokens_per_sec"] = (len(self.parts) - 1) / decode_s
+        if self.final:
+            for field in ("total_duration", "load_duration", "prompt_eval_count",
+                          "prompt_eval_duration", "eval_count", "eval_duration"):
+                if field in self.final:
+                    stats[field] = self.final[field]
+            if self.final.get("eval_duration"):
+                stats["server_tokens_per_sec"] = self.final.get("eval_count", 0) / (self.final["eval_duration"] / 1e9)
+        return stats
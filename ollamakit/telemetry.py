@@ -0,0 +1,211 @@
+"""
+Per-call LLM telemetry from Ollama's timing fields.
+
+Every Ollama response carries total/load/prompt-eval/eval durations and
+token counts. Telemetry records them per call, tagged with the calling
+function, the model and an optional pattern name, aggregates them into
+histograms, and exports a Prometheus text file and/or a JSONL log. The
+breakdown tells whether a slow agent is prompt-bound, decode-bound or
+stuck reloading the model.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+
+DURATION_FIELDS = ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration")
+COUNT_FIELDS = ("prompt_eval_count", "eval_count")
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384)
+
+_pattern = contextvars.ContextVar("ollamakit_pattern", default=None)
+_SKIPPED_MODULES = ("ollamakit", "asyncio", "threading", "concurrent", "backoff")
+
+
+def find_caller():
+    """``file:function`` of the first frame outside ollamakit and the stdlib plumbing."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.split(".")[0] not in _SKIPPED_MODULES:
+            return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+
+class Telemetry:
+    """
+    Collects one record per LLM call.
+
+    ``jsonl_path``: if set, every record is appended there as it happens.
+    ``prometheus_path``: if set, the metrics are rewritten there at most
+    every ``prometheus_interval`` seconds while calls come in, and once more
+    at exit.
+    Use ``with telemetry.pattern("self-consistency"):`` to tag calls.
+    """
+
+    def __init__(self, jsonl_path=None, prometheus_path=None, prometheus_interval=15.0):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.prometheus_interval = prometheus_interval
+        self._histograms = {}  # (metric, labels) -> Histogram
+        self._calls = {}       # labels -> count
+        self._lock = threading.Lock()
+        self._prometheus_written = 0.0
+        if prometheus_path:
+            atexit.register(self.write_prometheus, prometheus_path)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def pattern(name):
+        """Tags every call made inside the block (and tasks it spawns) with ``name``."""
+        token = _pattern.set(name)
+        try:
+            yield
+        finally:
+            _pattern.reset(token)
+
+    def record(self, data, endpoint, model, caller=None, pattern=None, latency_s=None):
+        """Records the timing fields of one decoded Ollama response."""
+        if not isinstance(data, dict):
+            return
+        caller = caller or find_caller()
+        pattern = pattern or _pattern.get() or "none"
+        labels = (("model", model or data.get("model") or "unknown"),
+                  ("endpoint", endpoint), ("pattern", pattern), ("caller", caller))
+
+        row = {"ts": time.time(), **dict(labels)}
+        if latency_s is not None:
+            row["latency_s"] = latency_s
+        for field in DURATION_FIELDS:
+            if field in data:
+                row[field + "_s"] = data[field] / 1e9
+        for field in COUNT_FIELDS:
+            if field in data:
+                row[field] = data[field]
+
+        with self._lock:
+            self._calls[labels] = self._calls.get(labels, 0) + 1
+            for field in DURATION_FIELDS:
+                if field + "_s" in row:
+                    self._observe(field + "_seconds", labels, SECONDS_BUCKETS, row[field + "_s"])
+            for field in COUNT_FIELDS:
+                if field in row:
+                    self._observe(field.replace("_count", "_tokens"), labels, TOKEN_BUCKETS, row[field])
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+            export = (self.prometheus_path is not None
+                      and time.monotonic() - self._prometheus_written >= self.prometheus_interval)
+            if export:
+                self._prometheus_written = time.monotonic()
+        if export:
+            self.write_prometheus(self.prometheus_path)
+
+    def _observe(self, metric, labels, buckets, value):
+        key = (metric, labels)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = Histogram(buckets)
+        hist.observe(value)
+
+    # ---------------------------------------------
+    # Export
+    # ---------------------------------------------
+    @staticmethod
+    def _labels(labels, extra=()):
+        def escape(v):
+            return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        parts = [f'{k}="{escape(v)}"' for k, v in labels + tuple(extra)]
+        return "{" + ",".join(parts) + "}"
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            lines.append("# TYPE ollama_calls_total counter")
+            for labels, count in sorted(self._calls.items()):
+                lines.append(f"ollama_calls_total{self._labels(labels)} {count}")
+
+            by_metric = {}
+            for (metric, labels), hist in self._histograms.items():
+                by_metric.setdefault(metric, []).append((labels, hist))
+            for metric in sorted(by_metric):
+                name = f"ollama_{metric}"
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(by_metric[metric], key=lambda x: x[0]):
+                    cumulative = 0
+                    for bound, n in zip(hist.buckets, hist.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {hist.count}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {hist.sum}")
+                    lines.append(f"{name}_count{self._labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Writes the metrics atomically (for node_exporter's textfile collector)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def summary(self):
+        """
+        Mean seconds per phase for each (model, pattern, caller), plus which
+        phase dominates: "load", "prompt" or "decode".
+        """
+        out = {}
+        with self._lock:
+            for (metric, labels), hist in self._histograms.items():
+                if not metric.endswith("_seconds"):
+                    continue
+                d = dict(labels)
+                key = f"{d['model']} {d['pattern']} {d['caller']}"
+                out.setdefault(key, {})[metric.replace("_duration_seconds", "_s")] = hist.sum / hist.count
+        for phases in out.values():
+            shares = {
+                "load": phases.get("load_s", 0.0),
+                "prompt": phases.get("prompt_eval_s", 0.0),
+                "decode": phases.get("eval_s", 0.0),
+            }
+            phases["bound"] = max(shares, key=shares.get)
+        return out
+
+
+_default_telemetry = None
+
+
+def get_telemetry():
+    """
+    Process-wide Telemetry. Set OLLAMAKIT_TELEMETRY_JSONL to also log calls
+    and OLLAMAKIT_TELEMETRY_PROM to keep a Prometheus text file up to date.
+    """
+    global _default_telemetry
+    if _default_telemetry is None:
+        _default_telemetry = Telemetry(jsonl_path=os.environ.get("OLLAMAKIT_TELEMETRY_JSONL"),
+                                       prometheus_path=os.environ.get("OLLAMAKIT_TELEMETRY_PROM"))
+    return _default_telemetry
@@ -0,0 +1,70 @@
+"""
+Shared fixtures: a replaying ``ollamakit.fakeserver`` on an ephemeral port.
+
+Run from the repo root:
+    python -m pytest -q tests
+"""
+
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ollamakit.fakeserver import Player, exchange_key, serve
+
+
+def exchange(path, model, response, status=200, request=None, streaming=False):
+    """One recorded exchange; ``response`` is an object, or a list of stream chunks."""
+    request = dict(request or {}, model=model)
+    if streaming:
+        lines = [json.dumps(chunk) + "\n" for chunk in response]
+        content_type = "application/x-ndjson"
+    else:
+        lines = [json.dumps(response)]
+        content_type = "application/json"
+    return {
+        "key": exchange_key("POST", path, request), "method": "POST", "path": path,
+        "request": request, "status": status, "content_type": content_type,
+        "streaming": streaming, "lines": lines,
+    }
+
+
+def generate(model, text, eval_count=10, request=None, **fields):
+    return exchange("/api/generate", model,
+                    {"model": model, "response": text, "done": True, "eval_count": eval_count, **fields},
+                    request=request)
+
+
+def chat(model, text, eval_count=10, request=None, **fields):
+    return exchange("/api/chat", model,
+                    {"model": model, "message": {"role": "assistant", "content": text},
+                     "done": True, "eval_count": eval_count, **fields},
+                    request=request)
+
+
+@pytest.fixture
+def fake_ollama(tmp_path):
+    """
+    ``fake_ollama(exchanges, ttft=..., tokens_per_sec=...)`` serves the given
+    exchanges (matched loosely by path and model) and returns its base URL.
+    """
+    servers = []
+
+    def start(exchanges, **player_options):
+        store = tmp_path / f"recordings{len(servers)}.jsonl"
+        with open(store, "w", encoding="utf-8") as f:
+            for ex in exchanges:
+                f.write(json.dumps(ex) + "\n")
+        server = serve(port=0, player=Player(str(store), strict=False, **player_options))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.admission import AdmissionController
+
+
+def test_outstanding_calls_are_capped(fake_ollama):
+    base_url = fake_ollama([generate("m", "ok")], ttft=0.1)
+    admission = AdmissionController(max_outstanding=2)
+
+    async def main():
+        async with OllamaClient(base_url, admission=admission) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(client.agenerate("m", f"p{i}") for i in range(6)))
+            return time.perf_counter() - started
+
+    # Six calls, two at a time: three rounds of 0.1s.
+    assert asyncio.run(main()) >= 0.3
+    assert admission.stats()["interactive"]["admitted"] == 6
+    assert admission.stats()["interactive"]["outstanding"] == 0
+
+
+def test_interactive_jumps_a_batch_backlog():
+    admission = AdmissionController(max_outstanding=1)
+    order = []
+    release = admission.acquire("batch")
+
+    def worker(name, priority):
+        with admission.admit(priority):
+            order.append(name)
+
+    threads = [threading.Thread(target=worker, args=(f"batch{i}", "batch")) for i in range(3)]
+    threads.append(threading.Thread(target=worker, args=("interactive", "interactive")))
+    for t in threads:
+        t.start()
+        time.sleep(0.02)  # enqueue in a known order
+    release()
+    for t in threads:
+        t.join()
+    assert order[0] == "interactive"
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    admission = AdmissionController(max_outstanding=1)
+
+    async def main():
+        release = admission.acquire()
+        async def wait_for_slot():
+            async with admission.aadmit():
+                pass
+        waiter = asyncio.ensure_future(wait_for_slot())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        release()
+        async with admission.aadmit():
+            pass
+
+    asyncio.run(asyncio.wait_for(main(), timeout=2))
+    assert admission.stats()["interactive"]["outstanding"] == 0
+    assert admission.outstanding == 0
+
+
+def test_interactive_client_gets_ahead_of_queued_batch_calls(fake_ollama):
+    base_url = fake_ollama([generate("m", "ok")], ttft=0.1)
+    admission = AdmissionController(max_outstanding=1)
+    batch = OllamaClient(base_url, admission=admission, priority="batch")
+    interactive = OllamaClient(base_url, admission=admission, priority="interactive")
+    order = []
+
+    def call(client, name):
+        client.generate("m", name)
+        order.append(name)
+
+    threads = [threading.Thread(target=call, args=(batch, f"batch{i}")) for i in range(4)]
+    threads.append(threading.Thread(target=call, args=(interactive, "interactive")))
+    for t in threads:
+        t.start()
+        time.sleep(0.02)  # batch0 holds the slot, the rest queue in order
+    for t in threads:
+        t.join()
+    assert order[:2] == ["batch0", "interactive"]
+    assert admission.stats()["batch"]["admitted"] == 4
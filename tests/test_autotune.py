@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.autotune import ConcurrencyTuner
+
+
+def test_initial_limit_defaults_to_four_within_bounds():
+    assert ConcurrencyTuner().limit("m") == 4
+    assert ConcurrencyTuner(max_limit=2).limit("m") == 2
+    assert ConcurrencyTuner(initial_limit=1).limit("m") == 1
+
+
+def burst(base_url, tuner, calls):
+    async def main():
+        async with OllamaClient(base_url, autotune=tuner) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(client.agenerate("m", f"p{i}") for i in range(calls)))
+            return time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def test_short_burst_runs_concurrently_and_is_judged(fake_ollama):
+    base_url = fake_ollama([generate("m", "ok")], ttft=0.2)
+    tuner = ConcurrencyTuner(max_limit=8)
+
+    # One at a time would take 6 x 0.2s.
+    assert burst(base_url, tuner, 6) < 0.6
+    stats = tuner.stats()["m"]
+    # The burst never filled a whole window, but it queued past the limit
+    # and covered a full round, so it was still judged.
+    assert 4 in stats["tokens_per_sec_by_limit"]
+    assert tuner.limit("m") == 8
+    assert stats["inflight"] == 0 and stats["queued"] == 0
+
+
+def test_burst_that_fits_the_limit_is_not_judged(fake_ollama):
+    base_url = fake_ollama([generate("m", "ok")], ttft=0.05)
+    tuner = ConcurrencyTuner(max_limit=8)
+    burst(base_url, tuner, 4)
+    assert tuner.limit("m") == 4
+    assert tuner.stats()["m"]["tokens_per_sec_by_limit"] == {}
+
+
+def test_blocking_calls_share_the_limit():
+    tuner = ConcurrencyTuner(max_limit=2)
+    lock = threading.Lock()
+    inflight = peak = 0
+
+    def work():
+        nonlocal inflight, peak
+        with lock:
+            inflight += 1
+            peak = max(peak, inflight)
+        time.sleep(0.02)
+        with lock:
+            inflight -= 1
+        return [0.0]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda _: tuner.call("m", work, size=1), range(12)))
+    assert results == [[0.0]] * 12
+    assert peak <= 2
+    assert tuner.stats()["m"]["inflight"] == 0
+
+
+def test_unsaturated_calls_do_not_raise_the_limit(fake_ollama):
+    base_url = fake_ollama([generate("m", "ok")])
+    tuner = ConcurrencyTuner(max_limit=8)
+
+    async def main():
+        async with OllamaClient(base_url, autotune=tuner) as client:
+            for i in range(10):
+                await client.agenerate("m", f"p{i}")
+
+    asyncio.run(main())
+    assert tuner.limit("m") == 4
+    assert tuner.stats()["m"]["tokens_per_sec_by_limit"] == {}
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.batching import BatchClassifier, MicroBatcher
+
+
+class Recorder:
+    def __init__(self, fn=None):
+        self.batches = []
+        self.fn = fn or (lambda items: [item * 2 for item in items])
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return self.fn(items)
+
+
+def test_full_batch_is_flushed_without_waiting():
+    batch_fn = Recorder()
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait=5)
+    started = time.perf_counter()
+    futures = [batcher.submit(i) for i in range(3)]
+    assert [f.result(timeout=1) for f in futures] == [0, 2, 4]
+    assert time.perf_counter() - started < 1
+    assert batch_fn.batches == [[0, 1, 2]]
+    batcher.close()
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    batch_fn = Recorder()
+    batcher = MicroBatcher(batch_fn, max_batch_size=10, max_wait=0.1)
+    started = time.perf_counter()
+    futures = [batcher.submit(i) for i in range(2)]
+    assert [f.result(timeout=1) for f in futures] == [0, 2]
+    assert 0.1 <= time.perf_counter() - started < 1
+    assert batch_fn.batches == [[0, 1]]
+    batcher.close()
+
+
+def test_close_drains_queued_items():
+    release = threading.Event()
+
+    def slow(items):
+        release.wait(5)
+        return items
+
+    batch_fn = Recorder(slow)
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait=0.01)
+    futures = [batcher.submit(i) for i in range(5)]
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    release.set()
+    closer.join(5)
+    assert [f.result(timeout=0) for f in futures] == [0, 1, 2, 3, 4]
+    with pytest.raises(RuntimeError):
+        batcher.submit(5)
+
+
+def test_batch_errors_reach_every_caller():
+    def broken(items):
+        raise KeyError("boom")
+
+    batcher = MicroBatcher(broken, max_batch_size=2, max_wait=0.01)
+    futures = [batcher.submit(i) for i in range(2)]
+    for f in futures:
+        with pytest.raises(KeyError):
+            f.result(timeout=1)
+
+    short = MicroBatcher(lambda items: items[:1], max_batch_size=2, max_wait=0.01)
+    futures = [short.submit(i) for i in range(2)]
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=1)
+    batcher.close()
+    short.close()
+
+
+def test_parse_labels_validates_the_reply():
+    classifier = BatchClassifier(["Positive", "Negative"], "Label each review.",
+                                 client=OllamaClient("http://127.0.0.1:9"))
+    assert classifier.parse_labels('Sure: ["positive", " NEGATIVE "]', 2) == ["Positive", "Negative"]
+    assert classifier.parse_labels('["Positive"]', 2) is None
+    assert classifier.parse_labels('["Positive", "Meh"]', 2) is None
+    assert classifier.parse_labels("Positive, Negative", 2) is None
+    classifier.close()
+
+
+def test_unparseable_batch_falls_back_per_item(fake_ollama):
+    base_url = fake_ollama([generate("m", "I think they are all fine.")])
+    singles = []
+
+    def single(text):
+        singles.append(text)
+        return "Positive"
+
+    classifier = BatchClassifier(["Positive", "Negative"], "Label each review.", model="m",
+                                 single_fn=single, client=OllamaClient(base_url),
+                                 max_batch_size=3, max_wait=0.05)
+    assert classifier.classify_many(["a", "b", "c"]) == ["Positive"] * 3
+    assert sorted(singles) == ["a", "b", "c"]
+    stats = classifier.stats()
+    assert (stats["batches"], stats["fallback_batches"], stats["fallback_items"]) == (1, 1, 3)
+    classifier.close()
+
+
+def test_parsed_batch_needs_no_fallback(fake_ollama):
+    base_url = fake_ollama([generate("m", '["Negative", "Positive"]')])
+    classifier = BatchClassifier(["Positive", "Negative"], "Label each review.", model="m",
+                                 single_fn=lambda text: "unused", client=OllamaClient(base_url),
+                                 max_batch_size=2, max_wait=0.05)
+    assert classifier.classify_many(["bad", "good"]) == ["Negative", "Positive"]
+    assert classifier.stats()["fallback_items"] == 0
+    classifier.close()
@@ -0,0 +1,55 @@
+import time
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.cache import ResponseCache
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_entries=2)
+    cache.put("a", 1)
+    time.sleep(0.01)
+    cache.put("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1  # a is now more recent than b
+    time.sleep(0.01)
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    cache.close()
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone() == (0,)
+    cache.close()
+
+
+def test_sampled_calls_bypass_the_cache(fake_ollama, tmp_path):
+    client = OllamaClient(fake_ollama([generate("m", "ok")]))
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    calls = []
+
+    def ask(options):
+        def call():
+            calls.append(options)
+            return client.generate("m", "hi", options=options)
+        return cache.get_or_call("m", "hi", options, call)
+
+    for options in ({}, {}, {"temperature": 0.7}, {"temperature": 0}, {"temperature": 0}):
+        assert ask(options)["response"] == "ok"
+    # Unset temperature means Ollama's 0.8: sampled, so never cached.
+    assert len(calls) == 4
+    assert cache.stats() == {"hits": 1, "misses": 1, "bypassed": 3, "hit_rate": 0.5}
+    cache.close()
+
+
+def test_default_temperature_can_match_the_model(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), default_temperature=0)
+    assert cache.should_cache({})
+    assert not cache.should_cache({"temperature": 0.3})
+    cache.close()
@@ -0,0 +1,35 @@
+import pytest
+import requests
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.cascade import Cascade, enum_validator
+from ollamakit.constrained import LabelChoice
+
+
+def test_enum_validator_needs_the_whole_reply():
+    validate = enum_validator(["hr", "it"])
+    assert validate("IT") == "it"
+    assert validate(" 'hr'.\n") == "hr"
+    assert validate("I think it is about payroll, so hr") is None
+    assert validate("it or hr") is None
+    assert LabelChoice(["hr", "it"]).parse('{"label": "it"}') == "it"
+
+
+def test_missing_cheap_model_escalates(fake_ollama):
+    # Only the big model has a recording, so the cheap one gets a 404.
+    base_url = fake_ollama([generate("big", "it")])
+    cascade = Cascade(models=("tiny", "big"), client=OllamaClient(base_url))
+
+    result = cascade.generate("Which department?", validator=enum_validator(["hr", "it"]))
+    assert (result.value, result.model, result.escalated) == ("it", "big", True)
+    assert cascade.stats()["errors"] == 1
+    assert cascade.stats()["escalations"] == 1
+
+
+def test_last_model_errors_are_raised(fake_ollama):
+    base_url = fake_ollama([generate("tiny", "maybe")])
+    cascade = Cascade(models=("tiny", "big"), client=OllamaClient(base_url))
+    with pytest.raises(requests.HTTPError):
+        cascade.generate("Which department?", validator=enum_validator(["hr", "it"]))
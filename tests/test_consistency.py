@@ -0,0 +1,61 @@
+import asyncio
+import collections
+
+import pytest
+
+from ollamakit.consistency import decided, final_number, vote
+
+
+def scripted(*outcomes):
+    """A sampler returning (or raising) the given outcomes in call order."""
+    outcomes = list(outcomes)
+    calls = []
+
+    async def sample():
+        calls.append(None)
+        outcome = outcomes[len(calls) - 1]
+        await asyncio.sleep(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return sample, calls
+
+
+def test_decided_only_when_the_runner_up_cannot_catch_up():
+    assert not decided(collections.Counter(), 3)
+    assert decided(collections.Counter({"a": 3}), 2)
+    assert not decided(collections.Counter({"a": 3}), 3)
+    assert decided(collections.Counter({"a": 3, "b": 1}), 1)
+    assert not decided(collections.Counter({"a": 2, "b": 1}), 1)
+
+
+def test_voting_stops_once_the_lead_is_safe():
+    sample, calls = scripted("It is 42.", "42", "The answer: 42", "7", "7")
+    result = asyncio.run(vote(sample, samples=5, concurrency=1))
+    assert result["consensus"] == "42"
+    assert result["answer"] == "It is 42."
+    assert result["samples_used"] == 3 and result["samples_planned"] == 5
+    # The fourth sample may have started, but the fifth never ran.
+    assert len(calls) <= 4
+
+
+def test_failed_samples_do_not_vote_or_count_as_used():
+    sample, calls = scripted("7", RuntimeError("boom"), "7", TimeoutError(), "8")
+    result = asyncio.run(vote(sample, samples=5, concurrency=1))
+    assert result["votes"] == {"7": 2, "8": 1}
+    assert result["samples_used"] == 3
+    assert result["answers"] == ["7", "7", "8"]
+    assert len(calls) == 5
+
+
+def test_every_sample_failing_is_an_error():
+    sample, _ = scripted(*[ValueError()] * 3)
+    with pytest.raises(RuntimeError):
+        asyncio.run(vote(sample, samples=3))
+
+
+def test_final_number_normalizes_answers():
+    assert final_number("Total: 1,200.0 apples") == "1200"
+    assert final_number("roughly 2.5") == "2.5"
+    assert final_number("  Paris\n") == "paris"
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from conftest import chat, generate
+
+from ollamakit import OllamaClient
+from ollamakit.constrained import InvalidLabelError, LabelChoice
+
+
+def test_request_carries_an_enum_schema_and_a_short_decode():
+    choice = LabelChoice(["billing", "tech"], key="dept")
+    request = choice.request({"num_ctx": 2048})
+    assert request["format"] == {
+        "type": "object",
+        "properties": {"dept": {"type": "string", "enum": ["billing", "tech"]}},
+        "required": ["dept"],
+    }
+    assert request["options"]["temperature"] == 0.0
+    assert request["options"]["num_ctx"] == 2048
+    assert request["options"]["num_predict"] >= len(json.dumps({"dept": "billing"}))
+
+    plain = LabelChoice(["billing", "tech"], structured=False).request()
+    assert "format" not in plain and plain["options"]["stop"] == ["\n"]
+
+
+def test_parse_accepts_only_allowed_labels():
+    choice = LabelChoice(["billing", "tech"])
+    assert choice.parse('{"label": "tech"}') == "tech"
+    assert choice.parse("  Billing\n") == "billing"  # a server that ignored format
+    assert choice.parse('{"label": "sales"}') is None
+    assert choice.parse('{"other": "tech"}') is None
+    assert choice.parse("tech or billing") is None
+    assert choice.parse(None) is None
+
+
+def test_unknown_label_raises_after_retries(fake_ollama):
+    base_url = fake_ollama([generate("m", '{"label": "sales"}')])
+    choice = LabelChoice(["billing", "tech"], retries=1, client=OllamaClient(base_url))
+    with pytest.raises(InvalidLabelError):
+        choice.generate("m", "Which department?")
+    assert choice.stats() == {"calls": 2, "parse_failures": 2}
+
+
+def test_chat_decision(fake_ollama):
+    base_url = fake_ollama([chat("m", '{"label": "billing"}')])
+    choice = LabelChoice(["billing", "tech"], client=OllamaClient(base_url))
+    assert choice.chat("m", [{"role": "user", "content": "refund?"}]) == "billing"
+    assert choice.stats() == {"calls": 1, "parse_failures": 0}
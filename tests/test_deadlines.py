@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import requests
+
+from conftest import exchange, generate
+
+from ollamakit import OllamaClient
+from ollamakit.client import get_client
+from ollamakit.deadlines import Hedger, LatencyTracker, size_bucket
+
+
+def test_timeouts_widen_the_deadline_until_calls_succeed(fake_ollama):
+    base_url = fake_ollama([generate("m", "ok")], ttft=0.2)
+    tracker = LatencyTracker(min_samples=5, floor=0.01)
+    client = OllamaClient(base_url, deadlines=tracker)
+    for _ in range(5):
+        tracker.record(client._url("/api/generate"), "m", 0.01)
+    assert tracker.timeout(client._url("/api/generate"), "m") < 0.2
+
+    timeouts = 0
+    for _ in range(10):
+        try:
+            client.generate("m", "hi")
+            break
+        except requests.Timeout:
+            timeouts += 1
+    else:
+        raise AssertionError("the deadline never recovered")
+    assert timeouts >= 1
+    assert tracker.timeout(client._url("/api/generate"), "m") > 0.2
+
+
+def test_deadlines_are_kept_per_output_size():
+    tracker = LatencyTracker(min_samples=3, floor=0.1)
+    for _ in range(3):
+        tracker.record("e", "m", 0.1, size=8)
+        tracker.record("e", "m", 10.0, size=1000)
+    assert tracker.timeout("e", "m", size=5) < 1
+    assert tracker.timeout("e", "m", size=700) == 30.0
+    assert tracker.timeout("e", "m", default=42) == 42
+    assert size_bucket(5) == 8 and size_bucket(None) is None
+
+
+def test_shared_client_keeps_fixed_timeouts():
+    assert get_client().deadlines is None
+
+
+def test_latency_windows_survive_a_restart(tmp_path):
+    path = str(tmp_path / "latency.json")
+    tracker = LatencyTracker(min_samples=3, floor=0.1, path=path)
+    for _ in range(3):
+        tracker.record("e", "m", 1.0, size=100)
+    tracker.save()
+
+    restarted = LatencyTracker(min_samples=3, floor=0.1, path=path)
+    assert restarted.timeout("e", "m", size=100) == 3.0
+    assert restarted.timeout("e", "m", default=42) == 42
+
+
+def test_streams_do_not_feed_the_latency_window(fake_ollama):
+    base_url = fake_ollama([exchange("/api/generate", "m", [
+        {"model": "m", "response": "a", "done": False},
+        {"model": "m", "response": "b", "done": True, "eval_count": 2},
+    ], streaming=True)])
+    tracker = LatencyTracker(min_samples=1)
+    client = OllamaClient(base_url, deadlines=tracker)
+    assert "".join(client.stream_generate("m", "hi")) == "ab"
+    assert tracker.stats() == {}
+
+
+def test_hedge_goes_to_the_next_endpoint_when_the_first_is_slow(fake_ollama):
+    slow = OllamaClient(fake_ollama([generate("m", "slow")], ttft=1.0))
+    fast = OllamaClient(fake_ollama([generate("m", "fast")]))
+    hedger = Hedger([slow, fast], delay=0.1)
+
+    async def main():
+        started = time.perf_counter()
+        data = await hedger.agenerate("m", "hi")
+        await slow.aclose()
+        await fast.aclose()
+        return data, time.perf_counter() - started
+
+    data, elapsed = asyncio.run(main())
+    assert data["response"] == "fast"
+    assert elapsed < 0.8
+    assert hedger.stats() == {"calls": 1, "hedges_sent": 1, "hedges_won": 1}
+
+
+def test_fast_first_endpoint_is_not_hedged(fake_ollama):
+    first = OllamaClient(fake_ollama([generate("m", "first")]))
+    second = OllamaClient(fake_ollama([generate("m", "second")]))
+    hedger = Hedger([first, second], delay=1.0)
+    assert asyncio.run(hedger.agenerate("m", "hi"))["response"] == "first"
+    assert hedger.stats()["hedges_sent"] == 0
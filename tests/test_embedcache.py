@@ -0,0 +1,57 @@
+import json
+
+from ollamakit import OllamaClient
+from ollamakit.embedcache import CachedEmbeddings, EmbeddingCache
+from ollamakit.fakeserver import exchange_key
+
+
+def server_with(fake_ollama, digest):
+    tags = {
+        "key": exchange_key("GET", "/api/tags", None), "method": "GET", "path": "/api/tags",
+        "request": None, "status": 200, "content_type": "application/json", "streaming": False,
+        "lines": [json.dumps({"models": [{"name": "emb:latest", "model": "emb:latest", "digest": digest}]})],
+    }
+    return fake_ollama([tags])
+
+
+class FakeEmbeddings:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.model = "emb"
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[0.0, 1.0, 0.0] for _ in texts]
+
+
+def test_digest_comes_from_the_embedding_server(fake_ollama, tmp_path):
+    default_server = server_with(fake_ollama, "aaa")
+    other_server = server_with(fake_ollama, "bbb")
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite3"), client=OllamaClient(default_server))
+
+    assert cache.digest("emb") == "aaa"
+    assert cache.digest("emb", OllamaClient(other_server)) == "bbb"
+
+    embeddings = FakeEmbeddings(other_server)
+    wrapped = CachedEmbeddings(embeddings, cache=cache)
+    assert wrapped.embed_documents(["hello"]) == [[0.0, 1.0, 0.0]]
+    assert wrapped.embed_documents(["hello"]) == [[0.0, 1.0, 0.0]]
+    assert embeddings.calls == 1
+    digests = {row[0] for row in cache._conn.execute("SELECT digest FROM embeddings")}
+    assert digests == {"bbb"}
+    cache.close()
+
+
+def test_unknown_digest_bypasses_the_cache(fake_ollama, tmp_path):
+    # A server with no tags for the model: its version can't be told apart.
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite3"), client=OllamaClient(fake_ollama([])))
+    embeddings = FakeEmbeddings(cache.client.base_url)
+    wrapped = CachedEmbeddings(embeddings, cache=cache)
+
+    assert wrapped.embed_documents(["hello"]) == [[0.0, 1.0, 0.0]]
+    assert wrapped.embed_documents(["hello"]) == [[0.0, 1.0, 0.0]]
+    assert embeddings.calls == 2
+    assert cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 0
+    assert cache.stats()["misses"] == 2
+    cache.close()
@@ -0,0 +1,31 @@
+import json
+
+from conftest import chat
+
+from ollamakit import OllamaClient
+from ollamakit.evaluation import load_jsonl, percentile, run_ab_eval
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 50) is None
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile([3, 1, 2, 4], 95) == 4
+
+
+def test_resumed_run_replaces_failed_rows(fake_ollama, tmp_path):
+    base_url = fake_ollama([chat("m", "answer")])
+    dataset = tmp_path / "dataset.jsonl"
+    dataset.write_text("\n".join(json.dumps({"id": i, "input": f"q{i}"}) for i in range(2)) + "\n")
+    output = tmp_path / "results.jsonl"
+    # A previous run: row 0 succeeded for A, failed for B.
+    output.write_text(
+        json.dumps({"id": 0, "variant": "A", "input": "q0", "output": "x", "latency_ms": 5.0}) + "\n"
+        + json.dumps({"id": 0, "variant": "B", "input": "q0", "error": "boom", "latency_ms": 5.0}) + "\n"
+    )
+
+    summary = run_ab_eval(str(dataset), "A: {}", "B: {}", str(output), model="m",
+                          client=OllamaClient(base_url), chat=True)
+    assert summary["A"]["calls"] == 2 and summary["A"]["errors"] == 0
+    assert summary["B"]["calls"] == 2 and summary["B"]["errors"] == 0
+    # Row 0/A was skipped; the failed row 0/B was run again and appended.
+    assert len(load_jsonl(str(output))) == 5
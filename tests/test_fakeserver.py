@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from conftest import exchange, generate
+
+from ollamakit import OllamaClient
+from ollamakit.fakeserver import Player, Recorder, serve
+
+
+def start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def run(**kwargs):
+        server = serve(port=0, **kwargs)
+        started.append(server)
+        return start(server)
+
+    yield run
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_recorded_exchanges_replay_exactly(fake_ollama, servers, tmp_path):
+    upstream = fake_ollama([
+        generate("m", "plain"),
+        exchange("/api/chat", "m", [
+            {"model": "m", "message": {"role": "assistant", "content": "str"}, "done": False},
+            {"model": "m", "message": {"role": "assistant", "content": "eamed"}, "done": True},
+        ], streaming=True),
+    ])
+    store = str(tmp_path / "recorded.jsonl")
+    recording = OllamaClient(servers(recorder=Recorder(store, upstream)))
+    messages = [{"role": "user", "content": "hi"}]
+    assert recording.generate("m", "hi")["response"] == "plain"
+    assert "".join(recording.stream_chat("m", messages)) == "streamed"
+
+    with open(store, encoding="utf-8") as f:
+        recorded = [json.loads(line) for line in f]
+    assert [(r["path"], r["streaming"]) for r in recorded] == [
+        ("/api/generate", False), ("/api/chat", True)]
+    assert recorded[1]["lines"][-1].endswith("\n")
+
+    # Strict replay: only the exact recorded requests are served.
+    replaying = OllamaClient(servers(player=Player(store)))
+    assert replaying.generate("m", "hi")["response"] == "plain"
+    assert "".join(replaying.stream_chat("m", messages)) == "streamed"
+    with pytest.raises(requests.HTTPError):
+        replaying.generate("m", "something else")
+
+
+def test_unreachable_upstream_is_a_502(servers, tmp_path):
+    store = tmp_path / "recorded.jsonl"
+    base_url = servers(recorder=Recorder(str(store), "http://127.0.0.1:9"))
+    r = requests.post(base_url + "/api/generate", json={"model": "m", "prompt": "hi"}, timeout=5)
+    assert r.status_code == 502
+    assert not store.exists()
+
+
+def test_openai_replies_are_paced_by_completion_tokens(fake_ollama):
+    reply = {"choices": [{"message": {"role": "assistant", "content": "ok"}}],
+             "usage": {"prompt_tokens": 3, "completion_tokens": 20}}
+    base_url = fake_ollama([exchange("/v1/chat/completions", "m", reply)], tokens_per_sec=100)
+    started = time.perf_counter()
+    r = requests.post(base_url + "/v1/chat/completions", json={"model": "m", "messages": []}, timeout=5)
+    assert r.json() == reply
+    assert time.perf_counter() - started >= 0.2
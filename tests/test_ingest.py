@@ -0,0 +1,68 @@
+import threading
+import time
+
+from ollamakit.autotune import ConcurrencyTuner
+from ollamakit.ingest import ingest
+
+
+class StubEmbedder:
+    """Embeds text "doc<i>" as [i, 1]; earlier batches answer last."""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def embed(self, model, batch):
+        with self._lock:
+            self.batches.append(list(batch))
+        first = int(batch[0][3:])
+        time.sleep(max(0.0, 0.05 - first * 0.001))
+        return {"embeddings": [[float(t[3:]), 1.0] for t in batch], "prompt_eval_count": len(batch)}
+
+
+class StubQdrant:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, collection_name, points, wait):
+        self.upserts.append((collection_name, list(points), wait))
+
+
+def test_points_keep_their_ids_and_payloads_across_out_of_order_batches():
+    texts = [f"doc{i}" for i in range(50)]
+    ids = [1000 + i for i in range(50)]
+    payloads = [{"n": i} for i in range(50)]
+    qdrant = StubQdrant()
+
+    report = ingest(qdrant, "c", texts, payloads=payloads, ids=ids, model="emb",
+                    batch_size=8, concurrency=4, upsert_size=16, client=StubEmbedder())
+
+    assert (report.docs, report.batches) == (50, 7)
+    points = [p for _, batch, _ in qdrant.upserts for p in batch]
+    assert sorted(p.id for p in points) == ids
+    for p in points:
+        assert p.id == 1000 + p.payload["n"]
+        assert p.vector[0] == p.payload["n"]
+
+
+def test_only_the_last_upsert_waits():
+    qdrant = StubQdrant()
+    ingest(qdrant, "c", [f"doc{i}" for i in range(40)], model="emb",
+           batch_size=4, upsert_size=8, client=StubEmbedder())
+    waits = [wait for _, _, wait in qdrant.upserts]
+    assert waits[-1] is True
+    assert not any(waits[:-1])
+    assert {name for name, _, _ in qdrant.upserts} == {"c"}
+    # Default payloads and ids: the text and its position.
+    points = {p.id: p for _, batch, _ in qdrant.upserts for p in batch}
+    assert points[7].payload == {"text": "doc7"}
+
+
+def test_embed_batches_go_through_the_tuner():
+    tuner = ConcurrencyTuner(max_limit=2)
+    embedder = StubEmbedder()
+    ingest(StubQdrant(), "c", [f"doc{i}" for i in range(20)], model="emb", batch_size=2,
+           client=embedder, autotune=tuner)
+    assert sorted(t for batch in embedder.batches for t in batch) == sorted(f"doc{i}" for i in range(20))
+    assert tuner.stats()["emb"]["inflight"] == 0
+    assert tuner.limit("emb") <= 2
@@ -0,0 +1,119 @@
+import json
+import socket
+import time
+
+import openai
+import pytest
+
+from conftest import exchange
+
+from ollamakit.fakeserver import exchange_key
+from ollamakit.openai_pool import OpenAIPool
+
+PATH = "/v1/chat/completions"
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def completion(text):
+    return exchange(PATH, "m", {
+        "id": "c1", "object": "chat.completion", "created": 0, "model": "m",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": text}}],
+    })
+
+
+def streamed_completion(*pieces):
+    chunks = [
+        {"id": "c1", "object": "chat.completion.chunk", "created": 0, "model": "m",
+         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        for piece in pieces
+    ]
+    request = {"model": "m"}
+    return {
+        "key": exchange_key("POST", PATH, request), "method": "POST", "path": PATH,
+        "request": request, "status": 200, "content_type": "text/event-stream",
+        "streaming": True,
+        "lines": [f"data: {json.dumps(c)}\n\n" for c in chunks] + ["data: [DONE]\n\n"],
+    }
+
+
+def v1(base_url):
+    return base_url + "/v1"
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def reply(response):
+    return response.choices[0].message.content
+
+
+def test_fails_over_and_ejects_a_dead_endpoint(fake_ollama):
+    dead = closed_port_url()
+    pool = OpenAIPool([dead, v1(fake_ollama([completion("ok")]))], eject_after=1)
+    assert reply(pool.chat.completions.create(model="m", messages=MESSAGES)) == "ok"
+    stats = pool.stats()
+    assert stats[dead]["errors"] == 1 and not stats[dead]["healthy"]
+
+    # Ejected: the next request goes straight to the live endpoint.
+    pool.chat.completions.create(model="m", messages=MESSAGES)
+    assert pool.stats()[dead]["requests"] == 1
+    pool.close()
+
+
+def test_server_errors_fail_over(fake_ollama):
+    broken = v1(fake_ollama([exchange(PATH, "m", {"error": "boom"}, status=500)]))
+    pool = OpenAIPool([broken, v1(fake_ollama([completion("ok")]))])
+    assert reply(pool.chat.completions.create(model="m", messages=MESSAGES)) == "ok"
+    assert pool.stats()[broken]["errors"] == 1 and pool.stats()[broken]["healthy"]
+    pool.close()
+
+
+def test_timeouts_fail_over_only_when_opted_in(fake_ollama):
+    slow = v1(fake_ollama([completion("slow")], ttft=0.5))
+    fast = v1(fake_ollama([completion("fast")]))
+
+    pool = OpenAIPool([slow, fast], timeout=0.1)
+    with pytest.raises(openai.APITimeoutError):
+        pool.chat.completions.create(model="m", messages=MESSAGES)
+    assert pool.stats()[fast]["requests"] == 0
+    pool.close()
+
+    pool = OpenAIPool([slow, fast], timeout=0.1, failover_timeouts=True)
+    assert reply(pool.chat.completions.create(model="m", messages=MESSAGES)) == "fast"
+    pool.close()
+
+
+def test_conversations_stick_to_their_endpoint(fake_ollama):
+    first = v1(fake_ollama([completion("first")]))
+    second = v1(fake_ollama([completion("second")]))
+    pool = OpenAIPool([first, second])
+
+    held = pool._pick()  # keep the first endpoint busy for a moment
+    assert reply(pool.chat.completions.create(conversation_id="c", model="m", messages=MESSAGES)) == "second"
+    pool._finish(held, time.perf_counter())
+
+    # Both idle now, but the conversation stays where its history is.
+    assert reply(pool.chat.completions.create(conversation_id="c", model="m", messages=MESSAGES)) == "second"
+    assert reply(pool.chat.completions.create(model="m", messages=MESSAGES)) == "first"
+    pool.close()
+
+
+def test_stream_holds_its_endpoint_until_read(fake_ollama):
+    url = v1(fake_ollama([streamed_completion("a", "b")]))
+    pool = OpenAIPool([url])
+
+    stream = pool.chat.completions.create(model="m", messages=MESSAGES, stream=True)
+    assert pool.stats()[url]["outstanding"] == 1
+    assert "".join(chunk.choices[0].delta.content for chunk in stream) == "ab"
+    assert pool.stats()[url]["outstanding"] == 0
+    assert pool.stats()[url]["requests"] == 1
+
+    stream = pool.chat.completions.create(model="m", messages=MESSAGES, stream=True)
+    stream.close()
+    assert pool.stats()[url]["outstanding"] == 0
+    pool.close()
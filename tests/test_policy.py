@@ -0,0 +1,106 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+import requests
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.policy import RetryBudget, RetryPolicy, is_connect_error, is_retryable
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_read_timeouts_are_not_retried_by_default(fake_ollama):
+    base_url = fake_ollama([generate("m", "late")], ttft=0.3)
+    policy = RetryPolicy(base=0.01, cap=0.01)
+    client = OllamaClient(base_url, timeout=0.1, policy=policy)
+    with pytest.raises(requests.Timeout):
+        client.generate("m", "hi")
+    assert policy.retries == 0
+
+
+def test_read_timeouts_are_retried_when_opted_in(fake_ollama):
+    base_url = fake_ollama([generate("m", "late")], ttft=0.3)
+    policy = RetryPolicy(max_tries=2, base=0.01, cap=0.01, retry_timeouts=True)
+    client = OllamaClient(base_url, timeout=0.1, policy=policy)
+    with pytest.raises(requests.Timeout):
+        client.generate("m", "hi")
+    assert policy.retries == 1
+
+
+def test_connect_errors_retry_and_only_retries_spend_budget():
+    budget = RetryBudget(ratio=0.0, max_tokens=5)
+    policy = RetryPolicy(max_tries=4, base=0.01, cap=0.01, budget=budget)
+    client = OllamaClient(closed_port_url(), policy=policy)
+    with pytest.raises(requests.ConnectionError):
+        client.generate("m", "hi")
+    assert (policy.retries, policy.giveups) == (3, 1)
+    assert budget._tokens == 2
+
+
+def test_async_backoff_does_not_block_the_loop():
+    policy = RetryPolicy(max_tries=3, base=0.1, cap=0.1)
+    ticks = []
+
+    async def refused():
+        raise ConnectionRefusedError()
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(None)
+            await asyncio.sleep(0.02)
+
+    async def main():
+        results = await asyncio.gather(policy.acall("e", refused), ticker(), return_exceptions=True)
+        assert isinstance(results[0], ConnectionRefusedError)
+
+    asyncio.run(main())
+    assert len(ticks) == 5 and policy.retries == 2
+
+
+def aborting_server_url():
+    """A server that reads the request and hangs up without answering."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            conn.recv(65536)
+            conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return f"http://127.0.0.1:{listener.getsockname()[1]}", listener
+
+
+def test_aborted_response_is_not_a_connect_error():
+    base_url, listener = aborting_server_url()
+    policy = RetryPolicy(max_tries=3, base=0.01, cap=0.01)
+    client = OllamaClient(base_url, policy=policy)
+    try:
+        with pytest.raises(requests.ConnectionError) as info:
+            client.generate("m", "hi")
+    finally:
+        listener.close()
+    assert not is_connect_error(info.value)
+    assert not is_retryable(info.value)
+    assert is_retryable(info.value, timeouts=True)
+    assert policy.retries == 0
+
+
+def test_refused_connection_is_a_connect_error():
+    with pytest.raises(requests.ConnectionError) as info:
+        requests.get(closed_port_url(), timeout=1)
+    assert is_connect_error(info.value)
@@ -0,0 +1,51 @@
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.prefix import PrefixSession
+
+PREFIX = "Review: great\nLabel: Positive\n"
+SUFFIX = "Review: dull\nLabel:"
+
+
+def recordings():
+    # Exact requests are matched first; anything else gets the last
+    # (fallback) recording for the model.
+    return [
+        # The warm-up context ends with its one generated token (99).
+        generate("m", " x", eval_count=1, prompt_eval_count=3, context=[1, 2, 3, 99],
+                 request={"prompt": PREFIX, "raw": True, "options": {"num_predict": 1}}),
+        generate("m", " Negative", request={"prompt": SUFFIX, "raw": True, "context": [1, 2, 3]}),
+        generate("m", " Negative (uncached)", request={"prompt": PREFIX + SUFFIX, "raw": True}),
+        generate("m", "unexpected request"),
+    ]
+
+
+def test_suffix_continues_the_raw_prefix_context(fake_ollama):
+    session = PrefixSession(PREFIX, "m", client=OllamaClient(fake_ollama(recordings())))
+    assert session.complete(SUFFIX)["response"] == " Negative"
+    assert session.complete(SUFFIX)["response"] == " Negative"
+    # The context is the warm-up one every time, not the growing reply chain.
+    assert session.warm() == [1, 2, 3]
+    assert session.stats()["cached"] and session.stats()["calls"] == 2
+
+
+def test_prefix_over_max_context_is_sent_in_full(fake_ollama):
+    session = PrefixSession(PREFIX, "m", client=OllamaClient(fake_ollama(recordings())), max_context=2)
+    assert session.complete(SUFFIX)["response"] == " Negative (uncached)"
+    assert not session.stats()["cached"]
+
+
+def test_cached_context_holds_no_generated_tokens(fake_ollama):
+    base_url = fake_ollama(recordings())
+    session = PrefixSession(PREFIX, "m", client=OllamaClient(base_url))
+    assert session.warm() == [1, 2, 3]
+    # Only an exact continuation request (context [1, 2, 3]) gets this reply.
+    assert session.complete(SUFFIX)["response"] == " Negative"
+
+
+def test_partly_cached_prompt_still_drops_only_the_generated_token(fake_ollama):
+    # Ollama reports only the prompt tokens it evaluated this time.
+    base_url = fake_ollama([generate("m", " x", eval_count=1, prompt_eval_count=1,
+                                     context=[1, 2, 3, 99])])
+    session = PrefixSession(PREFIX, "m", client=OllamaClient(base_url))
+    assert session.warm() == [1, 2, 3]
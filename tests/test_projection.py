@@ -0,0 +1,53 @@
+import json
+
+from ollamakit.projection import (CHARS_PER_TOKEN, SOURCES, compact, estimate_tokens, project,
+                                  select_fields)
+
+REPO = {
+    "full_name": "org/tool",
+    "description": "A tool. " * 200,
+    "owner": {"login": "org", "avatar_url": "https://example.com/a.png"},
+    "license": {"name": "MIT", "spdx_id": "MIT", "url": "https://example.com/mit"},
+    "topics": ["cli", "llm"],
+    "items": [{"title": "one", "url": "u1"}, {"title": "two", "url": "u2"}],
+}
+
+
+def test_selectors_keep_only_the_declared_fields():
+    selected = select_fields(REPO, ["full_name", "license.name", "topics", "items.*.title", "missing.field"])
+    assert selected == {
+        "full_name": "org/tool",
+        "license": {"name": "MIT"},
+        "topics": ["cli", "llm"],
+        "items": [{"title": "one"}, {"title": "two"}],
+    }
+
+
+def test_list_selectors_merge_element_wise():
+    selected = select_fields(REPO, ["items.*.title", "items.*.url"])
+    assert selected["items"] == [{"title": "one", "url": "u1"}, {"title": "two", "url": "u2"}]
+
+
+def test_registered_source_and_compact_output():
+    projection = project(REPO, source="github_repo")
+    data = json.loads(projection.text)
+    assert set(data) == {"full_name", "description", "topics", "license"}
+    assert projection.text == compact(select_fields(REPO, SOURCES["github_repo"]))
+    assert projection.tokens_after < projection.tokens_before
+    assert not projection.truncated
+
+
+def test_budget_shrinks_long_strings_first():
+    projection = project(REPO, fields=["full_name", "description", "topics"], budget=60)
+    assert projection.truncated
+    assert projection.tokens_after <= 60
+    data = json.loads(projection.text)  # still valid JSON: only strings were cut
+    assert data["full_name"] == "org/tool" and data["topics"] == ["cli", "llm"]
+    assert data["description"].endswith("…")
+    assert "truncated" in projection.report()
+
+
+def test_budget_falls_back_to_cutting_the_text():
+    projection = project("x" * 1000, budget=10)
+    assert projection.text == "x" * 10 * CHARS_PER_TOKEN
+    assert (projection.tokens_before, projection.tokens_after) == (estimate_tokens("x" * 1000), 10)
@@ -0,0 +1,53 @@
+from conftest import exchange
+
+from ollamakit import OllamaClient
+from ollamakit.react import LINE_ACTION, react_step, read_action
+
+
+class ListStream:
+    """Just enough of TokenStream for read_action."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.final = None
+        self.cancelled = False
+
+    def __iter__(self):
+        yield from self.tokens
+
+    def cancel(self):
+        self.cancelled = True
+
+    def stats(self):
+        return {}
+
+
+def test_marker_split_across_tokens():
+    stream = ListStream(["Thought: check the weather\nAct", "ion: weath", "er[Par", "is]", " Observation:"])
+    step = read_action(stream)
+    assert (step.action, step.match.group(2)) == ("weather", "Paris")
+    assert step.text.endswith("[Paris]") and stream.cancelled
+    assert step.thought == "check the weather"
+
+
+def test_line_action_needs_a_real_line_start():
+    stream = ListStream(["Thought: maybe. Action: not this\n", "Action: search\n", "tail"])
+    step = read_action(stream, LINE_ACTION)
+    assert step.action == "search"
+
+
+def test_long_reply_without_action_is_parsed_at_the_end():
+    stream = ListStream(["word "] * 20000)
+    step = read_action(stream)
+    assert step.match is None and len(step.text) == 100000
+
+
+def test_react_step_stops_the_stream(fake_ollama):
+    chunks = [{"model": "m", "response": t, "done": False}
+              for t in ["Thought: look it up\n", "Action: ", "search[", "ollama", "]", "\nmore"]]
+    chunks.append({"model": "m", "response": "", "done": True, "eval_count": 6})
+    base_url = fake_ollama([exchange("/api/generate", "m", chunks, streaming=True)])
+
+    step = react_step("m", "question", client=OllamaClient(base_url))
+    assert (step.action, step.match.group(2)) == ("search", "ollama")
+    assert step.stopped_early
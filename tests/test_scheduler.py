@@ -0,0 +1,83 @@
+import threading
+import time
+
+from conftest import exchange, generate
+
+from ollamakit import OllamaClient
+from ollamakit.scheduler import ModelAffinityScheduler
+
+
+def test_hot_model_is_kept_until_the_reorder_delay_passes(fake_ollama):
+    base_url = fake_ollama([generate("a", "ok"), generate("b", "ok")], ttft=0.1)
+    scheduler = ModelAffinityScheduler(OllamaClient(base_url), max_reorder_delay=0.25)
+
+    futures = [scheduler.submit("/api/generate", {"model": "a", "prompt": "warm"})]
+    futures.append(scheduler.submit("/api/generate", {"model": "b", "prompt": "held back"}))
+    futures += [scheduler.submit("/api/generate", {"model": "a", "prompt": f"p{i}"}) for i in range(6)]
+    for f in futures:
+        f.result(timeout=5)
+    scheduler.close()
+
+    order = [r["model"] for r in scheduler.records]
+    # b waits for the delay instead of forcing a swap after the first a...
+    assert order[:2] == ["a", "a"]
+    # ...but is served before all of a's backlog (at most one request late).
+    assert order.index("b") < len(order) - 1
+    stats = scheduler.stats()
+    assert 250 <= stats["models"]["b"]["max_queued_ms"] < 250 + 100 + 150
+    assert stats["swaps"] == 2
+
+
+class StubClient:
+    """Records what the scheduler sends; the first call blocks until released."""
+
+    def __init__(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def post(self, path, payload):
+        self.release.wait(5)
+        self.sent.append((payload["model"], payload.get("keep_alive")))
+        return {"model": payload["model"], "done": True}
+
+    def generate(self, model, prompt, **extra):
+        return {"model": model, "done": True}
+
+
+def test_only_a_model_that_stays_hot_gets_the_long_keep_alive():
+    client = StubClient()
+    scheduler = ModelAffinityScheduler(client, max_reorder_delay=5.0)
+    futures = [scheduler.submit("/api/generate", {"model": "a", "prompt": "busy"})]
+    time.sleep(0.05)  # the worker is now blocked on the first request
+    futures.append(scheduler.submit("/api/generate", {"model": "a", "prompt": "last a"}))
+    futures.append(scheduler.submit("/api/generate", {"model": "b", "prompt": "only b"}))
+    client.release.set()
+    for f in futures:
+        f.result(timeout=5)
+    scheduler.close()
+    # a's last request precedes the switch to b; b is hot once nothing else waits.
+    assert client.sent == [("a", "10m"), ("a", None), ("b", "10m")]
+
+
+def test_pinned_model_keeps_its_pin():
+    client = StubClient()
+    client.release.set()
+    scheduler = ModelAffinityScheduler(client)
+    scheduler.pin("a", embedding=False)
+    scheduler.submit("/api/generate", {"model": "a", "prompt": "hi"}).result(timeout=5)
+    scheduler.unpin("a", embedding=False)
+    scheduler.submit("/api/generate", {"model": "a", "prompt": "hi"}).result(timeout=5)
+    scheduler.close()
+    assert client.sent == [("a", -1), ("a", "10m")]
+
+
+def test_embedding_models_are_pinned_through_embed(fake_ollama):
+    base_url = fake_ollama([
+        exchange("/api/show", "emb", {"capabilities": ["embedding"]}),
+        exchange("/api/embed", "emb", {"model": "emb", "embeddings": []}),
+    ])
+    scheduler = ModelAffinityScheduler(OllamaClient(base_url))
+    # The fake has no /api/generate recording for emb, so this would fail there.
+    assert scheduler.pin("emb") == {"model": "emb", "embeddings": []}
+    assert scheduler.unpin("emb") == {"model": "emb", "embeddings": []}
+    scheduler.close()
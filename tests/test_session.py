@@ -0,0 +1,55 @@
+import pytest
+import requests
+
+from conftest import exchange, generate
+
+from ollamakit import OllamaClient
+from ollamakit.session import ConversationSession
+
+REPLAY = "User: hi\nAssistant: hello\nUser: more\nAssistant:"
+
+
+def rejected(model, request, status):
+    return exchange("/api/generate", model, {"error": "bad context"}, status=status, request=request)
+
+
+def test_rejected_context_falls_back_to_the_transcript(fake_ollama):
+    base_url = fake_ollama([
+        generate("m", "hello", context=[1, 2], request={"prompt": "hi"}),
+        rejected("m", {"prompt": "more", "context": [1, 2]}, 400),
+        generate("m", "replayed", context=[5], request={"prompt": REPLAY}),
+        generate("m", "continued", context=[5, 6], request={"prompt": "again", "context": [5]}),
+        generate("m", "unexpected request"),
+    ])
+    session = ConversationSession("m", client=OllamaClient(base_url))
+    assert session.send("hi") == "hello"
+    assert session.send("more") == "replayed"
+    assert session.send("again") == "continued"
+    assert [t["mode"] for t in session.turns] == ["replay", "replay", "context"]
+    assert session.turns[2]["carried_tokens"] == 1
+
+
+def test_server_errors_are_not_papered_over(fake_ollama):
+    base_url = fake_ollama([
+        generate("m", "hello", context=[1, 2], request={"prompt": "hi"}),
+        rejected("m", {"prompt": "more", "context": [1, 2]}, 500),
+        generate("m", "replayed", request={"prompt": REPLAY}),
+    ])
+    session = ConversationSession("m", client=OllamaClient(base_url))
+    session.send("hi")
+    with pytest.raises(requests.HTTPError):
+        session.send("more")
+    assert len(session.transcript) == 2
+
+
+def test_switching_models_replays_once(fake_ollama):
+    base_url = fake_ollama([
+        generate("a", "hello", context=[1, 2], request={"prompt": "hi"}),
+        generate("b", "from b", context=[9], request={"prompt": REPLAY}),
+        generate("b", "unexpected request"),
+    ])
+    session = ConversationSession("a", client=OllamaClient(base_url))
+    session.send("hi")
+    session.switch_model("b")
+    assert session.send("more") == "from b"
+    assert session.stats()["replays"] == 2
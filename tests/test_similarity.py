@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ollamakit.similarity import VectorIndex, cosine, cosine_loop, top_k
+
+
+def test_cosine_matches_the_loop_and_handles_zero_vectors():
+    rng = np.random.default_rng(1)
+    a, b = rng.standard_normal((2, 32))
+    assert cosine(a, b) == pytest.approx(cosine_loop(a.tolist(), b.tolist()), abs=1e-5)
+    assert cosine([1, 0], [1, 0]) == pytest.approx(1.0)
+    assert cosine([1, 0], [-1, 0]) == pytest.approx(-1.0)
+    assert cosine([0, 0], [1, 0]) == 0.0
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+    assert top_k(scores, 0).tolist() == []
+
+
+def test_chunked_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((300, 16)).astype(np.float32)
+    queries = rng.standard_normal((4, 16)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(300)]
+    # A small chunk size forces the per-chunk top-k merge.
+    index = VectorIndex(corpus, ids=ids, chunk_size=37)
+
+    results = index.search(queries, k=5)
+    for query, result in zip(queries, results):
+        brute = sorted(range(300), key=lambda i: cosine_loop(query.tolist(), corpus[i].tolist()), reverse=True)[:5]
+        assert [id_ for id_, _ in result] == [ids[i] for i in brute]
+        assert [s for _, s in result] == pytest.approx(
+            [cosine_loop(query.tolist(), corpus[i].tolist()) for i in brute], abs=1e-5)
+
+    single = index.search(queries[0], k=3)
+    assert [id_ for id_, _ in single] == [id_ for id_, _ in results[0][:3]]
+
+
+def test_incremental_adds_grow_the_index():
+    index = VectorIndex()
+    assert index.search([1.0, 0.0], k=3) == []
+    for i in range(40):
+        index.add([[1.0, float(i)]], ids=[i])
+    assert len(index) == 40
+    assert index.search([0.0, 1.0], k=1)[0][0] == 39
+    with pytest.raises(ValueError):
+        index.add([[1.0, 2.0, 3.0]])
+
+
+def test_near_duplicates_and_dedupe():
+    vectors = [[1, 0, 0], [0.99, 0.01, 0], [0, 1, 0], [0, 0.999, 0.01], [0, 0, 1]]
+    index = VectorIndex(vectors, ids=["a", "a2", "b", "b2", "c"], chunk_size=2)
+    pairs = index.near_duplicates(threshold=0.99)
+    assert sorted((x, y) for x, y, _ in pairs) == [("a", "a2"), ("b", "b2")]
+    assert all(score >= 0.99 for _, _, score in pairs)
+    assert index.dedupe(threshold=0.99) == ["a", "b", "c"]
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+from conftest import generate
+
+from ollamakit import OllamaClient
+from ollamakit.singleflight import SingleFlight
+
+
+def test_identical_sync_calls_share_one_request(fake_ollama):
+    base_url = fake_ollama([generate("m", "shared")], ttft=0.2)
+    flight = SingleFlight()
+    client = OllamaClient(base_url, singleflight=flight)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(client.generate("m", "same")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [r["response"] for r in results] == ["shared"] * 4
+    assert flight.stats() == {"collapsed": 3, "in_flight": 0}
+
+
+def test_cancelled_leader_does_not_cancel_followers(fake_ollama):
+    base_url = fake_ollama([generate("m", "shared")], ttft=0.3)
+    flight = SingleFlight()
+
+    async def main():
+        async with OllamaClient(base_url, singleflight=flight) as client:
+            leader = asyncio.ensure_future(client.agenerate("m", "same"))
+            await asyncio.sleep(0.05)
+            follower = asyncio.ensure_future(client.agenerate("m", "same"))
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            data = await follower
+            assert leader.cancelled()
+            return data
+
+    assert asyncio.run(main())["response"] == "shared"
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_call_is_cancelled_once_every_caller_left():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.ado("k", slow)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for c in callers:
+            c.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert cancelled == [True]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_of_an_interrupted_leader_get_an_error():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def interrupted():
+        started.set()
+        release.wait(5)
+        raise KeyboardInterrupt
+
+    def lead():
+        try:
+            flight.do("k", interrupted)
+        except KeyboardInterrupt:
+            outcome["leader"] = "interrupted"
+
+    def follow():
+        try:
+            outcome["follower"] = flight.do("k", lambda: "not run")
+        except RuntimeError as e:
+            outcome["follower"] = e
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=follow)
+    follower.start()
+    while flight.stats()["collapsed"] == 0:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    assert outcome["leader"] == "interrupted"
+    assert isinstance(outcome["follower"], RuntimeError)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_of_a_cancelled_call_see_the_cancellation():
+    flight = SingleFlight()
+
+    async def cancelled_upstream():
+        await asyncio.sleep(0.02)
+        raise asyncio.CancelledError
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.ado("k", cancelled_upstream)) for _ in range(3)]
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert flight.stats() == {"collapsed": 2, "in_flight": 0}
+
+
+def test_caller_arriving_after_an_orphaned_call_starts_a_new_one():
+    flight = SingleFlight()
+    runs = []
+
+    async def slow():
+        runs.append(None)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.05)  # e.g. closing the connection
+            raise
+        return len(runs)
+
+    async def main():
+        first = asyncio.ensure_future(flight.ado("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        # The abandoned call is still unwinding.
+        return await flight.ado("k", slow)
+
+    assert asyncio.run(main()) == 2
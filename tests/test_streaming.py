@@ -0,0 +1,70 @@
+import json
+
+from ollamakit import OllamaClient
+from ollamakit.fakeserver import exchange_key
+from ollamakit.streaming import TokenStream
+
+
+def raw_stream(pieces, model="m"):
+    """A streamed /api/generate reply sent as the given raw chunks."""
+    request = {"model": model}
+    return {
+        "key": exchange_key("POST", "/api/generate", request), "method": "POST",
+        "path": "/api/generate", "request": request, "status": 200,
+        # Not x-ndjson, so the fake server sends the pieces verbatim.
+        "content_type": "application/json", "streaming": True, "lines": pieces,
+    }
+
+
+def chunk(token, done=False, **fields):
+    return json.dumps({"model": "m", "response": token, "done": done, **fields})
+
+
+def open_stream(client, **callbacks):
+    r = client._session.post(client._url("/api/generate"), json={"model": "m", "prompt": "hi"},
+                             stream=True)
+    return TokenStream(r, **callbacks)
+
+
+def test_lines_split_across_chunks_are_reassembled(fake_ollama):
+    first, second = chunk("Hel") + "\n", chunk("lo") + "\n"
+    pieces = [first[:10], first[10:] + second[:5], second[5:], chunk("", done=True, eval_count=2) + "\n"]
+    client = OllamaClient(fake_ollama([raw_stream(pieces)], tokens_per_sec=50))
+    stream = open_stream(client)
+    assert list(stream) == ["Hel", "lo"]
+    assert stream.final["eval_count"] == 2
+
+
+def test_final_line_without_newline_is_parsed(fake_ollama):
+    pieces = [chunk("a") + "\n", chunk("b", done=True, eval_count=2)]
+    client = OllamaClient(fake_ollama([raw_stream(pieces)]))
+    stream = open_stream(client)
+    assert stream.read() == "ab"
+    assert stream.final["done"]
+
+
+def test_cancel_stops_reading_and_closes_the_connection(fake_ollama):
+    pieces = [chunk(f"t{i}") + "\n" for i in range(50)] + [chunk("", done=True) + "\n"]
+    client = OllamaClient(fake_ollama([raw_stream(pieces)], tokens_per_sec=20))
+    events = []
+    stream = open_stream(client, on_done=lambda final: events.append("done"),
+                         on_close=lambda: events.append("close"))
+    tokens = []
+    for token in stream:
+        tokens.append(token)
+        stream.cancel()
+    assert tokens == ["t0"]
+    assert stream.stats()["cancelled"] and stream.final is None
+    assert stream.response.raw.closed
+    assert events == ["close"]
+
+
+def test_on_done_runs_before_on_close_and_each_once(fake_ollama):
+    pieces = [chunk("a") + "\n", chunk("", done=True, eval_count=1) + "\n"]
+    client = OllamaClient(fake_ollama([raw_stream(pieces)]))
+    events = []
+    stream = open_stream(client, on_done=lambda final: events.append(("done", final["eval_count"])),
+                         on_close=lambda: events.append("close"))
+    assert stream.read() == "a"
+    list(stream)  # iterating again must not fire the callbacks twice
+    assert events == [("done", 1), "close"]
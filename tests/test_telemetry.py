@@ -0,0 +1,56 @@
+from ollamakit import telemetry as telemetry_module
+from ollamakit.telemetry import Histogram, Telemetry
+
+RESPONSE = {
+    "model": "m", "total_duration": int(3e9), "load_duration": int(2e9),
+    "prompt_eval_duration": int(0.4e9), "eval_duration": int(0.6e9),
+    "prompt_eval_count": 20, "eval_count": 100,
+}
+
+
+def test_histogram_counts_each_value_in_its_first_bucket():
+    hist = Histogram((1, 5))
+    for value in (0.5, 1, 3, 7):
+        hist.observe(value)
+    assert hist.counts == [2, 1, 1]
+    assert (hist.count, hist.sum) == (4, 11.5)
+
+
+def test_prometheus_exposition_format():
+    t = Telemetry()
+    t.record(RESPONSE, "/api/generate", "m", caller='x.py:"main"', pattern="p")
+    t.record(dict(RESPONSE, load_duration=0), "/api/generate", "m", caller='x.py:"main"', pattern="p")
+    text = t.prometheus_text()
+    labels = 'model="m",endpoint="/api/generate",pattern="p",caller="x.py:\\"main\\""'
+
+    assert "# TYPE ollama_calls_total counter" in text
+    assert f"ollama_calls_total{{{labels}}} 2" in text
+    assert "# TYPE ollama_load_duration_seconds histogram" in text
+    # Buckets are cumulative and end with +Inf == count.
+    assert f'ollama_load_duration_seconds_bucket{{{labels},le="0.05"}} 1' in text
+    assert f'ollama_load_duration_seconds_bucket{{{labels},le="1"}} 1' in text
+    assert f'ollama_load_duration_seconds_bucket{{{labels},le="2.5"}} 2' in text
+    assert f'ollama_load_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"ollama_load_duration_seconds_sum{{{labels}}} 2.0" in text
+    assert f"ollama_load_duration_seconds_count{{{labels}}} 2" in text
+    assert f'ollama_eval_tokens_bucket{{{labels},le="256"}} 2' in text
+    assert text.endswith("\n")
+
+
+def test_summary_names_the_dominant_phase():
+    t = Telemetry()
+    t.record(RESPONSE, "/api/generate", "m", caller="c", pattern="p")
+    assert t.summary()["m p c"]["bound"] == "load"
+
+
+def test_prometheus_file_is_kept_up_to_date(tmp_path, monkeypatch):
+    path = tmp_path / "ollama.prom"
+    monkeypatch.setenv("OLLAMAKIT_TELEMETRY_PROM", str(path))
+    monkeypatch.setattr(telemetry_module, "_default_telemetry", None)
+    t = telemetry_module.get_telemetry()
+    assert t.prometheus_path == str(path)
+
+    t.prometheus_interval = 0
+    t.record(RESPONSE, "/api/generate", "m", caller="c")
+    assert "ollama_calls_total" in path.read_text()
+    assert not (tmp_path / "ollama.prom.tmp").exists()